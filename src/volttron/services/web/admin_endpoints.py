@@ -23,10 +23,11 @@
 # }}}
 
 import logging
-import os
 import re
 from urllib.parse import parse_qs
 
+import jwt
+
 from volttron.client.known_identities import PLATFORM_WEB, AUTH
 from volttron.utils.jsonrpc import RemoteError
 
@@ -35,19 +36,14 @@ try:
 except ImportError:
     logging.getLogger().warning("Missing jinja2 library in admin_endpoints.py")
 
-try:
-    from passlib.hash import argon2
-except ImportError:
-    logging.getLogger().warning("Missing passlib library in admin_endpoints.py")
-
-from watchdog_gevent import Observer
 from werkzeug import Response
 
-from volttron.utils.context import ClientContext
-from volttron.utils import jsonapi
 from volttron.utils.certs import Certs
-from volttron.utils.filewatch import VolttronHomeFileReloader
-from volttron.utils.persistance import PersistentDict
+
+from . import json_encoder
+from .passwords import PasswordHasher
+from .request_auth import request_claims
+from .user_store import UserStore
 
 
 _log = logging.getLogger(__name__)
@@ -59,9 +55,16 @@ def template_env(env):
 
 class AdminEndpoints(object):
 
-    def __init__(self, rmq_mgmt=None, ssl_public_key: bytes = None, rpc_caller=None):
+    def __init__(self, rmq_mgmt=None, ssl_public_key: bytes = None, rpc_caller=None, password_hasher=None,
+                 user_store=None, verify_claims=None):
+        """
+        :param verify_claims: callable returning the claims of a bearer token, asking the platform
+                              web service over RPC when None
+        """
 
         self._rpc_caller = rpc_caller
+        self._verify_claims = verify_claims
+        self._password_hasher = password_hasher if password_hasher is not None else PasswordHasher()
         self._rmq_mgmt = rmq_mgmt
 
         self._pending_auths = None
@@ -85,19 +88,10 @@ class AdminEndpoints(object):
         else:
             self._ssl_public_key = None
 
-        self._userdict = None
-        self.reload_userdict()
-
-        self._observer = Observer()
-        self._observer.schedule(
-            VolttronHomeFileReloader("web-users.json", self.reload_userdict),
-            ClientContext.get_volttron_home()
-        )
-        self._observer.start()
-
-    def reload_userdict(self):
-        webuserpath = os.path.join(ClientContext.get_volttron_home(), 'web-users.json')
-        self._userdict = PersistentDict(webuserpath, format="json")
+        if user_store is None:
+            user_store = UserStore()
+            user_store.watch()
+        self._user_store = user_store
 
     def get_routes(self):
         """
@@ -111,7 +105,7 @@ class AdminEndpoints(object):
         ]
 
     def admin(self, env, data):
-        if len(self._userdict) == 0:
+        if len(self._user_store) == 0:
             if env.get('REQUEST_METHOD') == 'POST':
                 decoded = dict((k, v if len(v) > 1 else v[0])
                                for k, v in parse_qs(data).items())
@@ -141,23 +135,30 @@ class AdminEndpoints(object):
         :param data: data associated with a web form or json/xml request data
         :return: Response object.
         """
-        from ..web import get_bearer, NotAuthorized
+        from ..web import NotAuthorized
         try:
-            claims = self._rpc_caller(PLATFORM_WEB, 'get_user_claims', get_bearer(env)).get()
+            # Claims already verified for this request are reused, otherwise they are verified
+            # in process when running in the platform web service.
+            verify = self._verify_claims or \
+                (lambda bearer: self._rpc_caller(PLATFORM_WEB, 'get_user_claims', bearer).get())
+            claims = request_claims(env, verify)
         except NotAuthorized:
             _log.error("Unauthorized user attempted to connect to {}".format(env.get('PATH_INFO')))
             return Response('<h1>Unauthorized User</h1>', status="401 Unauthorized")
-        except RemoteError as e:
-            if "ExpiredSignatureError" in e.exc_info["exc_type"]:
+        except (jwt.ExpiredSignatureError, RemoteError) as e:
+            if isinstance(e, jwt.ExpiredSignatureError) or "ExpiredSignatureError" in e.exc_info["exc_type"]:
                 _log.warning("Access token has expired! Please re-login to renew.")
                 template = template_env(env).get_template('login.html')
                 _log.debug("Login.html: {}".format(env.get('PATH_INFO')))
                 return Response(template.render(), content_type='text/html')
-            else:
-                _log.error(e)
+            _log.error(e)
+            return Response('<h1>Unauthorized User</h1>', status="401 Unauthorized")
+        except Exception as e:
+            _log.error(f"Unable to verify user connecting to {env.get('PATH_INFO')}: {e}")
+            return Response('<h1>Unauthorized User</h1>', status="401 Unauthorized")
 
         # Make sure we have only admins for viewing this.
-        if 'admin' not in claims.get('groups'):
+        if 'admin' not in (claims.get('groups') or []):
             return Response('<h1>Unauthorized User</h1>', status="401 Unauthorized")
 
         path_info = env.get('PATH_INFO')
@@ -235,7 +236,7 @@ class AdminEndpoints(object):
         except TimeoutError as e:
             data = dict(status="ERROR", message=e.message)
 
-        return Response(jsonapi.dumps(data), content_type="application/json")
+        return Response(json_encoder.dumpb(data), content_type="application/json")
 
     def __deny_csr_api(self, common_name):
         try:
@@ -248,7 +249,7 @@ class AdminEndpoints(object):
         except TimeoutError as e:
             data = dict(status="ERROR", message=e.message)
 
-        return Response(jsonapi.dumps(data), content_type="application/json")
+        return Response(json_encoder.dumpb(data), content_type="application/json")
 
     def __delete_csr_api(self, common_name):
         try:
@@ -261,7 +262,7 @@ class AdminEndpoints(object):
         except TimeoutError as e:
             data = dict(status="ERROR", message=e.message)
 
-        return Response(jsonapi.dumps(data), content_type="application/json")
+        return Response(json_encoder.dumpb(data), content_type="application/json")
 
     def __pending_csrs_api(self):
         try:
@@ -270,7 +271,7 @@ class AdminEndpoints(object):
         except TimeoutError as e:
             data = dict(status="ERROR", message=e.message)
 
-        return Response(jsonapi.dumps(data), content_type="application/json")
+        return Response(json_encoder.dumpb(data), content_type="application/json")
 
     def __cert_list_api(self):
 
@@ -281,7 +282,7 @@ class AdminEndpoints(object):
         except TimeoutError as e:
             data = dict(status="ERROR", message=e.message)
 
-        return Response(jsonapi.dumps(data), content_type="application/json")
+        return Response(json_encoder.dumpb(data), content_type="application/json")
 
     def __approve_credential_api(self, user_id):
         try:
@@ -295,7 +296,7 @@ class AdminEndpoints(object):
         except TimeoutError as e:
             data = dict(status="ERROR", message=e.message)
 
-        return Response(jsonapi.dumps(data), content_type="application/json")
+        return Response(json_encoder.dumpb(data), content_type="application/json")
 
     def __deny_credential_api(self, user_id):
         try:
@@ -308,7 +309,7 @@ class AdminEndpoints(object):
         except TimeoutError as e:
             data = dict(status="ERROR", message=e.message)
 
-        return Response(jsonapi.dumps(data), content_type="application/json")
+        return Response(json_encoder.dumpb(data), content_type="application/json")
 
     def __delete_credential_api(self, user_id):
         try:
@@ -321,17 +322,10 @@ class AdminEndpoints(object):
         except TimeoutError as e:
             data = dict(status="ERROR", message=e.message)
 
-        return Response(jsonapi.dumps(data), content_type="application/json")
+        return Response(json_encoder.dumpb(data), content_type="application/json")
 
     def add_user(self, username, unencrypted_pw, groups=None, overwrite=False):
-        if self._userdict.get(username) and not overwrite:
+        if username in self._user_store and not overwrite:
             raise ValueError(f"The user {username} is already present and overwrite not set to True")
-        if groups is None:
-            groups = []
-        hashed_pass = argon2.hash(unencrypted_pw)
-        self._userdict[username] = dict(
-            hashed_password=hashed_pass,
-            groups=groups
-        )
-
-        self._userdict.sync()
+        hashed_pass = self._password_hasher.hash(unencrypted_pw)
+        self._user_store.add_user(username, hashed_pass, groups, overwrite=overwrite)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import heapq
+import itertools
+import logging
+import math
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+from gevent.event import Event
+
+_log = logging.getLogger(__name__)
+
+HIGH_PRIORITY = 0
+NORMAL_PRIORITY = 1
+LOW_PRIORITY = 2
+
+PRIORITY_NAMES = {HIGH_PRIORITY: 'high', NORMAL_PRIORITY: 'normal', LOW_PRIORITY: 'low'}
+
+
+class LoadShed(Exception):
+    """
+    Raised when a request is refused admission.
+
+    :param retry_after: number of seconds the client should wait before retrying
+    """
+
+    def __init__(self, reason, retry_after):
+        super(LoadShed, self).__init__(reason)
+        self.retry_after = retry_after
+
+
+def request_priority(path, high_priority_prefixes=('/authenticate', '/admin'), low_priority_prefixes=('/vui',)):
+    """
+    Classifies a request path into a priority class.
+
+    Authentication, administration and health checks are admitted ahead of everything else
+    and bulk api reads come last.
+    """
+    if path.startswith(tuple(high_priority_prefixes)) or path.rstrip('/').endswith('/health'):
+        return HIGH_PRIORITY
+    if path.startswith(tuple(low_priority_prefixes)):
+        return LOW_PRIORITY
+    return NORMAL_PRIORITY
+
+
+class AdmissionController(object):
+    """
+    Bounds the number of requests processed concurrently.
+
+    Up to ``max_concurrent`` requests are processed at once.  Further requests wait in a
+    priority queue for at most ``max_wait`` seconds and are shed once the queue is too deep.
+    Low priority requests are shed when the queue is half full so that higher priority
+    requests keep being admitted under load.
+    """
+
+    def __init__(self, max_concurrent=100, max_queued=200, max_wait=10.0):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self._active = 0
+        self._queued = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._admitted = defaultdict(int)
+        self._shed = defaultdict(int)
+
+    @property
+    def retry_after(self):
+        return max(1, math.ceil(self.max_wait))
+
+    @contextmanager
+    def admit(self, priority=NORMAL_PRIORITY):
+        """
+        Context manager holding a processing slot for the duration of the block.
+
+        :raises LoadShed: when the request is not admitted.
+        """
+        if self._active < self.max_concurrent and not self._queued:
+            self._active += 1
+        else:
+            limit = self.max_queued if priority < LOW_PRIORITY else self.max_queued // 2
+            if self._queued >= limit:
+                self._shed_request(priority, "queue is full")
+            self._wait(priority)
+
+        self._admitted[PRIORITY_NAMES[priority]] += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self):
+        """
+        Returns the active and queued request counts and the admitted and shed counts per priority.
+        """
+        return dict(active=self._active, queued=self._queued,
+                    admitted=dict(self._admitted), shed=dict(self._shed))
+
+    def _wait(self, priority):
+        waiter = [priority, next(self._sequence), Event()]
+        heapq.heappush(self._waiters, waiter)
+        self._queued += 1
+        try:
+            waiter[2].wait(timeout=self.max_wait)
+        except BaseException:
+            # Killed while waiting, skip the entry and pass on a slot already handed to it.
+            event, waiter[2] = waiter[2], None
+            if event.is_set():
+                self._release()
+            raise
+        finally:
+            self._queued -= 1
+        if not waiter[2].is_set():
+            # Leave the entry in the heap, it is skipped once it reaches the front.
+            waiter[2] = None
+            self._shed_request(priority, "timed out waiting for admission")
+
+    def _release(self):
+        # Hand the slot directly to the highest priority waiter.
+        while self._waiters:
+            event = heapq.heappop(self._waiters)[2]
+            if event is not None:
+                event.set()
+                return
+        self._active -= 1
+
+    def _shed_request(self, priority, reason):
+        self._shed[PRIORITY_NAMES[priority]] += 1
+        _log.warning(f"Shedding {PRIORITY_NAMES[priority]} priority request: {reason}.")
+        raise LoadShed(reason, self.retry_after)
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+import mimetypes
+import mmap
+import os
+import posixpath
+import struct
+import tarfile
+import time
+import zipfile
+
+from .compression import ENCODING_EXTENSIONS
+from .static import FileResponse, StaticFile
+
+_log = logging.getLogger(__name__)
+
+# Size of the fixed part of a zip local file header and the offset of its name and extra lengths.
+_ZIP_LOCAL_HEADER_SIZE = 30
+_ZIP_LOCAL_HEADER = struct.Struct('<HH')
+_ZIP_NAME_LENGTHS_OFFSET = 26
+
+
+def _supported_zip_compressions():
+    supported = {zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED}
+    try:
+        import bz2  # noqa: F401
+        supported.add(zipfile.ZIP_BZIP2)
+    except ImportError:
+        pass
+    try:
+        import lzma  # noqa: F401
+        supported.add(zipfile.ZIP_LZMA)
+    except ImportError:
+        pass
+    return frozenset(supported)
+
+
+# Compression methods zip members can be read with.
+_ZIP_COMPRESSIONS = _supported_zip_compressions()
+
+
+class InvalidArchive(Exception):
+    pass
+
+
+class ArchiveMember(StaticFile):
+    """
+    A file within an archive.
+
+    Members stored without compression are sent straight from the archive, ``offset`` being
+    the position of their data in it.  Compressed members are decompressed into ``data``.
+    """
+    __slots__ = ('offset', 'data', 'version')
+
+    def __init__(self, path, size, mtime, offset=None, data=None, version=0):
+        super(ArchiveMember, self).__init__(path, size, mtime, mimetypes.guess_type(path)[0] or 'text/plain')
+        self.offset = offset
+        self.data = data
+        self.version = version
+
+    @property
+    def etag(self):
+        # The archive's modification time distinguishes members of successive builds.
+        return f'"{self.version:x}-{self.mtime:x}-{self.size:x}"'
+
+
+class ArchiveFiles(object):
+    """
+    The files of a zip or tar archive, served without extracting it.
+
+    The archive's members are indexed when it is loaded.  Members stored uncompressed, which is
+    every member of a plain tar, are served from a memory map of the archive or sent from it with
+    ``os.sendfile``.  Compressed zip members are decompressed on first use and kept in memory, and
+    compressed tars are decompressed into memory when loaded.
+
+    Members are looked up by request path, so ``/index.html`` is the member ``index.html``.
+    Precompressed ``.br`` and ``.gz`` members are served as encoded variants like their
+    counterparts on disk.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self._file = open(self.path, 'rb')
+        self._mmap = None
+        self._zip = None
+        st = os.fstat(self._file.fileno())
+        self.version = st.st_mtime_ns
+        try:
+            if zipfile.is_zipfile(self._file):
+                self._members = self._index_zip()
+            elif tarfile.is_tarfile(self.path):
+                self._members = self._index_tar()
+            else:
+                raise InvalidArchive(f"{path} is not a zip or tar archive.")
+            if st.st_size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.close()
+            raise
+        _log.debug(f"Indexed {len(self._members)} members of {self.path}.")
+
+    def __len__(self):
+        return len(self._members)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def lookup(self, path):
+        """
+        Returns the ArchiveMember for a request path or None.
+        """
+        name = posixpath.normpath(path.lstrip('/'))
+        return self._members.get(name)
+
+    def variants(self, info):
+        variants = {}
+        for encoding, extension in ENCODING_EXTENSIONS.items():
+            variant = self._members.get(info.path + extension)
+            if variant is not None and variant.mtime >= info.mtime:
+                variants[encoding] = variant
+        return variants
+
+    def content(self, info):
+        if info.offset is not None:
+            return self._mmap[info.offset:info.offset + info.size]
+        return self._data(info)
+
+    def open(self, info, segments):
+        if info.offset is not None:
+            segments = [segment if isinstance(segment, bytes) else (info.offset + segment[0], segment[1])
+                        for segment in segments]
+            return FileResponse(self._file.fileno(), segments=segments)
+        return _MemoryResponse(self._data(info), segments)
+
+    def _data(self, info):
+        if info.data is None:
+            info.data = self._zip.read(info.path)
+        return info.data
+
+    def _index_zip(self):
+        members = {}
+        self._zip = zipfile.ZipFile(self._file)
+        for entry in self._zip.infolist():
+            name = self._member_name(entry.filename)
+            if name is None or entry.is_dir():
+                continue
+            if entry.flag_bits & 0x1 or entry.compress_type not in _ZIP_COMPRESSIONS:
+                # Reading the member would fail on every request.
+                _log.warning(f"Ignoring encrypted or unsupported archive member: {name}")
+                continue
+            mtime = int(time.mktime(entry.date_time + (0, 0, -1))) * 1000000000
+            offset = None
+            if entry.compress_type == zipfile.ZIP_STORED:
+                self._file.seek(entry.header_offset + _ZIP_NAME_LENGTHS_OFFSET)
+                name_length, extra_length = _ZIP_LOCAL_HEADER.unpack(self._file.read(_ZIP_LOCAL_HEADER.size))
+                offset = entry.header_offset + _ZIP_LOCAL_HEADER_SIZE + name_length + extra_length
+            members[name] = ArchiveMember(name, entry.file_size, mtime, offset=offset, version=self.version)
+        return members
+
+    def _index_tar(self):
+        members = {}
+        try:
+            # Members of an uncompressed tar are contiguous in the archive.
+            archive = tarfile.open(self.path, 'r:')
+            compressed = False
+        except tarfile.ReadError:
+            archive = tarfile.open(self.path, 'r:*')
+            compressed = True
+        with archive:
+            for entry in archive:
+                name = self._member_name(entry.name)
+                if name is None or not entry.isreg():
+                    continue
+                mtime = int(entry.mtime) * 1000000000
+                if compressed:
+                    data = archive.extractfile(entry).read()
+                    members[name] = ArchiveMember(name, entry.size, mtime, data=data, version=self.version)
+                else:
+                    members[name] = ArchiveMember(name, entry.size, mtime, offset=entry.offset_data,
+                                                  version=self.version)
+        return members
+
+    @staticmethod
+    def _member_name(name):
+        name = posixpath.normpath(name.replace('\\', '/').lstrip('/'))
+        if name == '.' or name == '..' or name.startswith('../'):
+            _log.warning(f"Ignoring archive member outside of the archive root: {name}")
+            return None
+        return name
+
+
+class _MemoryResponse(object):
+    """
+    Response body sending segments of an in memory file.
+    """
+
+    def __init__(self, data, segments):
+        view = memoryview(data)
+        self._parts = [segment if isinstance(segment, bytes) else view[segment[0]:segment[0] + segment[1]]
+                       for segment in segments]
+        self.length = sum(len(part) for part in self._parts)
+
+    def __iter__(self):
+        return iter(self._parts)
@@ -27,17 +27,15 @@ import os
 import re
 from urllib.parse import parse_qs
 from datetime import datetime, timedelta
-import json
 
 import jwt
 from jinja2 import Environment, FileSystemLoader, select_autoescape
-from passlib.hash import argon2
-from watchdog_gevent import Observer
 from werkzeug import Response
 
-from volttron.utils.context import ClientContext
-from volttron.utils.filewatch import VolttronHomeFileReloader
-from volttron.utils.persistance import PersistentDict
+from . import json_encoder
+from .passwords import PasswordHasher
+from .revocation import RevocationList
+from .user_store import UserStore
 
 _log = logging.getLogger(__name__)
 
@@ -57,10 +55,22 @@ tplenv = Environment(
 
 class AuthenticateEndpoints(object):
 
-    def __init__(self, tls_private_key=None, tls_public_key=None, web_secret_key=None):
+    def __init__(self, tls_private_key=None, tls_public_key=None, web_secret_key=None, keyring=None,
+                 password_hasher=None, user_store=None, revocations=None):
+        """
+        :param keyring: Keyring holding the token signing keys, used in place of tls_private_key
+                        and tls_public_key so that reloaded keys are picked up
+        :param password_hasher: PasswordHasher verifying passwords off the hub
+        :param user_store: UserStore shared with the other endpoints, a watched store of its own
+                           is created when None
+        :param revocations: RevocationList of the tokens revoked with DELETE /authenticate
+        """
 
         self.refresh_token_timeout = 240  # minutes before token expires. TODO: Should this be a setting somewhere?
         self.access_token_timeout = 15  # minutes before token expires. TODO: Should this be a setting somewhere?
+        if keyring is not None:
+            tls_private_key, tls_public_key = keyring.private_key, keyring.public_key
+        self._keyring = keyring
         self._tls_private_key = tls_private_key
         self._tls_public_key = tls_public_key
         self._web_secret_key = web_secret_key
@@ -68,18 +78,12 @@ class AuthenticateEndpoints(object):
             raise ValueError("Must have either ssl_private_key or web_secret_key specified!")
         if self._tls_private_key is not None and self._web_secret_key is not None:
             raise ValueError("Must use either ssl_private_key or web_secret_key not both!")
-        self._userdict = None
-        self.reload_userdict()
-        self._observer = Observer()
-        self._observer.schedule(
-            VolttronHomeFileReloader("web-users.json", self.reload_userdict),
-            ClientContext.get_volttron_home()
-        )
-        self._observer.start()
-
-    def reload_userdict(self):
-        webuserpath = os.path.join(ClientContext.get_volttron_home(), 'web-users.json')
-        self._userdict = PersistentDict(webuserpath)
+        self._password_hasher = password_hasher if password_hasher is not None else PasswordHasher()
+        if user_store is None:
+            user_store = UserStore()
+            user_store.watch()
+        self._user_store = user_store
+        self._revocations = revocations if revocations is not None else RevocationList()
 
     def get_routes(self):
         """
@@ -123,7 +127,7 @@ class AuthenticateEndpoints(object):
         else:
             error = f"/authenticate endpoint accepts only POST, PUT, or DELETE methods. Received: {method}"
             _log.warning(error)
-            return Response(json.dumps({'error': error}), status=405, content_type='application/json')
+            return Response(json_encoder.dumpb({'error': error}), status=405, content_type='application/json')
         return response
 
     def get_auth_tokens(self, env, data):
@@ -139,7 +143,7 @@ class AuthenticateEndpoints(object):
         :return:
         """
 
-        assert len(self._userdict) > 0, "No users in user dictionary, set the administrator password first!"
+        assert len(self._user_store) > 0, "No users in user dictionary, set the administrator password first!"
 
         if not isinstance(data, dict):
             _log.debug("data is not a dict, decoding")
@@ -163,14 +167,15 @@ class AuthenticateEndpoints(object):
 
         if error:
             _log.error("Invalid parameters passed: {}".format(error))
-            return Response(json.dumps({'error': error}), status=401, content_type='application/json')
+            return Response(json_encoder.dumpb({'error': error}), status=401, content_type='application/json')
 
         user = self.__get_user(username, password)
         if user is None:
             _log.error("No matching user for passed username: {}".format(username))
-            return Response(json.dumps({'error': 'Not Authorized'}), status='401', content_type='application/json')
+            return Response(json_encoder.dumpb({'error': 'Not Authorized'}), status='401', content_type='application/json')
+        user['sub'] = username
         access_token, refresh_token = self._get_tokens(user)
-        response = Response(json.dumps({"refresh_token": refresh_token, "access_token": access_token}),
+        response = Response(json_encoder.dumpb({"refresh_token": refresh_token, "access_token": access_token}),
                             content_type="application/json")
         return response
 
@@ -181,13 +186,19 @@ class AuthenticateEndpoints(object):
         claims['exp'] = now + timedelta(minutes=self.access_token_timeout)
         claims['grant_type'] = 'access_token'
         algorithm = 'RS256' if self._tls_private_key is not None else 'HS256'
-        encode_key = self._tls_private_key if algorithm == 'RS256' else self._web_secret_key
+        encode_key = self._private_key() if algorithm == 'RS256' else self._web_secret_key
         access_token = jwt.encode(claims, encode_key, algorithm=algorithm)
         claims['exp'] = now + timedelta(minutes=self.refresh_token_timeout)
         claims['grant_type'] = 'refresh_token'
         refresh_token = jwt.encode(claims, encode_key, algorithm=algorithm)
         return access_token.decode('utf-8'), refresh_token.decode('utf8')
 
+    def _private_key(self):
+        return self._keyring.private_key if self._keyring is not None else self._tls_private_key
+
+    def _public_key(self):
+        return self._keyring.public_key if self._keyring is not None else self._tls_public_key
+
     def renew_auth_token(self, env, data):
         """
         Creates a new authentication access token to be returned to the caller.  The
@@ -208,28 +219,75 @@ class AuthenticateEndpoints(object):
         try:
             current_refresh_token = get_bearer(env)
             claims = get_user_claim_from_bearer(current_refresh_token, web_secret_key=self._web_secret_key,
-                                                tls_public_key=self._tls_public_key)
+                                                tls_public_key=self._public_key())
         except NotAuthorized:
             _log.error("Unauthorized user attempted to connect to {}".format(env.get('PATH_INFO')))
-            return Response(json.dumps({'error': 'Not Authorized'}), status=401, content_type='application/json')
+            return Response(json_encoder.dumpb({'error': 'Not Authorized'}), status=401, content_type='application/json')
 
         except jwt.ExpiredSignatureError:
             _log.error("User attempted to connect to {} with an expired signature".format(env.get('PATH_INFO')))
-            return Response(json.dumps({'error': 'Not Authorized'}), status=401, content_type='application/json')
+            return Response(json_encoder.dumpb({'error': 'Not Authorized'}), status=401, content_type='application/json')
+
+        if self._revocations.is_revoked(current_refresh_token):
+            _log.error("User attempted to connect to {} with a revoked token".format(env.get('PATH_INFO')))
+            return Response(json_encoder.dumpb({'error': 'Not Authorized'}), status=401, content_type='application/json')
 
         if claims.get('grant_type') != 'refresh_token' or not claims.get('groups'):
-            return Response(json.dumps({'error': 'Not Authorized'}), status=401, content_type='application/json')
+            return Response(json_encoder.dumpb({'error': 'Not Authorized'}), status=401, content_type='application/json')
         else:
             # TODO: Consider blacklisting and reissuing refresh tokens also when used.
             new_access_token, _ = self._get_tokens(claims)
             if current_access_token:
                 pass  # TODO: keep current subscriptions? blacklist old token?
-            return Response(json.dumps({"access_token": new_access_token}), content_type="application/json")
+            return Response(json_encoder.dumpb({"access_token": new_access_token}), content_type="application/json")
 
     def revoke_auth_token(self, env, data):
-        # TODO: Blacklist old token? Immediately close websockets?
-        response = {'error': 'DELETE /authenticate is not yet implemented'}
-        return Response(json.dumps(response), status=501, content_type='application/json')
+        """
+        Revokes the refresh token of the caller, and its current access token when given, so
+        that they are refused until they expire.  Request should contain:
+            • Authorization: BEARER <jwt_refresh_token>
+            • Body (optional):
+                {
+                "current_access_token": "<jwt_access_token>"
+                }
+
+        :param env:
+        :param data:
+        :return:
+        """
+        # TODO: Immediately close websockets opened with the revoked access token?
+        from ..web import get_bearer, get_user_claim_from_bearer, NotAuthorized
+        try:
+            current_refresh_token = get_bearer(env)
+            claims = get_user_claim_from_bearer(current_refresh_token, web_secret_key=self._web_secret_key,
+                                                tls_public_key=self._public_key())
+        except (NotAuthorized, jwt.InvalidTokenError):
+            _log.error("Unauthorized user attempted to connect to {}".format(env.get('PATH_INFO')))
+            return Response(json_encoder.dumpb({'error': 'Not Authorized'}), status=401, content_type='application/json')
+
+        if self._revocations.is_revoked(current_refresh_token):
+            return Response(json_encoder.dumpb({'error': 'Not Authorized'}), status=401, content_type='application/json')
+
+        tokens = [(current_refresh_token, claims)]
+        current_access_token = data.get('current_access_token') if isinstance(data, dict) else None
+        if current_access_token:
+            try:
+                access_claims = get_user_claim_from_bearer(current_access_token, web_secret_key=self._web_secret_key,
+                                                           tls_public_key=self._public_key())
+            except jwt.ExpiredSignatureError:
+                access_claims = None
+            except jwt.InvalidTokenError:
+                access_claims = {}
+            if access_claims is not None and access_claims.get('sub') != claims.get('sub'):
+                return Response(json_encoder.dumpb({'error': 'Invalid current_access_token'}), status=400,
+                                content_type='application/json')
+            if access_claims is not None:
+                tokens.append((current_access_token, access_claims))
+
+        for token, token_claims in tokens:
+            self._revocations.revoke(token, token_claims.get('exp'))
+        _log.info(f"Revoked {len(tokens)} token(s) of {claims.get('sub')}.")
+        return Response(status=204)
 
     def __get_user(self, username, password):
         """
@@ -244,12 +302,9 @@ class AuthenticateEndpoints(object):
         :param password:
         :return:
         """
-        user = self._userdict.get(username)
+        user = self._user_store.get(username)
         if user is not None:
-            hashed_pass = user.get('hashed_password')
-            if hashed_pass and argon2.verify(password, hashed_pass):
-                usr_cpy = user.copy()
-                del usr_cpy['hashed_password']
-                return usr_cpy
+            if user.hashed_password and self._password_hasher.verify(password, user.hashed_password):
+                return user.claims()
         return None
 
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import hashlib
+import logging
+import time
+
+from collections import OrderedDict
+
+_log = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache(object):
+    """
+    A bounded mapping which evicts the least recently used entry once full.
+
+    The cache is bounded by number of entries and, when a weigher is passed, by the total
+    weight (for example the size in bytes) of its values.  Hits and misses are counted so the
+    cache can be sized from observed traffic.
+    """
+
+    def __init__(self, maxsize=1024, maxweight=None, weigher=None):
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._weigher = weigher
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, value):
+        self.pop(key)
+        weight = self._weigher(value) if self._weigher is not None else 0
+        if self.maxsize == 0 or (self.maxweight is not None and weight > self.maxweight):
+            return
+        self._data[key] = (value, weight)
+        self.weight += weight
+        while len(self._data) > self.maxsize or \
+                (self.maxweight is not None and self.weight > self.maxweight):
+            _, (_, evicted) = self._data.popitem(last=False)
+            self.weight -= evicted
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, _MISSING)
+        if item is _MISSING:
+            return default
+        self.weight -= item[1]
+        return item[0]
+
+    def clear(self):
+        self._data.clear()
+        self.weight = 0
+
+    def stats(self):
+        stats = dict(hits=self.hits, misses=self.misses, size=len(self._data), maxsize=self.maxsize)
+        if self.maxweight is not None:
+            stats.update(weight=self.weight, maxweight=self.maxweight)
+        return stats
+
+
+def parse_cache_control(value):
+    """
+    Parses a Cache-Control header into a dictionary of lower cased directives.
+
+    Directives without an argument map to True.
+    """
+    directives = {}
+    for directive in (value or '').split(','):
+        name, _, argument = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else True
+    return directives
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Weak comparison of an ETag against the value of an If-None-Match header.
+    """
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    def opaque(tag):
+        tag = tag.strip()
+        return tag[2:] if tag.startswith('W/') else tag
+
+    return opaque(etag) in [opaque(tag) for tag in if_none_match.split(',')]
+
+
+def environ_header(name):
+    return 'HTTP_' + name.upper().replace('-', '_')
+
+
+def split_agent_response(res, raw=False):
+    """
+    Splits the result of an agent's route callback into status, content and headers.
+
+    :param res: the agent's response
+    :param raw: True if the response was returned for a 'raw' or 'bytes' endpoint
+    :return: (status, content, headers) tuple or None if the response has no headers
+    """
+    if not isinstance(res, (list, tuple)):
+        return None
+    if len(res) == 3:
+        status, content, headers = res
+    elif len(res) == 2 and not raw:
+        content, headers = res
+        status = '200 OK'
+    else:
+        return None
+    try:
+        headers = dict(headers)
+    except (TypeError, ValueError):
+        return None
+    return status, content, headers
+
+
+def agent_response_etag(res, raw=False):
+    """
+    Returns the ETag of a successful agent response or None.
+    """
+    parts = split_agent_response(res, raw)
+    if parts is None or not str(parts[0]).startswith('200'):
+        return None
+    return {k.lower(): v for k, v in parts[2].items()}.get('etag')
+
+
+class CachedResponse(object):
+    __slots__ = ('response', 'etag', 'expires', 'vary', 'size')
+
+    def __init__(self, response, etag, expires, vary, size):
+        self.response = response
+        self.etag = etag
+        self.expires = expires
+        self.vary = vary
+        self.size = size
+
+
+class ResponseCache(object):
+    """
+    A shared cache of agent responses following the HTTP caching rules.
+
+    Agents opt in per response by returning a ``Cache-Control`` header with ``max-age`` or
+    ``s-maxage``.  Responses marked ``private``, ``no-store`` or ``no-cache``, or with a
+    ``Vary: *`` header, are not stored.  Because the cache is shared between users, responses
+    to requests carrying an Authorization header or cookies, such as the Bearer cookie, are
+    only stored when marked ``public`` or given an ``s-maxage``.  Headers listed in ``Vary``
+    must match for a cached response to be used.
+
+    Entries are evicted least recently used first once the cached content exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes, max_entries=4096, clock=time.monotonic):
+        self._clock = clock
+        self._cache = LRUCache(maxsize=max_entries, maxweight=max_bytes, weigher=lambda entry: entry.size)
+
+    def lookup(self, key, env):
+        """
+        Returns the fresh CachedResponse for the request or None.
+        """
+        request_directives = parse_cache_control(env.get('HTTP_CACHE_CONTROL'))
+        if 'no-cache' in request_directives or 'no-store' in request_directives:
+            return None
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= self._clock():
+            self._cache.pop(key)
+            return None
+        if any(env.get(header) != value for header, value in entry.vary.items()):
+            return None
+        return entry
+
+    def store(self, key, env, res, raw=False):
+        """
+        Stores the agent response if its headers allow it to be cached.
+
+        :return: True if the response was stored
+        """
+        parts = split_agent_response(res, raw)
+        if parts is None:
+            return False
+        status, content, headers = parts
+        headers = {k.lower(): v for k, v in headers.items()}
+        if not str(status).startswith('200'):
+            return False
+
+        directives = parse_cache_control(headers.get('cache-control'))
+        if {'no-store', 'no-cache', 'private'} & directives.keys():
+            return False
+        credentials = env.get('HTTP_AUTHORIZATION') or env.get('HTTP_COOKIE')
+        if credentials and not ('public' in directives or 's-maxage' in directives):
+            return False
+        try:
+            max_age = int(directives.get('s-maxage', directives.get('max-age', 0)))
+        except (TypeError, ValueError):
+            return False
+        if max_age <= 0:
+            return False
+
+        vary = {}
+        for name in (headers.get('vary') or '').split(','):
+            name = name.strip()
+            if name == '*':
+                return False
+            if name:
+                vary[environ_header(name)] = env.get(environ_header(name))
+
+        if isinstance(content, str):
+            size = len(content.encode('utf-8'))
+        elif isinstance(content, bytes):
+            size = len(content)
+        else:
+            size = len(str(content))
+        self._cache.put(key, CachedResponse(res, headers.get('etag'), self._clock() + max_age, vary, size))
+        return key in self._cache
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class ClaimsCache(object):
+    """
+    Verified JWT claims keyed by a hash of the token.
+
+    Claims are kept until the token's ``exp`` claim, and for at most ``max_age`` seconds so
+    that tokens without an expiry are verified again from time to time.  The cache must be
+    cleared whenever the keys that verify tokens change.
+    """
+
+    def __init__(self, maxsize=4096, max_age=300.0, clock=time.time):
+        self.max_age = max_age
+        self._clock = clock
+        self._cache = LRUCache(maxsize)
+
+    def get(self, token):
+        """
+        Returns the cached claims of the token or None.
+        """
+        if not token:
+            return None
+        key = self._key(token)
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        claims, expires = entry
+        if self._clock() >= expires:
+            self._cache.pop(key)
+            return None
+        return claims
+
+    def put(self, token, claims):
+        if not token:
+            return
+        now = self._clock()
+        expires = now + self.max_age
+        exp = claims.get('exp')
+        if isinstance(exp, (int, float)):
+            expires = min(expires, exp)
+        if expires > now:
+            self._cache.put(self._key(token), (claims, expires))
+
+    def pop(self, token):
+        if token:
+            self._cache.pop(self._key(token))
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+    @staticmethod
+    def _key(token):
+        if isinstance(token, str):
+            token = token.encode('utf-8')
+        return hashlib.sha256(token).digest()
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import gzip
+import logging
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_log = logging.getLogger(__name__)
+
+# File extension of the precompressed variant of a file for each content coding.
+ENCODING_EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+_COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml',
+                       'application/x-javascript', 'application/yaml', 'application/x-yaml',
+                       'image/svg+xml')
+
+
+def is_compressible(content_type):
+    """
+    Returns True for content types which are worth compressing.
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    return content_type.startswith(_COMPRESSIBLE_TYPES) or content_type.endswith(('+json', '+xml'))
+
+
+def parse_accept_encoding(value):
+    """
+    Parses an Accept-Encoding header into a dictionary of lower cased codings to their q-value.
+    """
+    codings = {}
+    for item in (value or '').split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, argument = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(argument)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+def negotiate_encoding(accept_encoding, available=('br', 'gzip')):
+    """
+    Picks the content coding of a response from those available.
+
+    Codings are chosen by q-value, ties going to the order of ``available``.
+
+    :return: the chosen coding or None for the identity coding
+    """
+    codings = parse_accept_encoding(accept_encoding)
+    if not codings:
+        return None
+    wildcard = codings.get('*', 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    if best is not None and best_q < codings.get('identity', 0.0):
+        return None
+    return best
+
+
+def compress(data, coding, level=None):
+    """
+    Compresses bytes with the content coding, 'gzip' or 'br' when brotli is installed.
+    """
+    if coding == 'gzip':
+        return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+    if coding == 'br' and brotli is not None:
+        return brotli.compress(data) if level is None else brotli.compress(data, quality=level)
+    raise ValueError(f"Unsupported content coding {coding}")
+
+
+def supported_encodings():
+    """
+    Returns the content codings which can be produced, most efficient first.
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def _header(headers, name):
+    name = name.lower()
+    for header, value in headers:
+        if header.lower() == name:
+            return value
+    return None
+
+
+class _Compressor(object):
+
+    def __init__(self, encoding, level, brotli_quality):
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data, flush=False):
+        if self._brotli is not None:
+            data = self._brotli.process(data)
+            return data + self._brotli.flush() if flush else data
+        data = self._zlib.compress(data)
+        return data + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else data
+
+    def finish(self):
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware(object):
+    """
+    Compresses responses of a WSGI application for clients accepting it.
+
+    A response is compressed with the best coding the client accepts when its type is
+    compressible, it carries no Content-Encoding of its own and its body is at least
+    ``min_size`` bytes.  Already compressed types such as images and archives, partial and
+    empty responses, responses marked ``no-transform`` and file bodies sent with sendfile are
+    left alone.
+
+    The size of list bodies without a Content-Length is summed up front.  Lists are compressed
+    as a whole while other iterables are compressed and flushed a chunk at a time, so streamed
+    responses keep streaming.
+    """
+
+    def __init__(self, app, min_size=1024, level=6, brotli_quality=4, encodings=None, passthrough_types=()):
+        """
+        :param passthrough_types: response body types which are never compressed
+        """
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.encodings = tuple(encodings) if encodings is not None else supported_encodings()
+        self.passthrough_types = tuple(passthrough_types)
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING'), available=self.encodings)
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.app(environ, start_response)
+        response = _CompressedResponse(self, encoding, start_response)
+        return response.wrap(self.app(environ, response.start_response))
+
+    def eligible(self, status, headers):
+        try:
+            code = int(status.split(' ', 1)[0])
+        except ValueError:
+            return False
+        if code < 200 or code in (204, 206, 304):
+            return False
+        if _header(headers, 'Content-Encoding') or _header(headers, 'Content-Range'):
+            return False
+        if 'no-transform' in (_header(headers, 'Cache-Control') or '').lower():
+            return False
+        if not is_compressible(_header(headers, 'Content-Type')):
+            return False
+        length = _header(headers, 'Content-Length')
+        if length is not None:
+            try:
+                return int(length) >= self.min_size
+            except ValueError:
+                return False
+        return True
+
+
+class _CompressedResponse(object):
+    # Response states: waiting for start_response, compression not yet decided, passing the
+    # response through unchanged, or compressing it.
+    WAITING, PENDING, PASSTHROUGH, COMPRESSING = range(4)
+
+    def __init__(self, middleware, encoding, start_response):
+        self._middleware = middleware
+        self._encoding = encoding
+        self._start_response = start_response
+        self._state = self.WAITING
+        self._status = None
+        self._headers = None
+        self._compressor = None
+
+    def start_response(self, status, headers, exc_info=None):
+        if exc_info is not None and self._state in (self.PASSTHROUGH, self.COMPRESSING):
+            return self._start_response(status, headers, exc_info)
+        if self._middleware.eligible(status, headers):
+            self._status, self._headers = status, list(headers)
+            self._state = self.PENDING
+            return self.write
+        self._state = self.PASSTHROUGH
+        return self._start_response(status, headers, exc_info)
+
+    def write(self, data):
+        # Legacy write callable, compress from the first write on.
+        if self._state == self.PENDING:
+            self._begin_compressing()
+        if self._state == self.COMPRESSING:
+            data = self._compressor.compress(data, flush=True)
+        if data:
+            self._real_write(data)
+
+    def wrap(self, result):
+        if self._state == self.PASSTHROUGH:
+            return result
+        if isinstance(result, self._middleware.passthrough_types):
+            if self._state == self.PENDING:
+                self._begin_passthrough()
+            return result
+        if self._state == self.PENDING and isinstance(result, (list, tuple)):
+            size = sum(len(chunk) for chunk in result)
+            if size < self._middleware.min_size:
+                self._begin_passthrough(content_length=size)
+                return result
+        return self._iterate(result)
+
+    def _iterate(self, result):
+        streaming = not isinstance(result, (list, tuple))
+        try:
+            for chunk in result:
+                if self._state == self.PENDING:
+                    self._begin_compressing()
+                if self._state == self.COMPRESSING:
+                    chunk = self._compressor.compress(chunk, flush=streaming)
+                if chunk:
+                    yield chunk
+            if self._state == self.PENDING:
+                # Empty body.
+                self._begin_passthrough()
+            elif self._state == self.COMPRESSING:
+                yield self._compressor.finish()
+        finally:
+            close = getattr(result, 'close', None)
+            if close is not None:
+                close()
+
+    def _begin_passthrough(self, content_length=None):
+        self._state = self.PASSTHROUGH
+        headers = self._headers
+        if content_length is not None and _header(headers, 'Content-Length') is None:
+            headers = headers + [('Content-Length', str(content_length))]
+        self._real_write = self._start_response(self._status, headers)
+
+    def _begin_compressing(self):
+        self._state = self.COMPRESSING
+        self._compressor = _Compressor(self._encoding, self._middleware.level, self._middleware.brotli_quality)
+        headers = []
+        vary = None
+        for name, value in self._headers:
+            lower = name.lower()
+            if lower in ('content-length', 'accept-ranges'):
+                continue
+            if lower == 'etag' and not value.startswith('W/'):
+                # The compressed body is not byte for byte the entity the tag was made for.
+                value = 'W/' + value
+            if lower == 'vary':
+                vary = value
+                continue
+            headers.append((name, value))
+        if vary is None:
+            vary = 'Accept-Encoding'
+        elif 'accept-encoding' not in vary.lower() and vary.strip() != '*':
+            vary = vary + ', Accept-Encoding'
+        headers.append(('Vary', vary))
+        headers.append(('Content-Encoding', self._encoding))
+        self._real_write = self._start_response(self._status, headers)
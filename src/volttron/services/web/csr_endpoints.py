@@ -32,6 +32,8 @@ from volttron.utils import jsonapi
 from volttron.utils.certs import Certs
 from volttron.utils.context import ClientContext
 
+from . import json_encoder
+
 _log = logging.getLogger(__name__)
 
 
@@ -91,7 +93,7 @@ class CSREndpoints(object):
             json_response = dict(status="ERROR",
                                  message="CSR must start with instance name: {}".format(
                                      ClientContext.get_instance_name()))
-            Response(jsonapi.dumps(json_response),
+            Response(json_encoder.dumpb(json_response),
                      content_type='application/json',
                      headers={'Content-type': 'application/json'})
 
@@ -144,7 +146,7 @@ class CSREndpoints(object):
         try:
             if json_response.get('cert', None):
                 json_response['cert'] = json_response['cert'].decode('utf-8')
-            response = Response(jsonapi.dumps(json_response),
+            response = Response(json_encoder.dumpb(json_response),
                      content_type='application/json',
                      headers={'Content-type': 'application/json'})
         except BaseException as e:
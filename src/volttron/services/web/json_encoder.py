@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import json
+import logging
+import math
+
+from volttron.utils.jsonapi import attr_default
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+_log = logging.getLogger(__name__)
+
+# Encoders which may be configured, 'auto' picking the fastest one installed.
+ENCODERS = ('auto', 'orjson', 'ujson', 'stdlib')
+
+
+class JSONEncoder(object):
+    """
+    Serializes response documents to JSON.
+
+    ``stdlib`` is the json module, ``orjson`` and ``ujson`` are used when installed.  orjson
+    serializes straight to bytes.  Documents an encoder refuses, such as integers too large
+    for orjson, are serialized by the json module so every encoder accepts the same documents.
+    Objects which are not JSON types are serialized as by ``jsonapi.dumps``.
+
+    Every encoder produces the same values as the json module, only whitespace and the escaping
+    of non-ASCII characters differ: NaN and Infinity are written as such rather than as null,
+    and datetimes are refused rather than written as strings.  UUIDs are the one exception,
+    orjson writes them as strings.
+    """
+
+    def __init__(self, name='stdlib'):
+        if name not in ENCODERS:
+            raise ValueError(f"Unknown JSON encoder {name}, expected one of {', '.join(ENCODERS)}.")
+        if name == 'auto':
+            name = 'orjson' if orjson is not None else 'ujson' if ujson is not None else 'stdlib'
+        elif (name == 'orjson' and orjson is None) or (name == 'ujson' and ujson is None):
+            _log.warning(f"JSON encoder {name} is not installed, using the json module.")
+            name = 'stdlib'
+        self.name = name
+        self._dumpb = getattr(self, f'_dumpb_{name}')
+
+    def dumpb(self, obj):
+        """
+        Returns the utf-8 encoded JSON document of obj.
+        """
+        return self._dumpb(obj)
+
+    def dumps(self, obj):
+        """
+        Returns the JSON document of obj as a string.
+        """
+        if self.name == 'orjson':
+            return self.dumpb(obj).decode('utf-8')
+        if self.name == 'ujson':
+            try:
+                return ujson.dumps(obj, ensure_ascii=False, default=attr_default)
+            except (TypeError, OverflowError):
+                pass
+        return json.dumps(obj, default=attr_default)
+
+    def _dumpb_orjson(self, obj):
+        try:
+            data = orjson.dumps(obj, default=attr_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            return self._dumpb_stdlib(obj)
+        # orjson writes NaN and Infinity as null, only documents with a null are checked for them.
+        if b'null' in data and _has_non_finite(obj):
+            return self._dumpb_stdlib(obj)
+        return data
+
+    def _dumpb_ujson(self, obj):
+        return self.dumps(obj).encode('utf-8')
+
+    @staticmethod
+    def _dumpb_stdlib(obj):
+        return json.dumps(obj, default=attr_default).encode('utf-8')
+
+
+def _has_non_finite(obj):
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(value) for value in obj)
+    return False
+
+
+if orjson is not None:
+    # Datetimes and dataclasses go through attr_default and are refused like the json module does.
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+_encoder = JSONEncoder('stdlib')
+
+
+def configure(name):
+    """
+    Selects the encoder used by ``dumpb`` and ``dumps``.
+    """
+    global _encoder
+    _encoder = JSONEncoder(name)
+    _log.debug(f"Serializing JSON with {_encoder.name}.")
+    return _encoder
+
+
+def dumpb(obj):
+    return _encoder.dumpb(obj)
+
+
+def dumps(obj):
+    return _encoder.dumps(obj)
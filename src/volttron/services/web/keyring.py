@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import logging
+import os
+
+import gevent
+
+from cryptography.hazmat.primitives import serialization
+from gevent import ssl
+from watchdog.events import FileSystemEventHandler
+from watchdog_gevent import Observer
+
+from volttron.utils.certs import CertWrapper
+
+_log = logging.getLogger(__name__)
+
+
+class _KeyringReloader(FileSystemEventHandler):
+    # Seconds to wait for further changes, replacing a certificate and its key is one reload.
+    delay = 1.0
+
+    def __init__(self, keyring):
+        super(_KeyringReloader, self).__init__()
+        self._keyring = keyring
+        self._pending = None
+        # Observers without gevent support dispatch events from a thread of their own.
+        self._loop = gevent.get_hub().loop
+
+    def on_any_event(self, event):
+        if event.event_type in ('opened', 'closed_no_write'):
+            return
+        paths = {os.path.abspath(event.src_path), os.path.abspath(getattr(event, 'dest_path', '') or '')}
+        if paths & self._keyring.files:
+            self._loop.run_callback_threadsafe(self._schedule)
+
+    def _schedule(self):
+        if self._pending is None:
+            self._pending = gevent.spawn_later(self.delay, self._reload)
+
+    def _reload(self):
+        self._pending = None
+        self._keyring.reload()
+
+
+class _ServerSSLContext(object):
+    """
+    Wraps server sockets with the current SSL context of a keyring.
+    """
+
+    def __init__(self, cert_file, key_file):
+        self.context = self.load(cert_file, key_file)
+
+    @staticmethod
+    def load(cert_file, key_file):
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        return context
+
+    def wrap_socket(self, sock, **kwargs):
+        return self.context.wrap_socket(sock, **kwargs)
+
+
+class Keyring(object):
+    """
+    The web server's certificate and private key, parsed once and shared.
+
+    The parsed public and private keys sign and verify tokens, the PEM encoded public key is
+    handed to agents, and one SSL context serves every HTTPS connection.  Once watched, the
+    keyring reloads itself when either file changes, keeping the previous keys if the new
+    files cannot be loaded, for example while they are being replaced.
+
+    :param cert_file: path of the PEM certificate
+    :param key_file: path of the PEM private key or None
+    """
+
+    def __init__(self, cert_file, key_file=None):
+        self.cert_file = os.path.abspath(cert_file)
+        self.key_file = os.path.abspath(key_file) if key_file is not None else None
+        self.public_key = None
+        self.public_key_pem = None
+        self.private_key = None
+        # Incremented with every successful load.
+        self.version = 0
+        self._listeners = []
+        self._ssl_context = None
+        self._observer = None
+        self._set(*self._read())
+
+    @property
+    def files(self):
+        return {self.cert_file, self.key_file} - {None}
+
+    def on_reload(self, callback):
+        """
+        Calls callback() after the keys were reloaded.
+        """
+        self._listeners.append(callback)
+
+    def ssl_context(self):
+        """
+        Returns the server side SSL context using the certificate and private key.
+
+        Only its ``wrap_socket`` method is provided, which uses the reloaded keys for
+        connections accepted after a reload.
+        """
+        if self._ssl_context is None:
+            self._ssl_context = _ServerSSLContext(self.cert_file, self.key_file)
+        return self._ssl_context
+
+    def reload(self):
+        """
+        Loads the keys again.
+
+        :return: True if the keys were loaded
+        """
+        try:
+            keys = self._read()
+            context = _ServerSSLContext.load(self.cert_file, self.key_file) \
+                if self._ssl_context is not None else None
+        except Exception as e:
+            _log.error(f"Could not reload {self.cert_file}, keeping the previous keys: {e}")
+            return False
+        self._set(*keys)
+        if context is not None:
+            self._ssl_context.context = context
+        _log.info(f"Reloaded keys of {self.cert_file}.")
+        for callback in self._listeners:
+            callback()
+        return True
+
+    def watch(self):
+        if self._observer is not None:
+            return
+        self._observer = Observer()
+        handler = _KeyringReloader(self)
+        for directory in {os.path.dirname(path) for path in self.files}:
+            self._observer.schedule(handler, directory)
+        self._observer.start()
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    def _read(self):
+        public_key = CertWrapper.load_cert(self.cert_file).public_key()
+        private_key = None
+        if self.key_file is not None:
+            private_key = CertWrapper.load_key(self.key_file)
+            if private_key.public_key().public_numbers() != public_key.public_numbers():
+                raise ValueError(f"{self.key_file} is not the key of {self.cert_file}")
+        return public_key, private_key
+
+    def _set(self, public_key, private_key):
+        self.public_key_pem = public_key.public_bytes(encoding=serialization.Encoding.PEM,
+                                                      format=serialization.PublicFormat.SubjectPublicKeyInfo
+                                                      ).decode('utf-8')
+        self.public_key = public_key
+        self.private_key = private_key
+        self.version += 1
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import logging
+import time
+
+from gevent.threadpool import ThreadPool
+
+try:
+    from passlib.hash import argon2
+except ImportError:
+    argon2 = None
+
+_log = logging.getLogger(__name__)
+
+
+class PasswordHasher(object):
+    """
+    Hashes and verifies passwords in a pool of native threads.
+
+    Argon2 is deliberately slow and memory hard, run in a request greenlet it would stall every
+    other request and websocket for the duration.  The pool runs at most ``max_concurrent``
+    operations at once, further ones wait for a thread while the hub keeps serving requests.
+
+    :param scheme: passlib hash providing ``hash`` and ``verify``, argon2 by default
+    """
+
+    def __init__(self, max_concurrent=2, scheme=None, clock=time.monotonic):
+        self.scheme = scheme if scheme is not None else argon2
+        self.max_concurrent = max_concurrent
+        self._pool = ThreadPool(max_concurrent)
+        self._clock = clock
+        self._pending = 0
+        self._verified = 0
+        self._rejected = 0
+        self._hashed = 0
+        self._verify_time = 0.0
+        self._verify_max = 0.0
+
+    def hash(self, password):
+        """
+        Returns the hash of a password.
+        """
+        hashed = self._run('hash', password)
+        self._hashed += 1
+        return hashed
+
+    def verify(self, password, hashed):
+        """
+        Returns True when the password matches the hash.
+        """
+        start = self._clock()
+        matched = self._run('verify', password, hashed)
+        elapsed = self._clock() - start
+        self._verified += 1
+        self._verify_time += elapsed
+        self._verify_max = max(self._verify_max, elapsed)
+        if not matched:
+            self._rejected += 1
+        return matched
+
+    def stats(self):
+        """
+        Returns the operation counts, the number of operations running and waiting for a thread,
+        and the mean and maximum verification latency in seconds, including time spent waiting.
+        """
+        return dict(verified=self._verified, rejected=self._rejected, hashed=self._hashed,
+                    active=min(self._pending, self.max_concurrent),
+                    queued=max(0, self._pending - self.max_concurrent),
+                    verify_latency_mean=self._verify_time / self._verified if self._verified else 0.0,
+                    verify_latency_max=self._verify_max)
+
+    def close(self):
+        self._pool.kill()
+
+    def _run(self, operation, *args):
+        if self.scheme is None:
+            raise ValueError("passlib with argon2 support is required to hash passwords.")
+        self._pending += 1
+        try:
+            return self._pool.apply(getattr(self.scheme, operation), args)
+        finally:
+            self._pending -= 1
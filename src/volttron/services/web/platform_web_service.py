@@ -26,6 +26,7 @@ from __future__ import annotations
 
 import base64
 import gevent
+import gevent.pool
 import gevent.pywsgi
 import jwt
 import logging
@@ -38,19 +39,32 @@ from collections import defaultdict
 from gevent import Greenlet
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pathlib import Path
+from typing import Literal
 from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field, model_validator, SecretStr
 from werkzeug import Response
 
 from ws4py.server.geventserver import WSGIServer
 
+from . import json_encoder
 from .admin_endpoints import AdminEndpoints
+from .archive import ArchiveFiles
+from .cache import ClaimsCache, LRUCache, ResponseCache, agent_response_etag, etag_matches
 from .vui_endpoints import VUIEndpoints
 from .authenticate_endpoint import AuthenticateEndpoints
 from .csr_endpoints import CSREndpoints
+from .keyring import Keyring
+from .passwords import PasswordHasher
+from .request_body import REQUEST_BODY_KEY, RequestBody, RequestEntityTooLarge
+from .resilience import CircuitBreaker, PeerBulkhead, PeerUnavailable, SingleFlight
+from .revocation import RevocationList
+from .routing import RouteTable
+from .static import StaticFiles, StaticWSGIHandler
+from .streaming import StreamedResponse, stream_response
+from .user_store import UserStore
 from .webapp import WebApplicationWrapper
 
 
-from volttron.utils.certs import Certs, CertWrapper
+from volttron.utils.certs import Certs
 from volttron.utils.context import ClientContext
 from volttron.utils.jsonrpc import INVALID_REQUEST, UNHANDLED_EXCEPTION, UNAUTHORIZED, UNAVAILABLE_PLATFORM
 
@@ -88,6 +102,12 @@ tplenv = Environment(
     autoescape=select_autoescape(['html', 'xml'])
 )
 
+class RateLimit(BaseModel):
+    # Sustained requests per second and the number of requests allowed in a burst.
+    rate: float = Field(gt=0)
+    burst: int = Field(ge=1)
+
+
 class WebServiceConfig(BaseModel):
     model_config = ConfigDict(extra='allow', populate_by_name=True, validate_assignment=True)
     bind_address: AnyHttpUrl = Field(validation_alias='bind_web_address')
@@ -95,6 +115,65 @@ class WebServiceConfig(BaseModel):
     secret_key: SecretStr | None = Field(default=None, alias='web_secret_key')
     ssl_key: str | None = Field(default=None, alias='web_ssl_key')
     ssl_cert: str | None = Field(default=None, alias='web_ssl_cert')
+    # Number of (path, method) route resolutions remembered between requests.
+    route_cache_size: int = Field(default=1024, ge=0)
+    # Requests with a body larger than this many bytes are rejected with 413, None for no limit.
+    max_request_body_size: int | None = Field(default=None, ge=0)
+    # Concurrent route callbacks allowed per agent, and how many more may wait for a slot.
+    peer_max_in_flight: int = Field(default=16, ge=1)
+    peer_max_queued: int = Field(default=32, ge=0)
+    peer_queue_timeout: float = Field(default=5.0, gt=0)
+    # Consecutive timeouts or unreachable errors before an agent's routes fail fast, and for how long.
+    peer_failure_threshold: int = Field(default=3, ge=1)
+    peer_reset_timeout: float = Field(default=30.0, gt=0)
+    # Share one route callback between identical GET requests to an agent that arrive concurrently.
+    coalesce_agent_gets: bool = False
+    # Bytes of agent responses kept for requests the agents marked cacheable, 0 disables the cache.
+    response_cache_max_bytes: int = Field(default=16 * 1024 * 1024, ge=0)
+    # Connections served at once (None for unbounded), and the requests processed concurrently
+    # with how many more may queue and for how long before being shed with 503.
+    server_pool_size: int | None = Field(default=4096, ge=1)
+    max_concurrent_requests: int = Field(default=256, ge=1)
+    max_queued_requests: int = Field(default=1024, ge=0)
+    max_request_wait: float = Field(default=10.0, gt=0)
+    # Token bucket limits per client address, per authenticated user and per route prefix.
+    # Requests over a limit are rejected with 429.
+    rate_limit_per_ip: RateLimit | None = None
+    rate_limit_per_user: RateLimit | None = None
+    rate_limit_per_route: dict[str, RateLimit] = Field(default_factory=dict)
+    # Bytes of small files from path routes kept in memory and the largest file kept, larger
+    # files are sent with sendfile.  Metadata of files outside watched roots is rechecked after
+    # static_stat_ttl seconds.
+    static_cache_max_bytes: int = Field(default=8 * 1024 * 1024, ge=0)
+    static_cache_max_file_size: int = Field(default=256 * 1024, ge=0)
+    static_stat_ttl: float = Field(default=2.0, ge=0)
+    # Write gzip (and brotli when installed) variants of the files of every path root in the
+    # background, into static_precompressed_dir or VOLTTRON_HOME/web-static-cache.
+    static_precompress: bool = False
+    static_precompressed_dir: str | None = None
+    # Cache-Control of files from path roots registered without one, and of files whose name
+    # contains a content hash.
+    static_cache_control: str = 'no-cache'
+    static_immutable_cache_control: str = 'public, max-age=31536000, immutable'
+    # Compress responses of at least compression_min_size bytes for clients accepting gzip, or
+    # brotli when installed, at the given gzip level and brotli quality.
+    compression_enabled: bool = True
+    compression_min_size: int = Field(default=1024, ge=0)
+    compression_level: int = Field(default=6, ge=1, le=9)
+    compression_brotli_quality: int = Field(default=4, ge=0, le=11)
+    # Verified token claims remembered until the token expires, and at most claims_cache_max_age
+    # seconds.  0 disables the cache.
+    claims_cache_size: int = Field(default=4096, ge=0)
+    claims_cache_max_age: float = Field(default=300.0, gt=0)
+    # Seconds to wait for each page of a response streamed by an agent.
+    stream_page_timeout: float = Field(default=60.0, gt=0)
+    # Serializer of JSON responses, 'auto' uses orjson or ujson when installed.  Their output only
+    # differs from the json module's in whitespace, escaping and UUIDs.
+    json_encoder: Literal['auto', 'orjson', 'ujson', 'stdlib'] = 'stdlib'
+    # Threads hashing and verifying passwords, bounding the logins processed at once.
+    password_hash_threads: int = Field(default=2, ge=1)
+    # Number of revoked tokens the filter checked on every request is sized for.
+    revocation_filter_capacity: int = Field(default=10000, ge=1)
 
     @model_validator(mode='after')
     def validate_auth_requirements(self) -> WebServiceConfig:
@@ -121,13 +200,43 @@ class PlatformWebService(Agent):
 
         """
         self.config = WebServiceConfig(message_bus=opts.messagebus, **opts.services.get('web', {}))
+        # Endpoints of every module serialize responses with the configured encoder.
+        json_encoder.configure(self.config.json_encoder)
         with set_agent_identity(self.Meta.identity):
             super().__init__(address=opts.service_address, **kwargs)
 
         self.endpoints = {}  # Maps from endpoint to peer.
         self.peer_routes = defaultdict(list)
         self.path_routes = defaultdict(list)
-        self.registered_routes = []
+        self.registered_routes = RouteTable()
+        # Bumped whenever endpoints or routes change so cached resolutions are never reused.
+        self._route_generation = 0
+        self._route_cache = LRUCache(self.config.route_cache_size)
+        self._peer_bulkhead = PeerBulkhead(max_in_flight=self.config.peer_max_in_flight,
+                                           max_queued=self.config.peer_max_queued,
+                                           queue_timeout=self.config.peer_queue_timeout)
+        self._peer_breaker = CircuitBreaker((gevent.Timeout, Unreachable),
+                                            failure_threshold=self.config.peer_failure_threshold,
+                                            reset_timeout=self.config.peer_reset_timeout)
+        self._single_flight = SingleFlight()
+        self._response_cache = ResponseCache(self.config.response_cache_max_bytes) \
+            if self.config.response_cache_max_bytes else None
+        self._claims_cache = ClaimsCache(self.config.claims_cache_size, max_age=self.config.claims_cache_max_age)
+        self._password_hasher = PasswordHasher(self.config.password_hash_threads)
+        precompressed_dir = None
+        if self.config.static_precompress:
+            precompressed_dir = self.config.static_precompressed_dir or \
+                os.path.join(ClientContext.get_volttron_home(), 'web-static-cache')
+        self._static_files = StaticFiles(max_cached_bytes=self.config.static_cache_max_bytes,
+                                         max_cached_file_size=self.config.static_cache_max_file_size,
+                                         stat_ttl=self.config.static_stat_ttl,
+                                         precompressed_dir=precompressed_dir,
+                                         cache_control=self.config.static_cache_control,
+                                         immutable_cache_control=self.config.static_immutable_cache_control,
+                                         compress_min_size=self.config.compression_min_size
+                                         if self.config.compression_enabled else None)
+        # Maps path route root directories to the Cache-Control their agent registered them with.
+        self._path_cache_control = {}
 
         # Initialize the mimetypes so that we can guess at the passed mimetype
         if not mimetypes.inited:
@@ -139,6 +248,12 @@ class PlatformWebService(Agent):
         self.appContainer: WebApplicationWrapper | None = None
         self._server_greenlet: Greenlet | None = None
         self._admin_endpoints: AdminEndpoints | None = None
+        # Keys signing and verifying tokens, and the keys of the HTTPS server which are the same
+        # unless on rmq.
+        self._keyring: Keyring | None = None
+        self._server_keyring: Keyring | None = None
+        self._user_store: UserStore | None = None
+        self._revocations: RevocationList | None = None
         self._vui_endpoints: VUIEndpoints | None = None
 
     @property
@@ -160,6 +275,16 @@ class PlatformWebService(Agent):
     def onsetup(self, sender, **kwargs):
         self.vip.rpc.export(self._auto_allow_csr, 'auto_allow_csr')
         self.vip.rpc.export(self._is_auto_allow_csr, 'is_auto_allow_csr')
+        self.vip.peerlist.onadd.connect(self._on_peer_added)
+        self.vip.peerlist.ondrop.connect(self._on_peer_dropped)
+
+    def _on_peer_added(self, sender, peer, **kwargs):
+        self._peer_breaker.peer_connected(peer)
+
+    def _on_peer_dropped(self, sender, peer, **kwargs):
+        # Fail the routes of a disconnected agent immediately rather than waiting on timeouts.
+        if peer in self.peer_routes or any(p == peer for p, _ in self.endpoints.values()):
+            self._peer_breaker.peer_disconnected(peer)
 
     def _is_auto_allow_csr(self):
         return self._csr_endpoints.auto_allow_csr
@@ -176,21 +301,27 @@ class PlatformWebService(Agent):
 
     @RPC.export
     def get_user_claims(self, bearer):
+        from ..web import NotAuthorized
+        if self._revocations is not None and self._revocations.is_revoked(bearer):
+            raise NotAuthorized("Token has been revoked")
+        # Tokens seen before skip signature verification and loading the public key.
+        claims = self._claims_cache.get(bearer)
+        if claims is None:
+            claims = self._verify_bearer(bearer)
+            self._claims_cache.put(bearer, claims)
+        return dict(claims) if claims.get('grant_type') == 'access_token' else {}
+
+    def _verify_bearer(self, bearer):
         from ..web import get_user_claim_from_bearer
-        if self.config.message_bus == 'rmq':
-            claims = get_user_claim_from_bearer(bearer,
-                                                tls_public_key=self._certs.get_cert_public_key(
-                                                    ClientContext.get_fq_identity(self.core.identity)))
-        elif self.ssl_cert is not None:
-            claims = get_user_claim_from_bearer(bearer,
-                                                tls_public_key=CertWrapper.get_cert_public_key(self.ssl_cert))
+        if self._keyring is not None:
+            claims = get_user_claim_from_bearer(bearer, tls_public_key=self._keyring.public_key)
         elif self.config.secret_key is not None:
             claims = get_user_claim_from_bearer(bearer, web_secret_key=self.config.secret_key.get_secret_value())
 
         else:
             raise ValueError("Configuration error secret key or web ssl cert must be not None.")
 
-        return claims if claims.get('grant_type') == 'access_token' else {}
+        return claims
 
     @RPC.export
     def websocket_send(self, endpoint, message):
@@ -220,7 +351,13 @@ class PlatformWebService(Agent):
         """
         RPC method to register a dynamic route.
 
+        Responses of 'raw' endpoints are (status, body, headers) tuples with a base64 encoded
+        body.  'bytes' endpoints return the same tuples with the body as bytes, which are sent
+        as is, or as a str which is sent utf-8 encoded.  Other endpoints return json documents
+        or (body, headers) tuples.
+
         :param endpoint:
+        :param res_type: 'raw', 'bytes', 'jsonrpc' or 'endpoint'
         :return:
         """
         # Get calling identity from whom the request came from
@@ -235,6 +372,7 @@ class PlatformWebService(Agent):
                 "Endpoint {} is already an endpoint".format(endpoint))
 
         self.endpoints[endpoint] = (identity, res_type)
+        self._routes_changed()
 
     @RPC.export
     def register_agent_route(self, regex, fn):
@@ -255,6 +393,7 @@ class PlatformWebService(Agent):
         compiled = re.compile(regex)
         self.peer_routes[identity].append(compiled)
         self.registered_routes.insert(0, (compiled, 'peer_route', (identity, fn)))
+        self._routes_changed()
 
     @RPC.export
     def unregister_all_agent_routes(self):
@@ -263,20 +402,35 @@ class PlatformWebService(Agent):
 
         _log.info('Unregistering agent routes for: {}'.format(identity))
         for regex in self.peer_routes[identity]:
-            out = [cp for cp in self.registered_routes if cp[0] != regex]
-            self.registered_routes = out
+            self.registered_routes.remove_pattern(regex)
         del self.peer_routes[identity]
-        for regex in self.path_routes[identity]:
-            out = [cp for cp in self.registered_routes if cp[0] != regex]
-            self.registered_routes = out
-        del self.path_routes[identity]
+        patterns = set(self.path_routes.pop(identity, []))
+        for regex, route_type, root in [route for route in self.registered_routes
+                                        if route[1] in ('path', 'archive') and route[0] in patterns]:
+            self.registered_routes.remove_pattern(regex)
+            if route_type == 'archive':
+                self._path_cache_control.pop(root.path, None)
+                root.close()
+                continue
+            self._static_files.unwatch(root)
+            if not any(route[1] == 'path' and route[2] == root for route in self.registered_routes):
+                self._path_cache_control.pop(root, None)
 
         endpoints = self.endpoints.copy()
         endpoints = {i:endpoints[i] for i in endpoints if endpoints[i][0] != identity}
         self.endpoints = endpoints
+        if self._response_cache is not None:
+            self._response_cache.clear()
+        self._routes_changed()
 
     @RPC.export
-    def register_path_route(self, regex, root_dir):
+    def register_path_route(self, regex, root_dir, cache_control=None):
+        """
+        Serves the files of root_dir for paths matching regex.
+
+        :param cache_control: Cache-Control header sent with the files, the configured
+            static_cache_control when None
+        """
         # Get calling identity from whom the request came from
         identity = self.vip.rpc.context.vip_message.peer
 
@@ -291,6 +445,33 @@ class PlatformWebService(Agent):
         # in order for this agent to pass against the default route we want this
         # to be before the last route which will resolve to .*
         self.registered_routes.insert(len(self.registered_routes) - 1, (compiled, 'path', root_dir))
+        if cache_control is not None:
+            self._path_cache_control[root_dir] = cache_control
+        self._add_static_root(root_dir)
+        self._routes_changed()
+
+    @RPC.export
+    def register_archive_route(self, regex, archive_path, cache_control=None):
+        """
+        Serves the files of a zip or tar archive for paths matching regex, without extracting it.
+
+        Members are looked up by request path, the archive is indexed once when registered.
+
+        :param cache_control: Cache-Control header sent with the files, the configured
+            static_cache_control when None
+        """
+        identity = self.vip.rpc.context.vip_message.peer
+
+        _log.info(f'Registering web archive route from {identity} regex: {regex} archive: {archive_path}')
+
+        compiled = re.compile(regex)
+        archive = ArchiveFiles(archive_path)
+        self.path_routes[identity].append(compiled)
+        if cache_control is not None:
+            self._path_cache_control[archive.path] = cache_control
+        # Like path routes, archives are matched before the default route which will resolve to .*
+        self.registered_routes.insert(len(self.registered_routes) - 1, (compiled, 'archive', archive))
+        self._routes_changed()
 
     @RPC.export
     def register_websocket(self, endpoint):
@@ -301,6 +482,7 @@ class PlatformWebService(Agent):
         _log.debug('REGISTERING ENDPOINT: {}'.format(endpoint))
         if self.appContainer:
             self.appContainer.create_ws_endpoint(endpoint, identity)
+            self._routes_changed()
         else:
             _log.error('Attempting to register endpoint without web'
                        'subsystem initialized')
@@ -314,6 +496,103 @@ class PlatformWebService(Agent):
 
         _log.debug('Caller identity: {}'.format(identity))
         self.appContainer.destroy_ws_endpoint(endpoint)
+        self._routes_changed()
+
+    @RPC.export
+    def get_route_cache_stats(self):
+        """
+        Returns the hit and miss counters of the route resolution cache.
+
+        :return: dictionary with hits, misses, size and maxsize keys
+        """
+        return self._route_cache.stats()
+
+    @RPC.export
+    def get_peer_stats(self):
+        """
+        Returns the in flight, queued and rejected route callback counts and the circuit
+        breaker state of each agent.
+        """
+        stats = defaultdict(dict)
+        for peer, counts in self._peer_bulkhead.stats().items():
+            stats[peer].update(counts)
+        for peer, circuit in self._peer_breaker.stats().items():
+            stats[peer]['circuit'] = circuit
+        for peer, coalesced in self._single_flight.stats().items():
+            stats[peer]['coalesced'] = coalesced
+        return dict(stats)
+
+    @RPC.export
+    def get_response_cache_stats(self):
+        """
+        Returns the hit, miss and size counters of the agent response cache.
+        """
+        return self._response_cache.stats() if self._response_cache is not None else {}
+
+    @RPC.export
+    def get_admission_stats(self):
+        """
+        Returns the active and queued request counts and the admitted and shed counts per priority.
+        """
+        return self.appContainer.admission.stats() if self.appContainer is not None else {}
+
+    @RPC.export
+    def get_static_file_stats(self):
+        """
+        Returns the hit and miss counts of the static file metadata, path resolution and content caches.
+        """
+        return self._static_files.stats()
+
+    @RPC.export
+    def get_claims_cache_stats(self):
+        """
+        Returns the hit and miss counters of the verified token claims cache.
+        """
+        return self._claims_cache.stats()
+
+    @RPC.export
+    def get_password_stats(self):
+        """
+        Returns the password verification and hashing counts, the operations in progress and
+        the verification latency.
+        """
+        return self._password_hasher.stats()
+
+    @RPC.export
+    def get_revocation_stats(self):
+        """
+        Returns the number of revoked tokens and the checks and false positives of their filter.
+        """
+        return self._revocations.stats() if self._revocations is not None else {}
+
+    @RPC.export
+    def get_rate_limit_stats(self):
+        """
+        Returns the number of tracked keys and rejected requests of each rate limit.
+        """
+        return self.appContainer.rate_limiter.stats() if self.appContainer is not None else {}
+
+    def _routes_changed(self):
+        self._route_generation += 1
+        self._route_cache.clear()
+
+    def _resolve_route(self, path_info, method):
+        """
+        Resolves the request path to either an agent endpoint or a registered route.
+
+        Resolutions are cached under the current route generation so a change in the
+        registrations, even one made while a request is being resolved, invalidates them.
+
+        :return: tuple of (peer, res_type, route) where route is None if an endpoint matched
+        """
+        key = (self._route_generation, path_info, method)
+        resolved = self._route_cache.get(key)
+        if resolved is None:
+            peer, res_type = self.endpoints.get(path_info, (None, None))
+            route = None if peer else self.registered_routes.match(path_info)
+            resolved = (peer, res_type, route)
+            self._route_cache.put(key, resolved)
+        return resolved
 
     def _redirect_index(self, env, start_response, data=None):
         """ Redirect to the index page.
@@ -419,26 +698,33 @@ class PlatformWebService(Agent):
                    'HTTP_ACCEPT_ENCODING', 'HTTP_COOKIE', 'CONTENT_TYPE',
                    'HTTP_AUTHORIZATION', 'SERVER_NAME', 'wsgi.url_scheme',
                    'HTTP_HOST']
-        data = env['wsgi.input'].read().decode('utf-8')
+        # The body is only read once a handler that consumes it has been found.
+        body = RequestBody(env, max_size=self.config.max_request_body_size)
+        env[REQUEST_BODY_KEY] = body
+        if body.exceeds_limit():
+            return self._payload_too_large(start_response)
         passenv = dict(
             (envlist[i], env[envlist[i]]) for i in range(0, len(envlist)) if envlist[i] in env.keys())
 
         _log.debug('path_info is: {}'.format(path_info))
         # Get the peer responsible for dealing with the endpoint.  If there
         # isn't a peer then fall back on the other methods of routing.
-        (peer, res_type) = self.endpoints.get(path_info, (None, None))
+        peer, res_type, route = self._resolve_route(path_info, env.get('REQUEST_METHOD'))
         _log.debug('Peer path_info is associated with: {}'.format(peer))
 
-        if self.is_json_content(env):
-            data = jsonapi.loads(data)
+        data = None
+        if peer or (route is not None and route[1] not in ('path', 'archive')):
+            try:
+                data = self._get_request_data(env)
+            except RequestEntityTooLarge:
+                return self._payload_too_large(start_response)
 
         # Only if https available and rmq for the admin area.
         if env['wsgi.url_scheme'] == 'https' and self.config.message_bus == 'rmq':
             # Load the publickey that was used to sign the login message through the env
             # parameter so agents can use it to verify the Bearer has specific
             # jwt claims
-            passenv['WEB_PUBLIC_KEY'] = env['WEB_PUBLIC_KEY'] = self._certs.get_cert_public_key(
-                ClientContext.get_fq_identity(self.core.identity)).decode('utf-8')
+            passenv['WEB_PUBLIC_KEY'] = env['WEB_PUBLIC_KEY'] = self._keyring.public_key_pem
 
         # if we have a peer then we expect to call that peer's web subsystem
         # callback to perform whatever is required of the method.
@@ -446,13 +732,12 @@ class PlatformWebService(Agent):
             _log.debug('Calling peer {} back with env={} data={}'.format(
                 peer, passenv, data
             ))
-            res = self.vip.rpc.call(peer, 'route.callback',
-                                    passenv, data).get(timeout=60)
-
-            if res_type == "jsonrpc":
-                return self.create_response(res, start_response)
-            elif res_type == "raw":
-                return self.create_raw_response(res, start_response)
+            try:
+                return self._agent_response(env, start_response, peer, 'route.callback', passenv, data,
+                                            timeout=60, raw=res_type in ("raw", "bytes"),
+                                            base64_body=res_type == "raw")
+            except PeerUnavailable as e:
+                return self._service_unavailable(start_response, e.retry_after)
 
         env['JINJA2_TEMPLATE_ENV'] = tplenv
 
@@ -462,51 +747,156 @@ class PlatformWebService(Agent):
         if 'ws4py.socket' in env:
             return env['ws4py.socket'](env, start_response)
 
-        for k, t, v in self.registered_routes:
-            if k.match(path_info):
-                _log.debug("MATCHED:\npattern: {}, path_info: {}\n v: {}"
-                           .format(k.pattern, path_info, v))
-                _log.debug('registered route t is: {}'.format(t))
-                if t == 'callable':  # Generally for locally called items.
-                    # Changing signature of the "locally" called points to return
-                    # a Response object. Our response object then will in turn
-                    # be processed and the response will be written back to the
-                    # calling client.
-                    try:
-                        retvalue = v(env, start_response, data)
-                    except TypeError:
-                        response = v(env, data)
-                        return response(env, start_response)
-                        # retvalue = self.process_response(start_response, v(env, data))
-
-                    if isinstance(retvalue, Response):
-                        return retvalue(env, start_response)
-                    else:
-                        return retvalue[0]
-
-                elif t == 'peer_route':  # RPC calls from agents on the platform
-                    _log.debug('Matched peer_route with pattern {}'.format(
-                        k.pattern))
-                    peer, fn = (v[0], v[1])
-                    res = self.vip.rpc.call(peer, fn, passenv, data).get(
-                        timeout=120)
-                    return self.create_response(res, start_response)
-
-                elif t == 'path':  # File service from agents on the platform.
-                    if path_info == '/':
-                        return self._redirect_index(env, start_response)
-                    server_path = v + path_info  # os.path.join(v, path_info)
-                    server_path = str(Path(server_path).resolve())
-                    _log.debug('Serverpath: {}'.format(server_path))
-                    # protects against relative server traversal.
-                    if not server_path.startswith(v):
-                        start_response('403 Forbidden', [('Content-Type', 'text/html')])
-                        return [b'<h1>403 Forbidden</h1>']
-                    return self._sendfile(env, start_response, server_path)
+        if route is not None:
+            k, t, v = route
+            _log.debug("MATCHED:\npattern: {}, path_info: {}\n v: {}"
+                       .format(k.pattern, path_info, v))
+            _log.debug('registered route t is: {}'.format(t))
+            if t == 'callable':  # Generally for locally called items.
+                # Changing signature of the "locally" called points to return
+                # a Response object. Our response object then will in turn
+                # be processed and the response will be written back to the
+                # calling client.
+                try:
+                    retvalue = v(env, start_response, data)
+                except TypeError:
+                    response = v(env, data)
+                    return response(env, start_response)
+                    # retvalue = self.process_response(start_response, v(env, data))
+
+                if isinstance(retvalue, Response):
+                    return retvalue(env, start_response)
+                else:
+                    return retvalue[0]
+
+            elif t == 'peer_route':  # RPC calls from agents on the platform
+                _log.debug('Matched peer_route with pattern {}'.format(
+                    k.pattern))
+                peer, fn = (v[0], v[1])
+                try:
+                    return self._agent_response(env, start_response, peer, fn, passenv, data, timeout=120)
+                except PeerUnavailable as e:
+                    return self._service_unavailable(start_response, e.retry_after)
+
+            elif t == 'path':  # File service from agents on the platform.
+                if path_info == '/':
+                    return self._redirect_index(env, start_response)
+                server_path = self._static_files.resolve(v, path_info)
+                _log.debug('Serverpath: {}'.format(server_path))
+                if server_path is None:
+                    start_response('403 Forbidden', [('Content-Type', 'text/html')])
+                    return [b'<h1>403 Forbidden</h1>']
+                return self._sendfile(env, start_response, server_path, self._path_cache_control.get(v))
+
+            elif t == 'archive':  # Files from archives registered by agents on the platform.
+                if path_info == '/':
+                    return self._redirect_index(env, start_response)
+                return self._static_files.serve(env, start_response, path_info,
+                                                cache_control=self._path_cache_control.get(v.path), source=v)
 
         start_response('404 Not Found', [('Content-Type', 'text/html')])
         return [b'<h1>Not Found</h1>']
 
+    def _get_request_data(self, env):
+        """
+        Reads the request body as text, or bytes for binary payloads, decoding json content.
+        """
+        data = env[REQUEST_BODY_KEY].text()
+        if self.is_json_content(env):
+            data = jsonapi.loads(data)
+        return data
+
+    def _call_peer(self, peer, method, passenv, data, timeout):
+        """
+        Calls the agent's route method through the peer's circuit breaker and bulkhead.
+
+        When coalesce_agent_gets is enabled, concurrent GET requests for the same path, query
+        and credentials share a single call.
+
+        :raises PeerUnavailable: when the call is refused without reaching the agent.
+        """
+        def call():
+            with self._peer_breaker.guard(peer), self._peer_bulkhead.limit(peer):
+                return self.vip.rpc.call(peer, method, passenv, data).get(timeout=timeout)
+
+        if self.config.coalesce_agent_gets and passenv.get('REQUEST_METHOD') == 'GET':
+            key = (method,) + tuple(passenv.get(k) for k in ('PATH_INFO', 'QUERY_STRING', 'HTTP_AUTHORIZATION',
+                                                             'HTTP_COOKIE', 'HTTP_ACCEPT_ENCODING'))
+            # A stream can only be read once, so it is never shared.
+            return self._single_flight.call(peer, key, call, shareable=lambda res: stream_response(res) is None)
+        return call()
+
+    def _agent_response(self, env, start_response, peer, method, passenv, data, timeout, raw=False,
+                        base64_body=True):
+        """
+        Builds the response to a request handled by an agent.
+
+        GET requests are answered from the response cache when the agent marked an earlier
+        response cacheable, and requests whose If-None-Match matches the response's ETag are
+        answered with 304.  Responses the agent streams, see :func:`stream_response`, are
+        written as their pages arrive and never cached.
+
+        :param raw: True if the response is a (status, body, headers) tuple
+        :param base64_body: True if the body of a raw response is base64 encoded
+
+        :raises PeerUnavailable: when the call is refused without reaching the agent.
+        """
+        cacheable = self._response_cache is not None and env.get('REQUEST_METHOD') == 'GET'
+        key = (peer, method, passenv.get('PATH_INFO'), passenv.get('QUERY_STRING'))
+        if_none_match = env.get('HTTP_IF_NONE_MATCH')
+
+        entry = self._response_cache.lookup(key, env) if cacheable else None
+        if entry is not None:
+            if etag_matches(if_none_match, entry.etag):
+                return self._not_modified(start_response, entry.etag)
+            res = entry.response
+        else:
+            res = self._call_peer(peer, method, passenv, data, timeout)
+            stream = stream_response(res)
+            if stream is not None:
+                return self._stream_response(start_response, peer, stream)
+            if cacheable:
+                self._response_cache.store(key, env, res, raw)
+            etag = agent_response_etag(res, raw)
+            if env.get('REQUEST_METHOD') in ('GET', 'HEAD') and etag_matches(if_none_match, etag):
+                return self._not_modified(start_response, etag)
+
+        if raw:
+            return self.create_raw_response(res, start_response, base64_body)
+        return self.create_response(res, start_response)
+
+    def _stream_response(self, start_response, peer, stream):
+        """
+        Sends a response whose body the agent streams in pages.
+
+        The body is sent with chunked transfer encoding unless the agent gave a Content-Length.
+        """
+        status, stream, headers = stream
+        handle, method = stream['stream'], stream['method']
+
+        def fetch_page():
+            with self._peer_breaker.guard(peer), self._peer_bulkhead.limit(peer):
+                return self.vip.rpc.call(peer, method, handle).get(timeout=self.config.stream_page_timeout)
+
+        def cancel():
+            self.vip.rpc.notify(peer, method, handle, True)
+
+        start_response(status, [tuple(header) for header in headers])
+        return StreamedResponse(fetch_page, cancel, base64_chunks=stream.get('encoding') == 'base64')
+
+    def _not_modified(self, start_response, etag):
+        start_response('304 Not Modified', [('ETag', etag)])
+        return [b'']
+
+    def _service_unavailable(self, start_response, retry_after):
+        start_response('503 Service Unavailable', [('Content-Type', 'text/html'),
+                                                   ('Retry-After', str(retry_after))])
+        return [b'<h1>503 Service Unavailable</h1>']
+
+    def _payload_too_large(self, start_response):
+        start_response('413 Payload Too Large', [('Content-Type', 'text/html')])
+        return [b'<h1>413 Payload Too Large</h1>']
+
     def is_json_content(self, env):
         ct = env.get('CONTENT_TYPE')
         if ct is not None and 'application/json' in ct:
@@ -524,10 +914,16 @@ class PlatformWebService(Agent):
             return [response.content.encode('utf-8')]
         return [response.content]
 
-    def create_raw_response(self, res, start_response):
+    def create_raw_response(self, res, start_response, base64_body=True):
+        """
+        Writes a (status, body, headers) response.
+
+        :param base64_body: True if the body is base64 encoded, otherwise it is bytes or text.
+        """
         # If this is a tuple then we know we are going to have a response
         # and a headers portion of the data.
         if isinstance(res, tuple) or isinstance(res, list):
+            response = b''
             if len(res) == 1:
                 status, = res
                 headers = ()
@@ -538,8 +934,17 @@ class PlatformWebService(Agent):
                 status, response, headers = res
             else:
                 raise Exception("Couldn't process raw response {}".format(res))
-            start_response(status.encode('utf-8'), headers)
-            return [base64.b64decode(response)]
+            if base64_body:
+                body = base64.b64decode(response)
+            elif isinstance(response, str):
+                body = response.encode('utf-8')
+            else:
+                body = response
+            headers = [tuple(header) for header in headers]
+            if len(res) > 1 and not any(name.lower() == 'content-length' for name, _ in headers):
+                headers.append(('Content-Length', str(len(body))))
+            start_response(status, headers)
+            return [body]
         else:
             start_response("500 Programming Error",
                            [('Content-Type', 'text/html')])
@@ -563,7 +968,7 @@ class PlatformWebService(Agent):
 
             start_response('200 OK',
                            [('Content-Type', 'application/json')])
-            return [jsonapi.dumpb(res)]
+            return [json_encoder.dumpb(res)]
         elif isinstance(res, list):
             _log.debug('list implies [content, headers] or [status, content, headers]')
             if len(res) == 2:
@@ -588,7 +993,7 @@ class PlatformWebService(Agent):
             response, headers = res
             header_dict = dict(headers)
             if header_dict.get('Content-Encoding', None) == 'gzip':
-                gzip_compress = zlib.compressobj(9, zlib.DEFLATED,
+                gzip_compress = zlib.compressobj(self.config.compression_level, zlib.DEFLATED,
                                                  zlib.MAX_WBITS | 16)
                 data = gzip_compress.compress(response) + gzip_compress.flush()
                 start_response('200 OK', headers)
@@ -598,33 +1003,16 @@ class PlatformWebService(Agent):
         else:
             start_response('200 OK',
                            [('Content-Type', 'application/json')])
-            return [jsonapi.dumpb(res)]
-
-    def _sendfile(self, env, start_response, filename):
-        from wsgiref.util import FileWrapper
-        status = '200 OK'
-        _log.debug('SENDING FILE: {}'.format(filename))
-        guess = mimetypes.guess_type(filename)[0]
-        _log.debug('MIME GUESS: {}'.format(guess))
-
-        basename = os.path.dirname(filename)
-
-        if not os.path.exists(basename):
-            start_response('404 Not Found', [('Content-Type', 'text/html')])
-            return [b'<h1>Not Found</h1>']
-        elif not os.path.isfile(filename):
-            start_response('404 Not Found', [('Content-Type', 'text/html')])
-            return [b'<h1>Not Found</h1>']
-
-        if not guess:
-            guess = 'text/plain'
+            return [json_encoder.dumpb(res)]
 
-        response_headers = [
-            ('Content-type', guess),
-        ]
-        start_response(status, response_headers)
+    def _add_static_root(self, root_dir):
+        self._static_files.watch(root_dir)
+        if self.config.static_precompress:
+            gevent.spawn(self._static_files.precompress, root_dir)
 
-        return FileWrapper(open(filename, 'rb'))
+    def _sendfile(self, env, start_response, filename, cache_control=None):
+        _log.debug('SENDING FILE: {}'.format(filename))
+        return self._static_files.serve(env, start_response, filename, cache_control=cache_control)
 
     def _to_jsonrpc_obj(self, jsonrpcstr):
         """ Convert data string into a JsonRpcData named tuple.
@@ -647,7 +1035,7 @@ class PlatformWebService(Agent):
         :return object: An JSON-RPC 2.0 response.
         """
         if env['REQUEST_METHOD'].upper() != 'POST':
-            return Response(jsonapi.dumps(jsonrpc.json_error('NA', INVALID_REQUEST,
+            return Response(json_encoder.dumpb(jsonrpc.json_error('NA', INVALID_REQUEST,
                                       'Invalid request method, only POST allowed')), content_type="application/json")
 
         try:
@@ -659,16 +1047,16 @@ class PlatformWebService(Agent):
                 if self.jsonrpc_verify_and_dispatch(rpcdata.params['authentication']):
                     del rpcdata.params['authentication']
                 else:
-                    return Response(jsonapi.dumps(jsonrpc.json_error(rpcdata.id, UNAUTHORIZED,
+                    return Response(json_encoder.dumpb(jsonrpc.json_error(rpcdata.id, UNAUTHORIZED,
                                                            "Invalid username/password specified.")),
                                         content_type="application/json")
             else:
-                return Response(jsonapi.dumps(jsonrpc.json_error(rpcdata.id, UNAUTHORIZED,
+                return Response(json_encoder.dumpb(jsonrpc.json_error(rpcdata.id, UNAUTHORIZED,
                                                                      "Authentication parameter missing.")),
                                     content_type="application/json")
 
             if not rpcdata.method:
-                return Response(jsonapi.dumps(jsonrpc.json_error(
+                return Response(json_encoder.dumpb(jsonrpc.json_error(
                     'NA', INVALID_REQUEST, 'Invalid rpc data {}'.format(data))), content_type="application/json")
             else:
                 if rpcdata.params:
@@ -677,20 +1065,20 @@ class PlatformWebService(Agent):
                     result_or_error = self.vip.rpc(rpcdata.id, rpcdata.method).get()
 
         except AssertionError:
-            return Response(jsonapi.dumps(jsonrpc.json_error(
+            return Response(json_encoder.dumpb(jsonrpc.json_error(
                 'NA', INVALID_REQUEST, 'Invalid rpc data {}'.format(data))), content_type="application/json")
         except Unreachable:
             return Response(
-                jsonapi.dumps(jsonrpc.json_error(rpcdata.id, UNAVAILABLE_PLATFORM,
+                json_encoder.dumpb(jsonrpc.json_error(rpcdata.id, UNAVAILABLE_PLATFORM,
                                                  "Couldn't reach platform with method {} params: {}".format(
                                                      rpcdata.method, rpcdata.params))),
                 content_type="application/json")
         except Exception as e:
 
-            return Response(jsonapi.dumps(jsonrpc.json_error('NA', UNHANDLED_EXCEPTION, e)),
+            return Response(json_encoder.dumpb(jsonrpc.json_error('NA', UNHANDLED_EXCEPTION, e)),
                                 content_type="application/json")
 
-        return Response(jsonapi.dumps(self._get_jsonrpc_response(rpcdata.id, result_or_error)),
+        return Response(json_encoder.dumpb(self._get_jsonrpc_response(rpcdata.id, result_or_error)),
                             content_type="application/json")
 
     def _get_jsonrpc_response(self, id, result_or_error):
@@ -736,13 +1124,13 @@ class PlatformWebService(Agent):
         ssl_key = self.config.ssl_key
         ssl_cert = self.config.ssl_cert
         rpc_caller = self.vip.rpc
+        # One watched copy of the users is shared by the admin and authenticate endpoints.
+        self._user_store = UserStore()
+        self._user_store.watch()
+        self._revocations = RevocationList(capacity=self.config.revocation_filter_capacity)
+        self._revocations.on_revoke(self._claims_cache.pop)
+
         if self.config.bind_address.scheme == 'https':
-            # Admin interface is only available to rmq at present.
-            if self.config.message_bus == 'rmq':
-                self._admin_endpoints = AdminEndpoints(rmq_mgmt=self.core.rmq_mgmt,
-                                                       ssl_public_key=self._certs.get_cert_public_key(
-                                                           ClientContext.get_fq_identity(self.core.identity)),
-                                                       rpc_caller=rpc_caller)
             if ssl_key is None or ssl_cert is None:
                 # Because the  platform.web service certificate is a client to rabbitmq we
                 # can't use it directly therefore we use the -server on the file to specify
@@ -754,11 +1142,36 @@ class PlatformWebService(Agent):
                 if not os.path.isfile(ssl_cert) or not os.path.isfile(ssl_key):
                     self._certs.create_signed_cert_files(base_filename, cert_type='server')
 
-            if ssl_key is not None and ssl_cert is not None and self._admin_endpoints is None:
-                self._admin_endpoints = AdminEndpoints(ssl_public_key=CertWrapper.get_cert_public_key(ssl_cert),
-                                                       rpc_caller=rpc_caller)
+            # Key material is parsed once here and reloaded when the files change.
+            self._server_keyring = Keyring(ssl_cert, ssl_key)
+            if self.config.message_bus == 'rmq':
+                # Tokens are signed with the key pair of the platform.web identity.
+                identity = ClientContext.get_fq_identity(self.core.identity)
+                self._keyring = Keyring(self._certs.cert_file(identity), self._certs.private_key_file(identity))
+                self._keyring.watch()
+            else:
+                self._keyring = self._server_keyring
+            self._server_keyring.watch()
+            # Claims verified with replaced keys must be verified again.
+            self._keyring.on_reload(self._claims_cache.clear)
+
+            # Admin interface is only available to rmq at present.
+            if self.config.message_bus == 'rmq':
+                self._admin_endpoints = AdminEndpoints(rmq_mgmt=self.core.rmq_mgmt,
+                                                       ssl_public_key=self._keyring.public_key_pem,
+                                                       rpc_caller=rpc_caller,
+                                                       password_hasher=self._password_hasher,
+                                                       user_store=self._user_store,
+                                                       verify_claims=self.get_user_claims)
+            else:
+                self._admin_endpoints = AdminEndpoints(ssl_public_key=self._keyring.public_key_pem,
+                                                       rpc_caller=rpc_caller,
+                                                       password_hasher=self._password_hasher,
+                                                       user_store=self._user_store,
+                                                       verify_claims=self.get_user_claims)
         else:
-            self._admin_endpoints = AdminEndpoints(rpc_caller=rpc_caller)
+            self._admin_endpoints = AdminEndpoints(rpc_caller=rpc_caller, password_hasher=self._password_hasher,
+                                                   user_store=self._user_store, verify_claims=self.get_user_claims)
         _log.info(f'Starting web server binding to {self.config.bind_address}.')
         # Handle the platform.web routes here.
         #self.registeredroutes.append((re.compile('^/discovery/$'), 'callable', self._get_discovery))
@@ -784,31 +1197,37 @@ class PlatformWebService(Agent):
 
         # Allow authentication endpoint from any https connection
         if self.config.bind_address.scheme == 'https':
-            if self.config.message_bus == 'rmq':
-                ssl_private_key = self._certs.get_pk_bytes(ClientContext.get_fq_identity(self.core.identity))
-                ssl_public_key = self._certs.get_cert_public_key(ClientContext.get_fq_identity(self.core.identity))
-            else:
-                ssl_private_key = CertWrapper.get_private_key(ssl_key)
-                ssl_public_key = CertWrapper.get_cert_public_key(self.config.ssl_cert)
-            for rt in AuthenticateEndpoints(tls_private_key=ssl_private_key, tls_public_key=ssl_public_key).get_routes():
+            for rt in AuthenticateEndpoints(keyring=self._keyring,
+                                            password_hasher=self._password_hasher,
+                                            user_store=self._user_store,
+                                            revocations=self._revocations).get_routes():
                 self.registered_routes.append(rt)
         else:
             # We don't have a private ssl key if we aren't using ssl.
-            for rt in AuthenticateEndpoints(web_secret_key=self.config.secret_key.get_secret_value()).get_routes():
+            for rt in AuthenticateEndpoints(web_secret_key=self.config.secret_key.get_secret_value(),
+                                            password_hasher=self._password_hasher,
+                                            user_store=self._user_store,
+                                            revocations=self._revocations).get_routes():
                 self.registered_routes.append(rt)
 
         static_dir = os.path.join(os.path.dirname(__file__), "static")
         self.registered_routes.append((re.compile('^/.*$'), 'path', static_dir))
+        self._add_static_root(static_dir)
+        self._routes_changed()
 
         port = int(self.config.bind_address.port)
 
         self.appContainer = WebApplicationWrapper(self, self.config.bind_address.host, port)
-        if ssl_key and ssl_cert:
+        spawn = gevent.pool.Pool(self.config.server_pool_size) if self.config.server_pool_size else 'default'
+        if self._server_keyring is not None:
+            # One SSL context serves every connection rather than loading the files per connection.
             svr = WSGIServer(((self.config.bind_address.host), port), self.appContainer,
-                             certfile=ssl_cert,
-                             keyfile=ssl_key)
+                             ssl_context=self._server_keyring.ssl_context(),
+                             spawn=spawn,
+                             handler_class=StaticWSGIHandler)
         else:
-            svr = WSGIServer(((self.config.bind_address.host), port), self.appContainer)
+            svr = WSGIServer(((self.config.bind_address.host), port), self.appContainer, spawn=spawn,
+                             handler_class=StaticWSGIHandler)
         self._server_greenlet = gevent.spawn(svr.serve_forever)
 
     def _authenticate_route(self, env, start_response, data):
@@ -829,5 +1248,11 @@ class PlatformWebService(Agent):
     @Core.receiver('onstop')
     def onstop(self, sender, **kwargs):
         _log.debug("Stopping web agent.")
+        self._static_files.stop()
+        for keyring in {self._keyring, self._server_keyring} - {None}:
+            keyring.stop()
+        if self._user_store is not None:
+            self._user_store.stop()
         if not self._server_greenlet.dead:
             self._server_greenlet.join(timeout=10)
+        self._password_hasher.close()
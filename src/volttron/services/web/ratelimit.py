@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+import math
+import time
+
+from collections import OrderedDict
+
+_log = logging.getLogger(__name__)
+
+
+class TokenBucketLimiter(object):
+    """
+    Token buckets for any number of keys.
+
+    Each key may make ``burst`` requests at once and is refilled at ``rate`` requests per
+    second.  A bucket left idle long enough to refill completely is indistinguishable from a
+    new one, so such buckets are dropped, keeping memory proportional to the active keys.
+    At most ``max_keys`` buckets are kept, evicting the least recently used.
+    """
+
+    def __init__(self, rate, burst, max_keys=100000, clock=time.monotonic):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be > 0 and burst >= 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        self._refill_time = burst / rate
+        # Maps key to a (tokens, last update) tuple, least recently updated first.
+        self._buckets = OrderedDict()
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def acquire(self, key):
+        """
+        Takes a token from the key's bucket.
+
+        :return: 0 if a token was taken, otherwise the seconds until one is available
+        """
+        now = self._clock()
+        self._expire(now)
+
+        tokens, last = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens >= 1:
+            wait = 0
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+            self.rejected += 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self):
+        return dict(keys=len(self._buckets), rejected=self.rejected)
+
+    def _expire(self, now):
+        while self._buckets:
+            key, (_, last) = next(iter(self._buckets.items()))
+            if now - last < self._refill_time:
+                break
+            del self._buckets[key]
+
+
+class RequestRateLimiter(object):
+    """
+    Applies token bucket limits to requests by client address, by user and by route prefix.
+
+    Limits are given as ``(rate, burst)`` tuples.  Route limits apply per user, or per client
+    address for anonymous requests, to paths beginning with the prefix.
+
+    :param user_key: callable returning the user key of a request environment or None
+    """
+
+    def __init__(self, per_ip=None, per_user=None, per_route=None, user_key=None, clock=time.monotonic):
+        self._per_ip = TokenBucketLimiter(*per_ip, clock=clock) if per_ip else None
+        self._per_user = TokenBucketLimiter(*per_user, clock=clock) if per_user else None
+        self._per_route = [(prefix, TokenBucketLimiter(*limit, clock=clock))
+                           for prefix, limit in sorted((per_route or {}).items(), key=lambda r: -len(r[0]))]
+        self._user_key = user_key
+
+    @property
+    def enabled(self):
+        return bool(self._per_ip or self._per_user or self._per_route)
+
+    def check(self, env):
+        """
+        Takes a token for the request from every applicable bucket.
+
+        :return: 0 if the request is allowed, otherwise the whole seconds to wait before retrying
+        """
+        client = env.get('REMOTE_ADDR')
+        if self._per_ip is not None and client:
+            wait = self._per_ip.acquire(client)
+            if wait:
+                return self._denied('address', client, wait)
+
+        user = None
+        if self._per_user is not None or self._per_route:
+            user = self._user_key(env) if self._user_key is not None else None
+
+        if self._per_user is not None and user is not None:
+            wait = self._per_user.acquire(user)
+            if wait:
+                return self._denied('user', user, wait)
+
+        path = env.get('PATH_INFO', '')
+        for prefix, limiter in self._per_route:
+            if path.startswith(prefix):
+                wait = limiter.acquire(user if user is not None else client)
+                if wait:
+                    return self._denied('route', prefix, wait)
+                break
+        return 0
+
+    def stats(self):
+        """
+        Returns the number of tracked keys and rejected requests of each limit.
+        """
+        stats = {}
+        if self._per_ip is not None:
+            stats['ip'] = self._per_ip.stats()
+        if self._per_user is not None:
+            stats['user'] = self._per_user.stats()
+        for prefix, limiter in self._per_route:
+            stats[prefix] = limiter.stats()
+        return stats
+
+    @staticmethod
+    def _denied(kind, key, wait):
+        _log.debug(f"Rate limit exceeded for {kind} {key}.")
+        return max(1, math.ceil(wait))
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import logging
+
+_log = logging.getLogger(__name__)
+
+# Keys under which the bearer token of the current request, its verified claims and the
+# error met parsing or verifying the token are stored in the wsgi environment.
+BEARER_KEY = 'volttron.bearer'
+CLAIMS_KEY = 'volttron.claims'
+AUTH_ERROR_KEY = 'volttron.auth_error'
+
+
+def authenticate_request(env, verify):
+    """
+    Parses the bearer token of a request from its Authorization header or cookie and verifies it.
+
+    Verification is left to the first handler needing the claims, after rate limiting, and the
+    token, its claims and any error are stored in the environment so the token is parsed and
+    verified once per request whichever handlers need it.  Requests without a token, or
+    whose token is invalid, have None claims.  Failing to authenticate never fails the request,
+    handlers requiring claims decide how to respond.
+
+    :param verify: callable returning the claims of a bearer token
+    :return: the claims or None
+    """
+    if CLAIMS_KEY in env:
+        return env[CLAIMS_KEY]
+    from ..web import get_bearer, NotAuthorized
+    bearer = claims = error = None
+    try:
+        bearer = get_bearer(env)
+        if not bearer:
+            raise NotAuthorized()
+        claims = verify(bearer)
+    except Exception as e:
+        error = e
+    env[BEARER_KEY] = bearer
+    env[CLAIMS_KEY] = claims
+    env[AUTH_ERROR_KEY] = error
+    return claims
+
+
+def request_claims(env, verify):
+    """
+    Returns the verified claims of a request.
+
+    :param verify: callable returning the claims of a bearer token, only used when the request
+                   was not authenticated yet
+    :raises: NotAuthorized without a token, otherwise the error met verifying the token
+    """
+    claims = authenticate_request(env, verify)
+    if claims is None:
+        raise env[AUTH_ERROR_KEY]
+    return claims
+
+
+def request_bearer(env):
+    """
+    Returns the bearer token of a request.
+
+    :raises NotAuthorized: when the Authorization header is not a bearer token
+    """
+    if env.get(BEARER_KEY) is not None:
+        return env[BEARER_KEY]
+    from ..web import get_bearer
+    return get_bearer(env)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+
+_log = logging.getLogger(__name__)
+
+# Key under which the RequestBody of the current request is stored in the wsgi environment.
+REQUEST_BODY_KEY = 'volttron.request_body'
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class RequestEntityTooLarge(Exception):
+    pass
+
+
+class RequestBody(object):
+    """
+    Lazy access to the body of a request.
+
+    Nothing is read from ``wsgi.input`` until a handler asks for the body, either all at once
+    through :meth:`read` or a chunk at a time through :meth:`iter_chunks`.  When a maximum size
+    is set the body is never read past it.
+    """
+
+    def __init__(self, env, max_size=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self._stream = env['wsgi.input']
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        try:
+            self.content_length = int(env.get('CONTENT_LENGTH') or 0) or None
+        except ValueError:
+            self.content_length = None
+        self._content = None
+        self._consumed = False
+
+    def exceeds_limit(self):
+        """
+        Returns True when the declared Content-Length is over the maximum body size.
+        """
+        return self.max_size is not None and self.content_length is not None \
+            and self.content_length > self.max_size
+
+    def iter_chunks(self, chunk_size=None):
+        """
+        Yields the body as a sequence of bytes objects.
+
+        The stream can only be iterated once unless the body has already been read with
+        :meth:`read`, in which case the buffered content is yielded.
+
+        :raises RequestEntityTooLarge: when the body grows past the maximum size.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start:start + chunk_size]
+            return
+        if self._consumed:
+            raise RuntimeError("The request body has already been consumed.")
+        if self.exceeds_limit():
+            raise RequestEntityTooLarge(f"Request body of {self.content_length} bytes is too large.")
+
+        self._consumed = True
+        received = 0
+        while True:
+            chunk = self._stream.read(chunk_size)
+            if not chunk:
+                break
+            received += len(chunk)
+            if self.max_size is not None and received > self.max_size:
+                raise RequestEntityTooLarge(f"Request body is larger than {self.max_size} bytes.")
+            yield chunk
+
+    def read(self):
+        """
+        Returns the entire body as bytes, reading it on first use.
+        """
+        if self._content is None:
+            self._content = b''.join(self.iter_chunks())
+        return self._content
+
+    def text(self, encoding='utf-8'):
+        """
+        Returns the body decoded as text, or the raw bytes when it is not valid in the encoding.
+        """
+        content = self.read()
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            return content
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+import math
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+from gevent.event import AsyncResult
+from gevent.lock import BoundedSemaphore
+
+_log = logging.getLogger(__name__)
+
+
+class PeerUnavailable(Exception):
+    """
+    Raised when a request to an agent is refused without calling it.
+
+    :param retry_after: number of seconds the client should wait before retrying
+    """
+
+    def __init__(self, peer, reason, retry_after):
+        super(PeerUnavailable, self).__init__(f"{peer} unavailable: {reason}")
+        self.peer = peer
+        self.retry_after = retry_after
+
+
+class BulkheadFull(PeerUnavailable):
+    pass
+
+
+class CircuitOpen(PeerUnavailable):
+    pass
+
+
+class PeerBulkhead(object):
+    """
+    Limits the number of concurrent requests dispatched to each agent.
+
+    Each peer may have ``max_in_flight`` calls outstanding.  Up to ``max_queued`` further
+    requests wait at most ``queue_timeout`` seconds for a slot, anything beyond that is
+    rejected immediately so a single slow agent cannot hold every server greenlet.
+    """
+
+    def __init__(self, max_in_flight=16, max_queued=32, queue_timeout=5.0):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphores = {}
+        self._queued = defaultdict(int)
+        self._in_flight = defaultdict(int)
+        self._rejected = defaultdict(int)
+
+    @property
+    def retry_after(self):
+        return max(1, math.ceil(self.queue_timeout))
+
+    @contextmanager
+    def limit(self, peer):
+        """
+        Context manager holding one of the peer's slots for the duration of the block.
+
+        :raises BulkheadFull: when no slot became available.
+        """
+        semaphore = self._semaphores.get(peer)
+        if semaphore is None:
+            semaphore = self._semaphores[peer] = BoundedSemaphore(self.max_in_flight)
+
+        if not semaphore.acquire(blocking=False):
+            if self._queued[peer] >= self.max_queued:
+                self._reject(peer, "too many queued requests")
+            self._queued[peer] += 1
+            try:
+                acquired = semaphore.acquire(timeout=self.queue_timeout)
+            finally:
+                self._queued[peer] -= 1
+            if not acquired:
+                self._reject(peer, "timed out waiting for a request slot")
+
+        self._in_flight[peer] += 1
+        try:
+            yield
+        finally:
+            self._in_flight[peer] -= 1
+            semaphore.release()
+
+    def stats(self):
+        """
+        Returns the in flight, queued and rejected request counts of every peer.
+        """
+        return {peer: dict(in_flight=self._in_flight[peer],
+                           queued=self._queued[peer],
+                           rejected=self._rejected[peer])
+                for peer in self._semaphores}
+
+    def _reject(self, peer, reason):
+        self._rejected[peer] += 1
+        _log.warning(f"Rejecting request to {peer}: {reason}.")
+        raise BulkheadFull(peer, reason, self.retry_after)
+
+
+class _Circuit(object):
+    __slots__ = ('state', 'failures', 'opened_at', 'probing', 'disconnected')
+
+    def __init__(self):
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.disconnected = False
+
+
+class CircuitBreaker(object):
+    """
+    Per-peer circuit breaker for calls to agents.
+
+    A circuit starts closed.  After ``failure_threshold`` consecutive failures it opens and
+    every call fails fast for ``reset_timeout`` seconds.  The circuit is then half-open: a single
+    probe call is let through, closing the circuit on success and reopening it on failure.
+
+    A peer known to be disconnected holds its circuit open until it reconnects.
+
+    :param failure_types: exception types which count as a failure of the agent.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_types, failure_threshold=3, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_types = failure_types
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._circuits = {}
+
+    def state(self, peer):
+        circuit = self._circuits.get(peer)
+        if circuit is None:
+            return self.CLOSED
+        if circuit.state == self.OPEN and not circuit.disconnected \
+                and self._clock() - circuit.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return circuit.state
+
+    @contextmanager
+    def guard(self, peer):
+        """
+        Context manager wrapping a call to the peer.
+
+        :raises CircuitOpen: when the circuit does not allow the call.
+        """
+        circuit = self._circuits.get(peer)
+        if circuit is None:
+            circuit = self._circuits[peer] = _Circuit()
+
+        probe = False
+        if circuit.state != self.CLOSED:
+            state = self.state(peer)
+            if state == self.OPEN:
+                raise CircuitOpen(peer, "circuit open", self._retry_after(circuit))
+            if circuit.probing:
+                raise CircuitOpen(peer, "waiting on probe", self._retry_after(circuit))
+            circuit.state = self.HALF_OPEN
+            circuit.probing = probe = True
+
+        try:
+            yield
+        except self.failure_types:
+            self._record_failure(peer, circuit)
+            raise
+        else:
+            if circuit.state != self.CLOSED:
+                _log.info(f"Circuit for {peer} closed.")
+            circuit.state = self.CLOSED
+            circuit.failures = 0
+        finally:
+            if probe:
+                circuit.probing = False
+
+    def peer_connected(self, peer):
+        circuit = self._circuits.get(peer)
+        if circuit is not None and circuit.disconnected:
+            _log.info(f"Circuit for {peer} closed, peer connected.")
+            circuit.state = self.CLOSED
+            circuit.failures = 0
+            circuit.disconnected = False
+
+    def peer_disconnected(self, peer):
+        circuit = self._circuits.get(peer)
+        if circuit is None:
+            circuit = self._circuits[peer] = _Circuit()
+        circuit.disconnected = True
+        self._open(peer, circuit)
+
+    def stats(self):
+        """
+        Returns the circuit state and consecutive failure count of every peer.
+        """
+        return {peer: dict(state=self.state(peer), failures=circuit.failures)
+                for peer, circuit in self._circuits.items()}
+
+    def _record_failure(self, peer, circuit):
+        circuit.failures += 1
+        if circuit.state == self.HALF_OPEN or circuit.failures >= self.failure_threshold:
+            self._open(peer, circuit)
+
+    def _open(self, peer, circuit):
+        if circuit.state != self.OPEN:
+            _log.warning(f"Circuit for {peer} opened after {circuit.failures} failures.")
+        circuit.state = self.OPEN
+        circuit.opened_at = self._clock()
+
+    def _retry_after(self, circuit):
+        if circuit.disconnected:
+            return max(1, math.ceil(self.reset_timeout))
+        remaining = self.reset_timeout - (self._clock() - circuit.opened_at)
+        return max(1, math.ceil(remaining))
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical concurrent calls to a peer into a single call.
+
+    The first caller for a key performs the call, callers arriving with the same key while it is
+    in flight wait for and share its result, or its exception.  Only use it for idempotent requests.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._coalesced = defaultdict(int)
+
+    def call(self, peer, key, fn, shareable=None):
+        """
+        Returns the result of fn(), sharing it with concurrent calls made with the same key.
+
+        :param peer: the peer called by fn, used to count coalesced calls
+        :param key: hashable key identifying identical calls
+        :param fn: callable making the call
+        :param shareable: callable returning False for results which can only be used once,
+                          waiting callers then make their own call
+        """
+        key = (peer, key)
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            result = pending.get()
+            if shareable is not None and not shareable(result):
+                return fn()
+            self._coalesced[peer] += 1
+            return result
+
+        pending = self._in_flight[key] = AsyncResult()
+        try:
+            result = fn()
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set(result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def stats(self):
+        """
+        Returns the number of calls to each peer that shared another call's result.
+        """
+        return dict(self._coalesced)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import hashlib
+import logging
+import math
+import os
+import time
+
+from volttron.utils.context import ClientContext
+from volttron.utils.persistance import PersistentDict
+
+_log = logging.getLogger(__name__)
+
+REVOKED_TOKENS_FILE = 'web-revoked-tokens.json'
+
+
+def token_digest(token):
+    """
+    Returns the sha256 digest identifying a token.
+    """
+    if isinstance(token, str):
+        token = token.encode('utf-8')
+    return hashlib.sha256(token).digest()
+
+
+class BloomFilter(object):
+    """
+    Set membership with false positives but no false negatives.
+
+    Sized for ``capacity`` keys at a false positive rate of ``error_rate``.  Keys are digests,
+    the probe positions are derived from their bytes by double hashing rather than hashing again.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be >= 1 and 0 < error_rate < 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, digest):
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+    def _positions(self, digest):
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:16], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+
+class RevocationList(object):
+    """
+    Tokens revoked before their expiry, persisted in ``web-revoked-tokens.json`` in VOLTTRON_HOME.
+
+    Tokens are identified by their sha256 digest and kept until their ``exp`` claim, after which
+    they are no longer valid anyway.  A bloom filter in front of the list answers for tokens
+    which were never revoked, the common case, without looking them up.  Expired entries are
+    dropped when the list is loaded and whenever the filter fills up.
+    """
+
+    def __init__(self, filename=REVOKED_TOKENS_FILE, capacity=10000, error_rate=0.001, clock=time.time):
+        """
+        :param filename: path of the revocation file relative to VOLTTRON_HOME
+        :param capacity: number of revoked tokens the filter is sized for, it grows past it
+        """
+        self.path = os.path.join(ClientContext.get_volttron_home(), filename)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._clock = clock
+        self._callbacks = []
+        self._checks = 0
+        self._false_positives = 0
+        # Maps the hex digest of each revoked token to its expiry, None when it has none.
+        self._revoked = {}
+        for key, exp in PersistentDict(self.path, format="json").items():
+            if exp is None or isinstance(exp, (int, float)):
+                self._revoked[key] = exp
+        self._filter = None
+        self.purge(persist=False)
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def on_revoke(self, callback):
+        """
+        Calls callback with each token revoked.
+        """
+        self._callbacks.append(callback)
+
+    def is_revoked(self, token):
+        if not token:
+            return False
+        self._checks += 1
+        digest = token_digest(token)
+        if digest not in self._filter:
+            return False
+        key = digest.hex()
+        if key not in self._revoked:
+            self._false_positives += 1
+            return False
+        exp = self._revoked[key]
+        return exp is None or exp > self._clock()
+
+    def revoke(self, token, exp=None):
+        """
+        Revokes a token until its expiry.
+
+        :param exp: the token's exp claim, tokens without one stay revoked
+        """
+        if not token or (exp is not None and exp <= self._clock()):
+            return
+        digest = token_digest(token)
+        self._revoked[digest.hex()] = exp
+        if len(self._revoked) > self._filter.capacity:
+            self.purge(persist=False)
+        else:
+            self._filter.add(digest)
+        self._persist()
+        for callback in self._callbacks:
+            callback(token)
+
+    def purge(self, persist=True):
+        """
+        Drops expired tokens and rebuilds the filter from the remaining ones.
+        """
+        now = self._clock()
+        expired = [key for key, exp in self._revoked.items() if exp is not None and exp <= now]
+        for key in expired:
+            del self._revoked[key]
+        capacity = self.capacity
+        while capacity < len(self._revoked):
+            capacity *= 2
+        self._filter = BloomFilter(capacity, self.error_rate)
+        for key in self._revoked:
+            self._filter.add(bytes.fromhex(key))
+        if persist and expired:
+            self._persist()
+
+    def stats(self):
+        return dict(revoked=len(self._revoked), filter_capacity=self._filter.capacity, checks=self._checks,
+                    false_positives=self._false_positives)
+
+    def _persist(self):
+        records = PersistentDict(self.path, flag="n", format="json")
+        records.update(self._revoked)
+        records.sync()
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+import re
+
+_log = logging.getLogger(__name__)
+
+# Characters which end the literal portion of a regular expression.
+_REGEX_META = set('.^$*+?{}[]\\|()')
+
+# Constructs that cannot be safely wrapped in a named group of a larger alternation.
+_UNCOMBINABLE = re.compile(r'\(\?P|\(\?\(|\(\?[aiLmsux]|\\[1-9]')
+
+# The flags a pattern compiled with re.compile(str) carries by default.
+_DEFAULT_FLAGS = re.compile('').flags
+
+
+def literal_prefix(regex: re.Pattern) -> str:
+    """
+    Returns the literal text every match of the regular expression must start with.
+
+    Because routes are tested with ``regex.match`` the leading ``^`` is optional.  Patterns
+    using alternation or flags that change how characters compare return an empty prefix.
+
+    :param regex: compiled regular expression of a route
+    :return: the literal prefix, possibly empty
+    """
+    pattern = regex.pattern
+    if not isinstance(pattern, str) or regex.flags != _DEFAULT_FLAGS or '|' in pattern:
+        return ''
+
+    prefix = []
+    i = 1 if pattern.startswith('^') else 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break
+            literal, step = pattern[i + 1], 2
+        elif char in _REGEX_META:
+            break
+        else:
+            literal, step = char, 1
+
+        following = pattern[i + step:i + step + 1]
+        # The character is optional or repeated so it cannot be part of the prefix.
+        if following and following in '*?{':
+            break
+        prefix.append(literal)
+        if following == '+':
+            break
+        i += step
+    return ''.join(prefix)
+
+
+class _RouteEntry(object):
+    __slots__ = ('route', 'order', 'prefix', 'group')
+
+    def __init__(self, route):
+        self.route = route
+        self.order = 0
+        self.prefix = literal_prefix(route[0])
+        self.group = None
+
+
+class _PrefixNode(object):
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []
+
+
+class RouteTable(object):
+    """
+    An ordered table of ``(regex, type, value)`` routes.
+
+    The table behaves like the list that previously held the registered routes, so the
+    first route whose regular expression matches the path wins.  Rather than evaluating every
+    expression in order, routes are compiled into a dispatcher:
+
+        - routes with a literal prefix (``^/vui/platforms/``, ``^/admin``) are stored in a
+          character trie so only routes whose prefix matches the path are tested.
+        - the remaining routes are joined into a single alternation of named groups which
+          Python's regex engine evaluates left to right, preserving the table order.
+
+    Only the structure affected by a change is rebuilt when routes are added or removed.
+    """
+
+    def __init__(self, routes=None):
+        self._entries = []
+        self._trie = _PrefixNode()
+        self._unprefixed = []
+        self._combined = None
+        self._combined_groups = {}
+        if routes:
+            self.extend(routes)
+
+    def __iter__(self):
+        return iter([entry.route for entry in self._entries])
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [entry.route for entry in self._entries[index]]
+        return self._entries[index].route
+
+    def __repr__(self):
+        return f"RouteTable({list(self)!r})"
+
+    def append(self, route):
+        self.insert(len(self._entries), route)
+
+    def extend(self, routes):
+        for route in routes:
+            self.append(route)
+
+    def insert(self, index, route):
+        """
+        Inserts the route before index, following the semantics of list.insert.
+        """
+        entry = _RouteEntry(route)
+        self._entries.insert(index, entry)
+        self._renumber()
+        if entry.prefix:
+            node = self._trie
+            for char in entry.prefix:
+                node = node.children.setdefault(char, _PrefixNode())
+            node.entries.append(entry)
+            node.entries.sort(key=lambda e: e.order)
+        else:
+            self._unprefixed.append(entry)
+            self._unprefixed.sort(key=lambda e: e.order)
+            self._compile_unprefixed()
+
+    def remove_pattern(self, regex):
+        """
+        Removes every route registered with a regular expression equal to the passed one.
+        """
+        removed = [entry for entry in self._entries if entry.route[0] == regex]
+        if not removed:
+            return
+        self._entries = [entry for entry in self._entries if entry.route[0] != regex]
+        recompile = False
+        for entry in removed:
+            if entry.prefix:
+                self._remove_from_trie(entry)
+            else:
+                self._unprefixed.remove(entry)
+                recompile = True
+        self._renumber()
+        if recompile:
+            self._compile_unprefixed()
+
+    def match(self, path):
+        """
+        Returns the first route, in table order, whose regular expression matches the path.
+
+        :param path: PATH_INFO of the request
+        :return: the ``(regex, type, value)`` route tuple or None
+        """
+        best = None
+        if self._combined is not None:
+            matched = self._combined.match(path)
+            if matched is not None:
+                best = self._combined_groups[matched.lastgroup]
+        for entry in self._unprefixed:
+            if entry.group is not None:
+                continue
+            if best is not None and entry.order > best.order:
+                break
+            if entry.route[0].match(path):
+                best = entry
+                break
+
+        node = self._trie
+        for char in path:
+            node = node.children.get(char)
+            if node is None:
+                break
+            for entry in node.entries:
+                if best is not None and entry.order > best.order:
+                    break
+                if entry.route[0].match(path):
+                    best = entry
+                    break
+
+        return best.route if best is not None else None
+
+    def _renumber(self):
+        for order, entry in enumerate(self._entries):
+            entry.order = order
+
+    def _remove_from_trie(self, entry):
+        path = [self._trie]
+        for char in entry.prefix:
+            path.append(path[-1].children[char])
+        path[-1].entries.remove(entry)
+        # Prune the branches which no longer lead to any routes.
+        for char, parent, child in zip(reversed(entry.prefix), reversed(path[:-1]), reversed(path[1:])):
+            if child.entries or child.children:
+                break
+            del parent.children[char]
+
+    def _compile_unprefixed(self):
+        alternatives = []
+        groups = {}
+        for entry in self._unprefixed:
+            entry.group = None
+            regex = entry.route[0]
+            if not isinstance(regex.pattern, str) or regex.flags != _DEFAULT_FLAGS \
+                    or _UNCOMBINABLE.search(regex.pattern):
+                continue
+            name = f"_r{len(alternatives)}"
+            alternatives.append(f"(?P<{name}>{regex.pattern})")
+            groups[name] = entry
+            entry.group = name
+
+        self._combined = None
+        self._combined_groups = {}
+        if not alternatives:
+            return
+        try:
+            self._combined = re.compile('|'.join(alternatives))
+            self._combined_groups = groups
+        except re.error as e:
+            _log.warning(f"Unable to combine route expressions, falling back to sequential matching: {e}")
+            for entry in groups.values():
+                entry.group = None
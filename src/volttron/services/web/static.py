@@ -0,0 +1,686 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+import mimetypes
+import mmap
+import os
+import re
+import stat
+import time
+import uuid
+
+import gevent
+
+from pathlib import Path
+
+from gevent.socket import wait_write
+from gevent.ssl import SSLSocket
+from watchdog.events import FileSystemEventHandler
+from werkzeug.http import http_date, parse_date
+from ws4py.server.geventserver import WebSocketWSGIHandler
+
+from .cache import LRUCache, etag_matches
+from .compression import ENCODING_EXTENSIONS, compress, is_compressible, negotiate_encoding, supported_encodings
+
+_log = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+DEFAULT_CACHE_CONTROL = 'no-cache'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Matches file names carrying a hash of their content, such as app.3f9a2b1c.js or app-3f9a2b1c.js.
+_CONTENT_HASHED = re.compile(r'[.\-_][0-9a-fA-F]{8,}\.[^./]+$')
+
+
+# Requests asking for more ranges than this are answered with the whole file.
+MAX_RANGES = 16
+
+
+def parse_range(value, size):
+    """
+    Parses a Range header against a file of ``size`` bytes.
+
+    Overlapping and adjacent ranges are coalesced.
+
+    :return: sorted list of (start, end) byte ranges with exclusive ends, an empty list when no
+        range is satisfiable, or None when the header is invalid and should be ignored
+    """
+    unit, _, specs = (value or '').partition('=')
+    if unit.strip().lower() != 'bytes' or not specs:
+        return None
+    ranges = []
+    for spec in specs.split(','):
+        first, sep, last = spec.strip().partition('-')
+        if not sep:
+            return None
+        try:
+            if not first:
+                suffix = int(last)
+                if suffix < 0:
+                    return None
+                start, end = max(0, size - suffix), size
+            else:
+                start = int(first)
+                end = int(last) + 1 if last else size
+                if start < 0 or (last and end <= start):
+                    return None
+                end = min(end, size)
+        except ValueError:
+            return None
+        if start < end:
+            ranges.append((start, end))
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    coalesced = []
+    for start, end in sorted(ranges):
+        if coalesced and start <= coalesced[-1][1]:
+            coalesced[-1] = (coalesced[-1][0], max(end, coalesced[-1][1]))
+        else:
+            coalesced.append((start, end))
+    return coalesced
+
+
+def is_content_hashed(path):
+    """
+    Returns True if the file name contains a hash of its content, so it never changes.
+    """
+    return _CONTENT_HASHED.search(os.path.basename(path)) is not None
+
+
+class StaticFile(object):
+    """
+    Metadata of a file served from a path route.
+    """
+    __slots__ = ('path', 'size', 'mtime', 'content_type')
+
+    def __init__(self, path, size, mtime, content_type):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.content_type = content_type
+
+    @classmethod
+    def from_path(cls, path):
+        """
+        Returns the StaticFile for a regular file or None if the path is not one.
+        """
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return cls(path, st.st_size, st.st_mtime_ns, mimetypes.guess_type(path)[0] or 'text/plain')
+
+    @property
+    def etag(self):
+        return f'"{self.mtime:x}-{self.size:x}"'
+
+    @property
+    def last_modified(self):
+        return http_date(self.mtime // 1000000000)
+
+
+class FileResponse(object):
+    """
+    WSGI response body sending parts of a file.
+
+    The body is a list of segments, each either an ``(offset, length)`` range of the file or
+    literal bytes such as the part headers of a multipart response.  It is served by
+    :class:`StaticWSGIHandler` with ``os.sendfile`` when the connection allows it, otherwise
+    file ranges are iterated as slices of a memory map of the file.
+    """
+
+    def __init__(self, path, offset=0, length=None, segments=None, block_size=DEFAULT_BLOCK_SIZE):
+        # An open file descriptor is duplicated so the response can outlive its owner.
+        self._file = open(os.dup(path) if isinstance(path, int) else path, 'rb')
+        if segments is None:
+            size = os.fstat(self._file.fileno()).st_size
+            segments = [(offset, size - offset if length is None else length)]
+        self.segments = segments
+        self.length = sum(len(segment) if isinstance(segment, bytes) else segment[1] for segment in segments)
+        self.block_size = block_size
+
+    def __iter__(self):
+        for segment in self.segments:
+            if isinstance(segment, bytes):
+                yield segment
+            else:
+                yield from self._iter_range(*segment)
+
+    def _iter_range(self, offset, length):
+        if length <= 0:
+            return
+        # mmap offsets must be aligned on the allocation granularity.
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        mapped = mmap.mmap(self._file.fileno(), offset + length - start, access=mmap.ACCESS_READ, offset=start)
+        view = memoryview(mapped)
+        block = None
+        try:
+            position = offset - start
+            end = position + length
+            while position < end:
+                block = view[position:min(end, position + self.block_size)]
+                yield block
+                block.release()
+                block = None
+                position += self.block_size
+        finally:
+            if block is not None:
+                block.release()
+            view.release()
+            mapped.close()
+
+    def sendfile(self, sock):
+        """
+        Sends the body over the socket, the file ranges with os.sendfile.
+
+        :return: number of bytes sent
+        """
+        total = 0
+        for segment in self.segments:
+            if isinstance(segment, bytes):
+                sock.sendall(segment)
+                total += len(segment)
+                continue
+            offset, length = segment
+            sent = self._sendfile_range(sock.fileno(), offset, length)
+            total += sent
+            if sent < length:
+                break
+        return total
+
+    def _sendfile_range(self, out, offset, length):
+        remaining = length
+        while remaining > 0:
+            try:
+                sent = os.sendfile(out, self._file.fileno(), offset, min(remaining, self.block_size))
+            except BlockingIOError:
+                wait_write(out)
+                continue
+            if sent == 0:
+                break
+            offset += sent
+            remaining -= sent
+        return length - remaining
+
+    def close(self):
+        self._file.close()
+
+
+class StaticWSGIHandler(WebSocketWSGIHandler):
+    """
+    Request handler sending :class:`FileResponse` bodies with ``os.sendfile``.
+
+    The kernel copies the file straight to the socket, which is only possible for plain
+    connections with a known Content-Length.  Other responses are written as usual.
+    """
+
+    def process_result(self):
+        if isinstance(self.result, FileResponse) and self._can_sendfile():
+            # Flush the headers then let the kernel send the body.
+            self.write(b'')
+            self.response_length += self.result.sendfile(self.socket)
+        else:
+            super(StaticWSGIHandler, self).process_result()
+
+    def _can_sendfile(self):
+        return hasattr(os, 'sendfile') and self.socket is not None \
+            and not isinstance(self.socket, SSLSocket) \
+            and self.provided_content_length is not None and self.code not in (204, 304)
+
+
+class _InvalidateHandler(FileSystemEventHandler):
+
+    def __init__(self, static_files):
+        self._static_files = static_files
+
+    def on_any_event(self, event):
+        if event.event_type in ('opened', 'closed', 'closed_no_write'):
+            # Reads, including the server's own, change nothing and writes are also reported as
+            # modified, invalidating here would make every hit stat the file again.
+            return
+        if event.event_type != 'modified':
+            # Entries appeared or disappeared, which may change how paths resolve.
+            self._static_files.invalidate_resolved()
+        if event.is_directory and event.event_type != 'modified':
+            # A whole tree moved or disappeared.
+            self._static_files.invalidate()
+            return
+        self._static_files.invalidate(event.src_path)
+        dest_path = getattr(event, 'dest_path', None)
+        if dest_path:
+            self._static_files.invalidate(dest_path)
+
+
+class StaticFiles(object):
+    """
+    Serves files from the directories of path routes.
+
+    File metadata (existence, size, modification time and mime type) is cached so that a hit
+    does not touch the filesystem.  Entries under watched roots are invalidated by a file
+    watcher; other entries are revalidated once they are ``stat_ttl`` seconds old.
+
+    Files up to ``max_cached_file_size`` bytes are kept in memory, keyed by modification time
+    and size so a changed file is never served stale.  Larger files are sent with
+    ``os.sendfile``, or from a memory map on connections which cannot use it.
+
+    Compressible files are served ``br`` or ``gzip`` encoded when the client accepts it and a
+    variant at least as new as the file exists, either next to it (``app.js.br``,
+    ``app.js.gz``) or in ``precompressed_dir`` as written by :meth:`precompress`.  Small files
+    without one of at least ``compress_min_size`` bytes are compressed on first use and the
+    encoded content cached alongside the file's, so unchanged files are compressed only once.
+
+    Responses carry an ETag derived from the modification time and size of the file sent and
+    its Last-Modified time, and conditional requests are answered with 304.  Files whose name
+    contains a content hash are sent with ``immutable_cache_control``, others with the
+    Cache-Control of their root or ``cache_control``.
+
+    Range requests are answered with the requested bytes of the unencoded file, a single range
+    as a 206 response and several as ``multipart/byteranges``, sent with ``os.sendfile`` or from a
+    memory map so resuming a large download never reads the skipped part.
+    """
+
+    def __init__(self, max_cached_bytes=8 * 1024 * 1024, max_cached_file_size=256 * 1024,
+                 max_entries=4096, stat_ttl=2.0, precompressed_dir=None,
+                 cache_control=DEFAULT_CACHE_CONTROL, immutable_cache_control=IMMUTABLE_CACHE_CONTROL,
+                 compress_min_size=None, clock=time.monotonic):
+        """
+        :param compress_min_size: smallest cached file compressed in memory, None disables it
+        """
+        self.max_cached_file_size = max_cached_file_size
+        self.compress_min_size = compress_min_size
+        self.cache_control = cache_control
+        self.immutable_cache_control = immutable_cache_control
+        self.stat_ttl = stat_ttl
+        self.precompressed_dir = os.path.abspath(precompressed_dir) if precompressed_dir else None
+        self._clock = clock
+        # Maps path to (StaticFile or None, time checked, watched).
+        self._files = LRUCache(maxsize=max_entries)
+        # Maps (root, path) to (resolved path or None, time checked, watched).
+        self._resolved = LRUCache(maxsize=max_entries)
+        self._content = LRUCache(maxsize=max_entries, maxweight=max_cached_bytes, weigher=len)
+        self._observer = None
+        self._watches = {}
+
+    def watch(self, root):
+        """
+        Watches a root directory so that cached metadata of its files is invalidated on change.
+
+        Roots are reference counted, every call must be matched by a call to :meth:`unwatch`.
+        """
+        root = os.path.abspath(root)
+        if root in self._watches:
+            self._watches[root][0] += 1
+            return
+        try:
+            if self._observer is None:
+                from watchdog_gevent import Observer
+                self._observer = Observer()
+                self._observer.start()
+            watch = self._observer.schedule(_InvalidateHandler(self), root, recursive=True)
+        except Exception as e:
+            _log.warning(f"Unable to watch {root}, its files will be revalidated every {self.stat_ttl}s: {e}")
+            watch = None
+        self._watches[root] = [1, watch]
+        self.invalidate()
+
+    def unwatch(self, root):
+        root = os.path.abspath(root)
+        entry = self._watches.get(root)
+        if entry is None:
+            return
+        entry[0] -= 1
+        if entry[0] <= 0:
+            del self._watches[root]
+            if entry[1] is not None:
+                self._observer.unschedule(entry[1])
+            self.invalidate()
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        self._watches.clear()
+
+    def invalidate(self, path=None):
+        """
+        Drops the cached metadata of a path, or of every file when no path is given.
+        """
+        if path is None:
+            self._files.clear()
+            self._resolved.clear()
+        else:
+            self._files.pop(os.path.abspath(path))
+
+    def invalidate_resolved(self):
+        """
+        Drops every cached path resolution.
+        """
+        self._resolved.clear()
+
+    def resolve(self, root, path_info):
+        """
+        Resolves a request path against a root directory, following symbolic links.
+
+        Resolutions are cached per root until the watcher sees entries created, deleted or moved,
+        or for ``stat_ttl`` seconds when the root is not watched.
+
+        :return: the resolved path or None when it is outside of root
+        """
+        key = (root, path_info)
+        entry = self._resolved.get(key)
+        if entry is not None:
+            resolved, checked, watched = entry
+            if watched or self._clock() - checked < self.stat_ttl:
+                return resolved
+        resolved = str(Path(root + path_info).resolve())
+        # protects against relative server traversal.
+        if not resolved.startswith(root):
+            resolved = None
+        self._resolved.put(key, (resolved, self._clock(), self._is_watched(root)))
+        return resolved
+
+    def lookup(self, path):
+        """
+        Returns the StaticFile for the path or None when it is not a regular file.
+        """
+        entry = self._files.get(path)
+        if entry is not None:
+            info, checked, watched = entry
+            if watched or self._clock() - checked < self.stat_ttl:
+                return info
+        info = StaticFile.from_path(path)
+        self._files.put(path, (info, self._clock(), self._is_watched(path)))
+        return info
+
+    def content(self, info):
+        """
+        Returns the content of a small file, reading it into the cache on first use.
+        """
+        key = (info.path, info.mtime, info.size)
+        content = self._content.get(key)
+        if content is None:
+            with open(info.path, 'rb') as fp:
+                content = fp.read()
+            if len(content) == info.size:
+                self._content.put(key, content)
+            else:
+                # The file changed since it was looked up.
+                self.invalidate(info.path)
+        return content
+
+    def open(self, info, segments):
+        """
+        Returns a FileResponse sending the segments of the file.
+        """
+        try:
+            return FileResponse(info.path, segments=segments)
+        except OSError:
+            self.invalidate(info.path)
+            raise
+
+    def serve(self, env, start_response, path, cache_control=None, source=None):
+        """
+        WSGI response for the file at path.
+
+        :param cache_control: Cache-Control of the path's root, the default policy when None
+        :param source: where files are read from, the filesystem when None.  Sources provide the
+            lookup, variants, content and open methods of this class.
+        """
+        source = self if source is None else source
+        info = source.lookup(path)
+        if info is None:
+            start_response('404 Not Found', [('Content-Type', 'text/html')])
+            return [b'<h1>Not Found</h1>']
+
+        last_modified = info.mtime
+        headers = [('Last-Modified', info.last_modified)]
+        if self.immutable_cache_control and is_content_hashed(path):
+            cache_control = self.immutable_cache_control
+        elif cache_control is None:
+            cache_control = self.cache_control
+        if cache_control:
+            headers.append(('Cache-Control', cache_control))
+
+        method = env.get('REQUEST_METHOD')
+        # Ranges are byte offsets of the unencoded file so resumed downloads stay consistent.
+        range_header = env.get('HTTP_RANGE') if method == 'GET' else None
+        content_headers = [('Content-Type', info.content_type)]
+        # Coding of a small file compressed in memory rather than served from a variant.
+        compressed = None
+        if is_compressible(info.content_type):
+            headers.append(('Vary', 'Accept-Encoding'))
+            accept_encoding = env.get('HTTP_ACCEPT_ENCODING')
+            if accept_encoding and not range_header:
+                variants = source.variants(info)
+                encoding = negotiate_encoding(accept_encoding, available=tuple(variants))
+                if encoding is not None:
+                    info = variants[encoding]
+                elif self.compress_min_size is not None \
+                        and self.compress_min_size <= info.size <= self.max_cached_file_size:
+                    encoding = compressed = negotiate_encoding(accept_encoding, available=supported_encodings())
+                if encoding is not None:
+                    content_headers.append(('Content-Encoding', encoding))
+        # Each variant is its own file, so its ETag differs from the identity encoding's.
+        etag = info.etag if compressed is None else f'{info.etag[:-1]}-{compressed}"'
+        headers.append(('ETag', etag))
+
+        if method in ('GET', 'HEAD') and self._not_modified(env, etag, last_modified):
+            start_response('304 Not Modified', headers)
+            return []
+
+        if range_header and self._if_range(env, info):
+            ranges = parse_range(range_header, info.size)
+            if ranges is not None:
+                return self._serve_ranges(start_response, source, info, headers, ranges)
+
+        headers.extend(content_headers)
+        if not any(name == 'Content-Encoding' for name, _ in content_headers):
+            headers.append(('Accept-Ranges', 'bytes'))
+
+        try:
+            if compressed is not None:
+                body = [self._compressed_content(source, info, compressed)]
+                length = len(body[0])
+            else:
+                body, length = self._body(source, info, [(0, info.size)])
+        except OSError:
+            start_response('404 Not Found', [('Content-Type', 'text/html')])
+            return [b'<h1>Not Found</h1>']
+
+        headers.append(('Content-Length', str(length)))
+        start_response('200 OK', headers)
+        if method == 'HEAD':
+            getattr(body, 'close', lambda: None)()
+            return []
+        return body
+
+    def variants(self, info):
+        """
+        Returns the precompressed variants of a file which are at least as new as it, by coding.
+        """
+        variants = {}
+        for encoding, extension in ENCODING_EXTENSIONS.items():
+            for candidate in self._variant_paths(info.path, extension):
+                variant = self.lookup(candidate)
+                if variant is not None and variant.mtime >= info.mtime:
+                    variants[encoding] = variant
+                    break
+        return variants
+
+    def precompress(self, root, min_size=1024):
+        """
+        Writes compressed variants of the compressible files under root to the precompressed directory.
+
+        Existing variants newer than their file are kept, and variants which would save less than
+        a tenth of the size are not written.  Compression runs in the hub's thread pool so requests
+        keep being served meanwhile.
+
+        :return: number of variants written
+        """
+        if self.precompressed_dir is None:
+            return 0
+        threadpool = gevent.get_hub().threadpool
+        written = 0
+        extensions = tuple(ENCODING_EXTENSIONS.values())
+        for dirpath, dirnames, filenames in os.walk(os.path.abspath(root)):
+            if dirpath == self.precompressed_dir or dirpath.startswith(self.precompressed_dir + os.sep):
+                dirnames[:] = []
+                continue
+            for filename in filenames:
+                if filename.endswith(extensions):
+                    continue
+                info = StaticFile.from_path(os.path.join(dirpath, filename))
+                if info is None or info.size < min_size or not is_compressible(info.content_type):
+                    continue
+                data = None
+                for encoding in supported_encodings():
+                    target = self._precompressed_path(info.path, ENCODING_EXTENSIONS[encoding])
+                    existing = StaticFile.from_path(target)
+                    if existing is not None and existing.mtime >= info.mtime:
+                        continue
+                    try:
+                        if data is None:
+                            with open(info.path, 'rb') as fp:
+                                data = fp.read()
+                        compressed = threadpool.apply(compress, (data, encoding))
+                        if len(compressed) > len(data) * 0.9:
+                            continue
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        partial = target + '.partial'
+                        with open(partial, 'wb') as fp:
+                            fp.write(compressed)
+                        os.replace(partial, target)
+                    except OSError as e:
+                        _log.warning(f"Unable to precompress {info.path}: {e}")
+                        continue
+                    self.invalidate(target)
+                    written += 1
+        _log.debug(f"Wrote {written} precompressed files for {root}.")
+        return written
+
+    def _compressed_content(self, source, info, encoding):
+        """
+        Returns the content of a small file compressed with the coding, compressing it on first use.
+        """
+        key = (info.path, info.etag, encoding)
+        content = self._content.get(key)
+        if content is None:
+            data = source.content(info)
+            content = gevent.get_hub().threadpool.apply(compress, (data, encoding))
+            self._content.put(key, content)
+        return content
+
+    def _body(self, source, info, segments):
+        """
+        Returns the body sending the segments of a file and its length.
+
+        Small files are sent from memory, others from the source's FileResponse.
+        """
+        if info.size <= self.max_cached_file_size:
+            content = source.content(info)
+            body = [segment if isinstance(segment, bytes) else content[segment[0]:segment[0] + segment[1]]
+                    for segment in segments]
+            return body, sum(len(part) for part in body)
+        body = source.open(info, segments)
+        return body, body.length
+
+    def _serve_ranges(self, start_response, source, info, headers, ranges):
+        if not ranges:
+            start_response('416 Range Not Satisfiable', headers + [('Content-Type', 'text/html'),
+                                                                   ('Content-Range', f'bytes */{info.size}')])
+            return [b'<h1>416 Range Not Satisfiable</h1>']
+
+        headers.append(('Accept-Ranges', 'bytes'))
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            headers.append(('Content-Type', info.content_type))
+            headers.append(('Content-Range', f'bytes {start}-{end - 1}/{info.size}'))
+            segments = [(start, end - start)]
+        else:
+            boundary = uuid.uuid4().hex
+            headers.append(('Content-Type', f'multipart/byteranges; boundary={boundary}'))
+            segments = []
+            for start, end in ranges:
+                segments.append(f'--{boundary}\r\nContent-Type: {info.content_type}\r\n'
+                                f'Content-Range: bytes {start}-{end - 1}/{info.size}\r\n\r\n'.encode('latin-1'))
+                segments.append((start, end - start))
+                segments.append(b'\r\n')
+            segments.append(f'--{boundary}--\r\n'.encode('latin-1'))
+
+        try:
+            body, length = self._body(source, info, segments)
+        except OSError:
+            start_response('404 Not Found', [('Content-Type', 'text/html')])
+            return [b'<h1>Not Found</h1>']
+        headers.append(('Content-Length', str(length)))
+        start_response('206 Partial Content', headers)
+        return body
+
+    @staticmethod
+    def _if_range(env, info):
+        """
+        Returns True unless an If-Range precondition shows the client's copy is out of date.
+        """
+        if_range = (env.get('HTTP_IF_RANGE') or '').strip()
+        if not if_range:
+            return True
+        if if_range.startswith(('"', 'W/')):
+            # Only strong validators may be used with If-Range.
+            return if_range == info.etag
+        date = parse_date(if_range)
+        return date is not None and info.mtime // 1000000000 == int(date.timestamp())
+
+    @staticmethod
+    def _not_modified(env, etag, mtime):
+        if_none_match = env.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            return etag_matches(if_none_match, etag)
+        if_modified_since = parse_date(env.get('HTTP_IF_MODIFIED_SINCE'))
+        if if_modified_since is not None:
+            return mtime // 1000000000 <= if_modified_since.timestamp()
+        return False
+
+    def _variant_paths(self, path, extension):
+        yield path + extension
+        if self.precompressed_dir is not None:
+            yield self._precompressed_path(path, extension)
+
+    def _precompressed_path(self, path, extension):
+        return os.path.join(self.precompressed_dir, path.lstrip(os.sep)) + extension
+
+    def stats(self):
+        """
+        Returns the hit and miss counts of the metadata, path resolution and content caches.
+        """
+        return dict(metadata=self._files.stats(), resolved=self._resolved.stats(), content=self._content.stats(),
+                    watched=sorted(self._watches))
+
+    def _is_watched(self, path):
+        return any(entry[1] is not None and (path == root or path.startswith(root + os.sep))
+                   for root, entry in self._watches.items())
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import base64
+import logging
+
+_log = logging.getLogger(__name__)
+
+
+def stream_response(res):
+    """
+    Returns the (status, stream, headers) of an agent response opening a stream or None.
+
+    An agent streams a response by replying to the route callback with a
+    ``[status, {'stream': handle, 'method': method}, headers]`` list.  The web service then
+    calls the agent's exported ``method(handle)`` for each page of the body.  A page is a list
+    of chunks, an empty page ending the stream.  Chunks are text, sent utf-8 encoded, unless
+    the stream adds ``'encoding': 'base64'`` for binary content.  ``method(handle, True)`` is
+    notified when the client goes away before the stream ended.
+    """
+    if isinstance(res, (list, tuple)) and len(res) == 3 and isinstance(res[1], dict) \
+            and 'stream' in res[1] and 'method' in res[1]:
+        return res
+    return None
+
+
+class StreamedResponse(object):
+    """
+    Response body pulling pages of a stream from an agent.
+
+    The next page is only fetched once the chunks of the previous one were written to the
+    client, so a slow client slows the agent down rather than buffering the stream in memory.
+
+    :param fetch_page: callable returning the next page, a list of chunks
+    :param cancel: callable telling the agent the stream will not be read to the end
+    """
+
+    def __init__(self, fetch_page, cancel, base64_chunks=False):
+        self._fetch_page = fetch_page
+        self._cancel = cancel
+        self._base64_chunks = base64_chunks
+        self._finished = False
+        self._closed = False
+
+    def __iter__(self):
+        while not self._closed:
+            page = self._fetch_page()
+            if not page:
+                self._finished = True
+                return
+            for chunk in page:
+                chunk = self._decode(chunk)
+                if chunk:
+                    yield chunk
+
+    def close(self):
+        if not self._finished and not self._closed:
+            try:
+                self._cancel()
+            except Exception as e:
+                _log.warning(f"Could not cancel stream: {e}")
+        self._closed = True
+
+    def _decode(self, chunk):
+        if isinstance(chunk, str):
+            return base64.b64decode(chunk) if self._base64_chunks else chunk.encode('utf-8')
+        return chunk
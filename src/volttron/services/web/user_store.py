@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import logging
+import os
+
+from types import MappingProxyType
+
+from watchdog_gevent import Observer
+
+from volttron.utils.context import ClientContext
+from volttron.utils.filewatch import VolttronHomeFileReloader
+from volttron.utils.persistance import PersistentDict
+
+_log = logging.getLogger(__name__)
+
+WEB_USERS_FILE = 'web-users.json'
+
+
+class WebUser(object):
+    """
+    A user of the web service, as read from the users file.
+
+    :param record: the user's entry in the users file, including its hashed_password
+    """
+    __slots__ = ('username', 'hashed_password', '_record')
+
+    def __init__(self, username, record):
+        self.username = username
+        self.hashed_password = record.get('hashed_password')
+        self._record = MappingProxyType(dict(record))
+
+    def claims(self):
+        """
+        Returns a copy of the user's entry without its hashed_password, the claims of its tokens.
+        """
+        claims = dict(self._record)
+        claims.pop('hashed_password', None)
+        return claims
+
+    def record(self):
+        return dict(self._record)
+
+
+class UserStore(object):
+    """
+    The users of the web service, read from ``web-users.json`` in VOLTTRON_HOME.
+
+    The file is parsed once into an immutable snapshot indexed by username, replaced as a whole
+    when the file changes or a user is added, so readers never see a partially loaded file.
+    One store is shared by the endpoints needing users so the file is watched and held once.
+    """
+
+    def __init__(self, filename=WEB_USERS_FILE):
+        """
+        :param filename: path of the users file relative to VOLTTRON_HOME
+        """
+        self.filename = filename
+        self.path = os.path.join(ClientContext.get_volttron_home(), filename)
+        self._users = MappingProxyType({})
+        self._observer = None
+        self.reload()
+
+    def __len__(self):
+        return len(self._users)
+
+    def __contains__(self, username):
+        return username in self._users
+
+    def __iter__(self):
+        return iter(self._users)
+
+    def get(self, username):
+        """
+        Returns the WebUser with the username or None.
+        """
+        return self._users.get(username)
+
+    def reload(self):
+        """
+        Parses the users file and swaps in the new snapshot.
+        """
+        users = {}
+        for username, record in PersistentDict(self.path, format="json").items():
+            if not isinstance(record, dict):
+                _log.warning(f"Ignoring invalid entry for user {username} in {self.path}")
+                continue
+            users[username] = WebUser(username, record)
+        self._users = MappingProxyType(users)
+        _log.debug(f"Loaded {len(users)} web users from {self.path}.")
+
+    def add_user(self, username, hashed_password, groups=None, overwrite=False):
+        """
+        Adds a user, writing the users file.
+
+        :raises ValueError: when the user exists and overwrite is not set
+        """
+        if username in self._users and not overwrite:
+            raise ValueError(f"The user {username} is already present and overwrite not set to True")
+        records = PersistentDict(self.path, flag="n", format="json")
+        records.update((name, user.record()) for name, user in self._users.items())
+        records[username] = dict(hashed_password=hashed_password, groups=list(groups or []))
+        records.sync()
+        users = dict(self._users)
+        users[username] = WebUser(username, records[username])
+        self._users = MappingProxyType(users)
+
+    def watch(self):
+        """
+        Reloads the users when the file changes.
+        """
+        if self._observer is not None:
+            return
+        self._observer = Observer()
+        self._observer.schedule(VolttronHomeFileReloader(self.filename, self.reload),
+                                ClientContext.get_volttron_home())
+        self._observer.start()
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
@@ -38,6 +38,8 @@ from volttron.client.known_identities import CONFIGURATION_STORE, CONTROL
 from volttron.client.vip.agent.subsystems.query import Query
 from volttron.utils.jsonrpc import MethodNotFound, RemoteError
 from volttron.lib.tree import DeviceTree, TopicTree
+from . import json_encoder
+from .request_auth import request_bearer, request_claims
 from .vui_pubsub import VUIPubsubManager
 
 
@@ -59,30 +61,29 @@ class LockError(Exception):
 def endpoint(func):
     @functools.wraps(func)
     def verify_and_dispatch(self, env, data):
-        from volttron.services.web import get_bearer
         try:
-            claims = self._agent.get_user_claims(get_bearer(env))
+            claims = request_claims(env, self._agent.get_user_claims)
         except Exception as e:
             _log.warning(f"Unauthorized user attempted to connect to {env.get('PATH_INFO')}. Caught Exception: {e}")
-            return Response(json.dumps({'error': 'Not Authorized'}), 401, content_type='app/json')
+            return Response(json_encoder.dumpb({'error': 'Not Authorized'}), 401, content_type='app/json')
 
         # Only allow only users with API permissions:
         if 'vui' not in claims.get('groups'):
             _log.warning(f"Unauthorized user attempted to connect with 'vui' claim to {env.get('PATH_INFO')}.")
-            return Response(json.dumps({'error': 'Not Authorized'}), 403, content_type='app/json')
+            return Response(json_encoder.dumpb({'error': 'Not Authorized'}), 403, content_type='app/json')
 
         # Dispatch endpoint:
         try:
             response = func(self, env, data)
             if not response:
                 message = f"Endpoint {env['REQUEST_METHOD']} {env['PATH_INFO']} is not implemented."
-                return Response(json.dumps({"error": message}), status=501, content_type='application/json')
+                return Response(json_encoder.dumpb({"error": message}), status=501, content_type='application/json')
             else:
                 return response
         except TimeoutError as e:
-            return Response(json.dumps({'error': f'Request Timed Out: {e}'}), 504, content_type='application/json')
+            return Response(json_encoder.dumpb({'error': f'Request Timed Out: {e}'}), 504, content_type='application/json')
         except Exception as e:
-            return Response(json.dumps({'error': f'Unexpected Error: {e}'}), 500, content_type='application/json')
+            return Response(json_encoder.dumpb({'error': f'Unexpected Error: {e}'}), 500, content_type='application/json')
     return verify_and_dispatch
 
 
@@ -216,7 +217,7 @@ class VUIEndpoints:
         path_info = env.get('PATH_INFO')
         request_method = env.get("REQUEST_METHOD")
         if request_method == 'GET':
-            response = json.dumps(self._find_active_sub_routes(['vui'], path_info=path_info))
+            response = json_encoder.dumpb(self._find_active_sub_routes(['vui'], path_info=path_info))
             return Response(response, 200, content_type='application/json')
 
     @endpoint
@@ -225,7 +226,7 @@ class VUIEndpoints:
         request_method = env.get("REQUEST_METHOD")
         if request_method == 'GET':
             platforms = self._get_platforms()
-            response = json.dumps(self._links(path_info, platforms))
+            response = json_encoder.dumpb(self._links(path_info, platforms))
             return Response(response, 200, content_type='application/json')
 
     @endpoint
@@ -235,10 +236,10 @@ class VUIEndpoints:
         if request_method == 'GET':
             platform = re.match('^/vui/platforms/([^/]+)/?$', path_info).groups()[0]
             if platform in self._get_platforms():
-                return Response(json.dumps(self._find_active_sub_routes(['vui', 'platforms'], path_info=path_info)),
+                return Response(json_encoder.dumpb(self._find_active_sub_routes(['vui', 'platforms'], path_info=path_info)),
                                 200, content_type='application/json')
             else:
-                return Response(json.dumps({f'error': f'Unknown platform: {platform}'}),
+                return Response(json_encoder.dumpb({f'error': f'Unknown platform: {platform}'}),
                                 400, content_type='application/json')
 
     @endpoint
@@ -260,13 +261,13 @@ class VUIEndpoints:
             if agent_state not in ['running', 'installed']:
                 error = {'error': f'Unknown agent-state: {agent_state} -- must be "running", "installed",'
                                   f' or "packaged". Default is "running".'}
-                return Response(json.dumps(error), 400, content_type='application/json')
+                return Response(json_encoder.dumpb(error), 400, content_type='application/json')
             if platform not in self._get_platforms():
                 error = {'error': f'Unknown platform: {platform}'}
-                return Response(json.dumps(error), 400, content_type='application/json')
+                return Response(json_encoder.dumpb(error), 400, content_type='application/json')
             else:
                 agents = self._get_agents(platform, agent_state, include_hidden)
-                return Response(json.dumps(self._links(path_info, agents)), 200,
+                return Response(json_encoder.dumpb(self._links(path_info, agents)), 200,
                                 content_type='application/json')
 
     @endpoint
@@ -284,7 +285,7 @@ class VUIEndpoints:
         platform, vip_identity = re.match('^/vui/platforms/([^/]+)/agents/([^/]+)/running/?$', path_info).groups()
         uuid = self._rpc(CONTROL, 'identity_exists', vip_identity, external_platform=platform)
         if not uuid:
-            return Response(json.dumps({'error': f'Agent "{vip_identity}" not found.'}), 400,
+            return Response(json_encoder.dumpb({'error': f'Agent "{vip_identity}" not found.'}), 400,
                             content_type='application/json')
 
         def _agent_running(vip_identity):
@@ -293,14 +294,14 @@ class VUIEndpoints:
 
         if request_method == 'GET':
             status = _agent_running(vip_identity)
-            return Response(json.dumps({'running': status}), 200, content_type='application/json')
+            return Response(json_encoder.dumpb({'running': status}), 200, content_type='application/json')
 
         elif request_method == 'PUT':
             if restart:
                 self._rpc(CONTROL, 'restart_agent', uuid, external_platform=platform)
             else:
                 if _agent_running(vip_identity):
-                    return Response(json.dumps({'error': f'Agent: {vip_identity} is already running.'}), 400,
+                    return Response(json_encoder.dumpb({'error': f'Agent: {vip_identity} is already running.'}), 400,
                                     content_type='application/json')
                 self._rpc(CONTROL, 'start_agent', uuid, external_platform=platform)
             return Response(status=204)
@@ -329,7 +330,7 @@ class VUIEndpoints:
             # If RPC endpoint is enabled and agent is installed but not running, disallow rpc endpoint.
             elif agent_state == 'installed' and 'rpc' in active_routes['links'].keys():
                 active_routes['links'].pop('rpc')
-            return Response(json.dumps(active_routes), 200, content_type='application/json')
+            return Response(json_encoder.dumpb(active_routes), 200, content_type='application/json')
 
     @endpoint
     def handle_platforms_agents_configs(self, env: dict, data: dict) -> Response | None:
@@ -360,16 +361,16 @@ class VUIEndpoints:
                         setting_list = self._rpc(CONFIGURATION_STORE, 'manage_list_configs', vip_identity,
                                                  external_platform=platform)
                         route_dict = self._links(path_info, setting_list)
-                        return Response(json.dumps(route_dict), 200, content_type='application/json')
+                        return Response(json_encoder.dumpb(route_dict), 200, content_type='application/json')
                     else:
                         list_of_agents = self._rpc(CONFIGURATION_STORE, 'manage_list_stores', external_platform=platform)
-                        return Response(json.dumps(list_of_agents), 200, content_type='application/json')
+                        return Response(json_encoder.dumpb(list_of_agents), 200, content_type='application/json')
                 elif not no_config_name:
                     setting_dict = self._rpc(CONFIGURATION_STORE, 'manage_get', vip_identity, config_name,
                                              external_platform=platform)
-                    return Response(json.dumps(setting_dict), 200, content_type='application/json')
+                    return Response(json_encoder.dumpb(setting_dict), 200, content_type='application/json')
             except RemoteError as e:
-                return Response(json.dumps({"Error": f"{e}"}), 400, content_type='application/json')
+                return Response(json_encoder.dumpb({"Error": f"{e}"}), 400, content_type='application/json')
 
         elif request_method == 'PUT' and (not no_config_name):
             if config_type in ['application/json', 'text/csv', 'text/plain']:
@@ -377,7 +378,7 @@ class VUIEndpoints:
                 return Response(None, 204, content_type='application/json')
             else:
                 return Response(
-                    json.dumps({"Error": "The configuration type can only be 'JSON', 'CSV' and 'RAW.'"}), 400,
+                    json_encoder.dumpb({"Error": "The configuration type can only be 'JSON', 'CSV' and 'RAW.'"}), 400,
                     content_type='application/json')
 
         elif request_method == 'POST' and no_config_name:
@@ -386,14 +387,14 @@ class VUIEndpoints:
                                          external_platform=platform)
                 if config_name in setting_list:
                     e = {'Error': f'Configuration: "{config_name}" already exists for agent: "{vip_identity}"'}
-                    return Response(json.dumps(e), 409, content_type='application/json')
+                    return Response(json_encoder.dumpb(e), 409, content_type='application/json')
                 self._insert_config(config_type, data, vip_identity, config_name, platform)
                 response = Response(None, 201, content_type='application/json')
                 response.location = f'/platforms/{platform}/agents/{vip_identity}/configs/{config_name}'
                 return response
             else:
                 return Response(
-                    json.dumps({"Error": "The configuration type can only be 'JSON', 'CSV' and 'RAW.'"}), 400,
+                    json_encoder.dumpb({"Error": "The configuration type can only be 'JSON', 'CSV' and 'RAW.'"}), 400,
                     content_type='application/json')
 
         elif request_method == 'DELETE':
@@ -402,14 +403,14 @@ class VUIEndpoints:
                     self._rpc(CONFIGURATION_STORE, 'manage_delete_store', vip_identity, external_platform=platform)
                     return Response(None, 204, content_type='application/json')
                 except RemoteError as e:
-                    return Response(json.dumps({"Error": f"{e}"}), 400, content_type='application/json')
+                    return Response(json_encoder.dumpb({"Error": f"{e}"}), 400, content_type='application/json')
             else:
                 try:
                     self._rpc(CONFIGURATION_STORE, 'manage_delete_config', vip_identity, config_name,
                               external_platform=platform)
                     return Response(None, 204, content_type='application/json')
                 except RemoteError as e:
-                    return Response(json.dumps({"Error": f"{e}"}), 400, content_type='application/json')
+                    return Response(json_encoder.dumpb({"Error": f"{e}"}), 400, content_type='application/json')
 
     @endpoint
     def handle_platforms_agents_enabled(self, env: dict, data: dict) -> Response | None:
@@ -432,24 +433,24 @@ class VUIEndpoints:
                 result = int(result) if result else result
                 status = True if result is not None else False
                 ret_val = {'status': status, 'priority': result}
-                return Response(json.dumps(ret_val), 200, content_type='application/json')
+                return Response(json_encoder.dumpb(ret_val), 200, content_type='application/json')
             except StopIteration:
-                return Response(json.dumps({'error': f'Agent "{vip_identity}" not found.'}),
+                return Response(json_encoder.dumpb({'error': f'Agent "{vip_identity}" not found.'}),
                                 400, content_type='application/json')
             except MethodNotFound or ValueError as e:
-                return Response(json.dumps({f'error': f'For agent {vip_identity}: {e}'}),
+                return Response(json_encoder.dumpb({f'error': f'For agent {vip_identity}: {e}'}),
                                 400, content_type='application/json')
 
         elif request_method == 'PUT':
             if not priority.isdigit() or not 0 <= int(priority) < 100:
                 error = {'error': f'Priority must be an integer from 0 - 99. Received: {priority}.'}
-                return Response(json.dumps(error), 400, content_type='application/json')
+                return Response(json_encoder.dumpb(error), 400, content_type='application/json')
             try:
                 uuid = self._rpc(CONTROL, 'identity_exists', vip_identity, external_platform=platform)
                 self._rpc(CONTROL, 'prioritize_agent', uuid, priority, external_platform=platform)
                 return Response(status=204)
             except MethodNotFound or ValueError as e:
-                return Response(json.dumps({f'error': f'For agent {vip_identity}: {e}'}),
+                return Response(json_encoder.dumpb({f'error': f'For agent {vip_identity}: {e}'}),
                                 400, content_type='application/json')
 
         elif request_method == 'DELETE':
@@ -458,7 +459,7 @@ class VUIEndpoints:
                 self._rpc(CONTROL, 'prioritize_agent', uuid, None, external_platform=platform)
                 return Response(status=204)
             except MethodNotFound or ValueError as e:
-                return Response(json.dumps({f'error': f'For agent {vip_identity}: {e}'}),
+                return Response(json_encoder.dumpb({f'error': f'For agent {vip_identity}: {e}'}),
                                 400, content_type='application/json')
 
     @endpoint
@@ -475,7 +476,7 @@ class VUIEndpoints:
         if request_method == 'GET':
             method_dict = self._rpc(vip_identity, 'inspect', external_platform=platform)
             response = self._links(path_info, method_dict.get('methods'))
-            return Response(json.dumps(response), 200, content_type='application/json')
+            return Response(json_encoder.dumpb(response), 200, content_type='application/json')
 
     @endpoint
     def handle_platforms_agents_rpc_method(self, env: dict, data: Union[dict, List]) -> Response | None:
@@ -493,9 +494,9 @@ class VUIEndpoints:
             try:
                 method_dict = self._rpc(vip_identity, method_name + '.inspect', external_platform=platform)
             except MethodNotFound as e:
-                return Response(json.dumps({f'error': f'for agent {vip_identity}: {e}'}),
+                return Response(json_encoder.dumpb({f'error': f'for agent {vip_identity}: {e}'}),
                                 400, content_type='application/json')
-            return Response(json.dumps(method_dict), 200, content_type='application/json')
+            return Response(json_encoder.dumpb(method_dict), 200, content_type='application/json')
 
         elif request_method == 'POST':
             try:
@@ -510,9 +511,9 @@ class VUIEndpoints:
                 else:
                     raise ValueError(f'Malformed message body: {data}')
             except MethodNotFound or ValueError as e:
-                return Response(json.dumps({f'error': f'for agent {vip_identity}: {e}'}),
+                return Response(json_encoder.dumpb({f'error': f'for agent {vip_identity}: {e}'}),
                                 400, content_type='application/json')
-            return Response(json.dumps(result), 200, content_type='application/json')
+            return Response(json_encoder.dumpb(result), 200, content_type='application/json')
 
     @endpoint
     def handle_platforms_agents_status(self, env: dict, data: dict) -> Response | None:
@@ -530,13 +531,13 @@ class VUIEndpoints:
             try:
                 status_dict = self._get_status(platform)
                 our_agent = status_dict[vip_identity]
-                return Response(json.dumps(our_agent), 200,
+                return Response(json_encoder.dumpb(our_agent), 200,
                                 content_type='application/json')
             except KeyError:
-                return Response(json.dumps({'error': f'Agent "{vip_identity}" not found.'}),
+                return Response(json_encoder.dumpb({'error': f'Agent "{vip_identity}" not found.'}),
                                 400, content_type='application/json')
             except MethodNotFound or ValueError as e:
-                return Response(json.dumps({f'error': f'For agent  {e}'}),
+                return Response(json_encoder.dumpb({f'error': f'For agent  {e}'}),
                                 400, content_type='application/json')
 
     @endpoint
@@ -554,19 +555,19 @@ class VUIEndpoints:
         if request_method == 'GET':
             try:
                 result = next(item['tag'] for item in list_of_agents if item['identity'] == vip_identity)
-                return Response(json.dumps({'tag': f"{result}"}), 200, content_type='application/json')
+                return Response(json_encoder.dumpb({'tag': f"{result}"}), 200, content_type='application/json')
             except StopIteration:
-                return Response(json.dumps({'error': f"Agent '{vip_identity}' not found."}),
+                return Response(json_encoder.dumpb({'error': f"Agent '{vip_identity}' not found."}),
                                 400, content_type='application/json')
             except MethodNotFound or ValueError as e:
-                return Response(json.dumps({f'error': f"For agent '{vip_identity}': {e}"}),
+                return Response(json_encoder.dumpb({f'error': f"For agent '{vip_identity}': {e}"}),
                                 400, content_type='application/json')
 
         elif request_method == 'PUT':
             tag = data.get('tag')
             uuid = self._rpc(CONTROL, 'identity_exists', vip_identity, external_platform=platform)
             if not uuid:
-                return Response(json.dumps({'error': f"Agent '{vip_identity}' not found."}),
+                return Response(json_encoder.dumpb({'error': f"Agent '{vip_identity}' not found."}),
                                 400, content_type='application/json')
             self._rpc(CONTROL, 'tag_agent', uuid, tag, external_platform=platform)
             return Response(status=204)
@@ -574,7 +575,7 @@ class VUIEndpoints:
         elif request_method == 'DELETE':
             uuid = self._rpc(CONTROL, 'identity_exists', vip_identity, external_platform=platform)
             if not uuid:
-                return Response(json.dumps({'error': f"Agent '{vip_identity}' not found."}),
+                return Response(json_encoder.dumpb({'error': f"Agent '{vip_identity}' not found."}),
                                 400, content_type='application/json')
             self._rpc(CONTROL, 'tag_agent', uuid, None, external_platform=platform)
             return Response(status=204)
@@ -605,10 +606,10 @@ class VUIEndpoints:
                     'tag': tag,
                     'selected_points': selection
                 }
-                raise ValueError(json.dumps(error_message))
+                raise ValueError(json_encoder.dumps(error_message))
             elif len(unwritables) == len(points):
-                raise ValueError(json.dumps({'error': 'No selected points are writable.',
-                                             'unwritable_points': unwritables}))
+                raise ValueError(json_encoder.dumps({'error': 'No selected points are writable.',
+                                                     'unwritable_points': unwritables}))
             else:
                 return confirm_values, selection, unwritables
 
@@ -633,7 +634,7 @@ class VUIEndpoints:
             try:
                 tag_list = self._rpc('platform.tagging', 'get_topics_by_tags', tag, external_platform=platform)
             except Timeout as e:
-                return Response(json.dumps({'error': f'Tagging Service timed out: {e}'}),
+                return Response(json_encoder.dumpb({'error': f'Tagging Service timed out: {e}'}),
                                 504, content_type='application/json')
         else:
             tag_list = None
@@ -643,11 +644,11 @@ class VUIEndpoints:
             device_tree = DeviceTree.from_store(platform, self._rpc).prune(topic, regex, tag_list)
             topic_nodes = device_tree.get_matches(f'devices/{topic}' if topic else 'devices')
             if not topic_nodes:
-                return Response(json.dumps({f'error': f'Device topic {topic} not found on platform: {platform}.'}),
+                return Response(json_encoder.dumpb({f'error': f'Device topic {topic} not found on platform: {platform}.'}),
                                 400, content_type='application/json')
             points = device_tree.points()
         except Timeout as e:
-            return Response(json.dumps({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
+            return Response(json_encoder.dumpb({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
 
         if request_method == 'GET':
             # Query parameters:
@@ -675,7 +676,7 @@ class VUIEndpoints:
                             ret_dict[point.topic]['writable'] = self._to_bool(point.data.get('Writable'))
                         if return_config:
                             ret_dict[point.topic]['config'] = point.data.get('config', {})
-                    return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                    return Response(json_encoder.dumpb(ret_dict), 200, content_type='application/json')
                 else:
                     # All topics are not complete to points and read_all=False -- return route to next segments:
                     ret_dict = {
@@ -683,10 +684,10 @@ class VUIEndpoints:
                                                                        replace_topic=topic,
                                                                        prefix=f'/vui/platforms/{platform}')
                     }
-                    return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                    return Response(json_encoder.dumpb(ret_dict), 200, content_type='application/json')
 
             except Timeout as e:
-                return Response(json.dumps({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
+                return Response(json_encoder.dumpb({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
 
         elif request_method == 'PUT':
             try:
@@ -713,12 +714,12 @@ class VUIEndpoints:
                         ret_dict[k]['value'] = ret_values[0].get(k)
                         ret_dict[k]['value_check_error'] = ret_values[1].get(k)
 
-                return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                return Response(json_encoder.dumpb(ret_dict), 200, content_type='application/json')
 
             except (LockError, OverrideError) as e:
-                return Response(json.dumps({'error': e}), 409, content_type='application/json')
+                return Response(json_encoder.dumpb({'error': e}), 409, content_type='application/json')
             except Timeout as e:
-                return Response(json.dumps({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
+                return Response(json_encoder.dumpb({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
 
         elif request_method == 'DELETE':
             try:
@@ -747,26 +748,25 @@ class VUIEndpoints:
                     for k in selected_routes.keys():
                         ret_dict[k]['value'] = ret_values[0].get(k)
                         ret_dict[k]['value_check_error'] = ret_values[1].get(k)
-                return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                return Response(json_encoder.dumpb(ret_dict), 200, content_type='application/json')
 
             except (LockError, OverrideError) as e:
-                return Response(json.dumps({'error': e}), 409, content_type='application/json')
+                return Response(json_encoder.dumpb({'error': e}), 409, content_type='application/json')
             except Timeout as e:
-                return Response(json.dumps({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
+                return Response(json_encoder.dumpb({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
 
         else:
             return Response(f'Endpoint {request_method} {path_info} is not implemented.',
                             status=501, content_type='text/plain')
 
     def handle_platforms_pubsub(self, env: dict, start_response, data: dict):
-        from volttron.services.web import get_bearer  # TODO: Is this necessary, with bearer imported in decorator?
         path_info = env.get('PATH_INFO')
         request_method = env.get("REQUEST_METHOD")
         query_params = parse_qs(env['QUERY_STRING'])
         _log.debug('VUI.handle_platforms_pubsub -- env is: ')
         _log.debug({k: str(v) for k, v in env.items()})
         _log.debug(f'HTTP_AUTHORIZATION is: {env["HTTP_AUTHORIZATION"]}')
-        access_token = get_bearer(env)
+        access_token = request_bearer(env)
 
         no_topic = re.match('^/vui/platforms/([^/]+)/pubsub/?$', path_info)
         if no_topic:
@@ -779,7 +779,7 @@ class VUIEndpoints:
         if request_method == 'GET':
             if not topic:
                 ret_dict = self.pubsub_manager.get_socket_routes(access_token, topic)
-                response = Response(json.dumps(ret_dict), 200, content_type='application/json')
+                response = Response(json_encoder.dumpb(ret_dict), 200, content_type='application/json')
                 return response
             else:
                 ws = self.pubsub_manager.open_subscription_socket(access_token, topic)
@@ -793,7 +793,7 @@ class VUIEndpoints:
             message = data.get('message')
             headers = data.get('headers')
             subscriber_count = self.pubsub_manager.publish(topic, headers, message)
-            return Response(json.dumps(subscriber_count), 200, content_type='application/json')
+            return Response(json_encoder.dumpb(subscriber_count), 200, content_type='application/json')
 
         # elif request_method == 'DELETE':
         #     # DELETE -- For ../pubsub and /pubsub/:topic, Close open web sockets and subscriptions for this user.
@@ -808,7 +808,7 @@ class VUIEndpoints:
 
         if request_method == 'GET':
             agents = self._get_agents(platform)
-            response = json.dumps(self._links(path_info, [agent for agent in agents if 'historian' in agent]))
+            response = json_encoder.dumpb(self._links(path_info, [agent for agent in agents if 'historian' in agent]))
             return Response(response, 200, content_type='application/json')
 
     @endpoint
@@ -820,7 +820,7 @@ class VUIEndpoints:
         if request_method == 'GET':
             links = {'links': {'topics': f'/vui/platforms/{platform}/historians/{vip_identity}/topics'}}
 
-            return Response(json.dumps(links), 200, content_type='application/json')
+            return Response(json_encoder.dumpb(links), 200, content_type='application/json')
 
     @endpoint
     def handle_platforms_historians_historian_topics(self, env: dict, data: dict) -> Response | None:
@@ -865,7 +865,7 @@ class VUIEndpoints:
                 tag_list = self._rpc('platform.tagging', 'get_topics_by_tags', tag,
                                      external_platform=platform).get(timeout=5)
             except Timeout as e:
-                return Response(json.dumps({'error': f'Tagging Service timed out: {e}'}),
+                return Response(json_encoder.dumpb({'error': f'Tagging Service timed out: {e}'}),
                                 504, content_type='application/json')
         else:
             tag_list = None
@@ -875,11 +875,11 @@ class VUIEndpoints:
             topic_nodes = historian_tree.get_matches(f'historians/{topic}' if topic else 'historians')
 
             if not topic_nodes:
-                return Response(json.dumps({f'error': f'Historian topic {topic} not found on platform: {platform}.'}),
+                return Response(json_encoder.dumpb({f'error': f'Historian topic {topic} not found on platform: {platform}.'}),
                                 400, content_type='application/json')
             points = historian_tree.leaves()
         except Timeout as e:
-            return Response(json.dumps({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
+            return Response(json_encoder.dumpb({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
 
         if request_method == 'GET':
             read_all = self._to_bool(query_params.get('read-all', False))
@@ -907,7 +907,7 @@ class VUIEndpoints:
                             ret_dict[point.topic][
                                 'route'] = f'/vui/platforms/{platform}/historians/{historian}/{point.identifier}'
 
-                    return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                    return Response(json_encoder.dumpb(ret_dict), 200, content_type='application/json')
 
                 else:
                     # All topics are not complete to points and read_all=False -- return route to next segments:
@@ -915,10 +915,10 @@ class VUIEndpoints:
                         'links': historian_tree.get_children_dict([n.identifier for n in topic_nodes],
                                                                           replace_topic=f'{historian}/topics/{topic}',
                                                                           prefix=f'/vui/platforms/{platform}')}
-                    return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                    return Response(json_encoder.dumpb(ret_dict), 200, content_type='application/json')
 
             except Timeout as e:
-                return Response(json.dumps({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
+                return Response(json_encoder.dumpb({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
 
         else:
             return Response(f'Endpoint {request_method} {path_info} is not implemented.',
@@ -939,10 +939,10 @@ class VUIEndpoints:
         if request_method == 'GET':
             try:
                 status_dict = self._get_status(platform)
-                return Response(json.dumps(status_dict), 200,
+                return Response(json_encoder.dumpb(status_dict), 200,
                                 content_type='application/json')
             except MethodNotFound or ValueError as e:
-                return Response(json.dumps({f'error': f'For agent  {e}'}),
+                return Response(json_encoder.dumpb({f'error': f'For agent  {e}'}),
                                 400, content_type='application/json')
         if request_method == 'DELETE':
             self._rpc(CONTROL, 'clear_status', True, external_platform=platform)
@@ -1023,7 +1023,7 @@ class VUIEndpoints:
         config_type = re.search(r'([^\/]+$)', config_type).group() if config_type in ['application/json',
                                                                                       'text/csv'] else 'raw'
         if config_type == 'json':
-            data = json.dumps(data)
+            data = json_encoder.dumpb(data)
         self._rpc(CONFIGURATION_STORE, 'manage_store', vip_identity, config_name, data, config_type,
                   external_platform=platform)
         return None
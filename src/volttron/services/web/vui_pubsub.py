@@ -22,10 +22,11 @@
 # ===----------------------------------------------------------------------===
 # }}}
 
-import json
 from weakref import WeakValueDictionary
 from collections import defaultdict
 
+from . import json_encoder
+from .request_auth import request_bearer
 from .websocket import VolttronWebSocket
 from ws4py.server.wsgiutils import WebSocketWSGIApplication
 from ws4py.websocket import WebSocket, EchoWebSocket
@@ -128,10 +129,9 @@ class VUIWebSocket(WebSocket):
         _log = logging.getLogger(self.__class__.__name__)
 
     def _get_topic(self):
-        from volttron.services.web import get_bearer
         path_info = self.environ['PATH_INFO']
         topic = path_info.split('/pubsub/')[1]
-        access_token = get_bearer(self.environ)
+        access_token = request_bearer(self.environ)
         return topic, access_token
 
     def opened(self):
@@ -163,6 +163,6 @@ class VUIWebSocket(WebSocket):
         _log.debug(f'message is: {message}')
         if not self.terminated:
             try:
-                self.send(json.dumps(message))
+                self.send(json_encoder.dumpb(message))
             except Exception as e:
                 _log.warning(f'Error sending subscription data: {e}')
@@ -22,10 +22,16 @@
 # ===----------------------------------------------------------------------===
 # }}}
 
+import hashlib
 import logging
 
 from ws4py.server.wsgiutils import WebSocketWSGIApplication
 
+from .admission import AdmissionController, LoadShed, request_priority
+from .compression import CompressionMiddleware
+from .ratelimit import RequestRateLimiter
+from .request_auth import authenticate_request, request_bearer
+from .static import FileResponse
 from .websocket import VolttronWebSocket
 
 _log = logging.getLogger(__name__)
@@ -44,6 +50,28 @@ class WebApplicationWrapper(object):
         self.clients = []
         self.endpoint_clients = {}
         self._wsregistry = {}
+        config = platformweb.config
+        self.admission = AdmissionController(max_concurrent=config.max_concurrent_requests,
+                                             max_queued=config.max_queued_requests,
+                                             max_wait=config.max_request_wait)
+
+        def limit(rate_limit):
+            return (rate_limit.rate, rate_limit.burst) if rate_limit is not None else None
+
+        self.rate_limiter = RequestRateLimiter(
+            per_ip=limit(config.rate_limit_per_ip),
+            per_user=limit(config.rate_limit_per_user),
+            per_route={prefix: limit(r) for prefix, r in config.rate_limit_per_route.items()},
+            user_key=self._rate_limit_user)
+
+        self.routing = platformweb.app_routing
+        if config.compression_enabled:
+            # Files sent with sendfile are left alone, path routes serve precompressed variants.
+            self.routing = CompressionMiddleware(platformweb.app_routing,
+                                                 min_size=config.compression_min_size,
+                                                 level=config.compression_level,
+                                                 brotli_quality=config.compression_brotli_quality,
+                                                 passthrough_types=(FileResponse,))
 
     def __call__(self, environ, start_response):
         """
@@ -59,7 +87,35 @@ class WebApplicationWrapper(object):
             environ['identity'] = self._wsregistry[environ['PATH_INFO']]
             return self.ws(environ, start_response)
 
-        return self.platformweb.app_routing(environ, start_response)
+        if self.rate_limiter.enabled:
+            retry_after = self.rate_limiter.check(environ)
+            if retry_after:
+                start_response('429 Too Many Requests', [('Content-Type', 'text/html'),
+                                                         ('Retry-After', str(retry_after))])
+                return [b'<h1>429 Too Many Requests</h1>']
+
+        # Websockets are long lived so only plain requests go through admission control.
+        try:
+            with self.admission.admit(request_priority(path)):
+                return self.routing(environ, start_response)
+        except LoadShed as e:
+            start_response('503 Service Unavailable', [('Content-Type', 'text/html'),
+                                                       ('Retry-After', str(e.retry_after))])
+            return [b'<h1>503 Service Unavailable</h1>']
+
+    def _rate_limit_user(self, environ):
+        """
+        Returns the key identifying the authenticated user of a request for rate limiting.
+
+        Only verified access tokens are trusted, the subject claim is used when present and
+        otherwise a digest of the token.  Anonymous requests return None.  The token is only
+        verified once the request passed the per address limit, and handlers reuse the claims.
+        """
+        claims = authenticate_request(environ, self.platformweb.get_user_claims)
+        if not claims:
+            return None
+        bearer = request_bearer(environ)
+        return claims.get('sub') or hashlib.sha256(bearer.encode('utf-8')).hexdigest()
 
     def favicon(self, environ, start_response):
         """
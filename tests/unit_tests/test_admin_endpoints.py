@@ -127,8 +127,8 @@ def test_persistent_users():
 
         another_ep = AdminEndpoints()
         assert oid != id(another_ep)
-        assert len(another_ep._userdict) == 1
-        assert username_test == list(another_ep._userdict)[0]
+        assert len(another_ep._user_store) == 1
+        assert username_test == list(another_ep._user_store)[0]
 
 
 def test_add_user():
@@ -176,3 +176,24 @@ def test_add_user():
         assert ['read_only', 'jr-devs'] == user['groups']
         assert user['hashed_password'] is not None
         assert original_hashed_passwordd != user['hashed_password']
+
+
+def test_claims_verified_without_rpc():
+    volttron_home = create_volttron_home()
+    with with_os_environ({'VOLTTRON_HOME': volttron_home}):
+        verified = []
+
+        def verify_claims(bearer):
+            verified.append(bearer)
+            return {'groups': ['vui']}
+
+        def rpc_caller(*args):
+            raise AssertionError("Claims must not be verified over RPC")
+
+        adminep = AdminEndpoints(rpc_caller=rpc_caller, verify_claims=verify_claims)
+        adminep.add_user('admin', 'wowsa', ['admin'])
+        env = get_test_web_env('/admin/pending_auth_reqs.html', HTTP_AUTHORIZATION='Bearer abc')
+        response = adminep.admin(env, {})
+        # The user is not an admin, but its token was checked in process.
+        assert response.status_code == 401
+        assert verified == ['abc']
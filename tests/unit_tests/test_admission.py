@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import gevent
+import pytest
+
+from gevent.event import Event
+
+from volttron.services.web.admission import (AdmissionController, HIGH_PRIORITY, LOW_PRIORITY, LoadShed,
+                                             NORMAL_PRIORITY, request_priority)
+
+
+@pytest.mark.parametrize("path, priority", [
+    ('/authenticate', HIGH_PRIORITY),
+    ('/admin/login.html', HIGH_PRIORITY),
+    ('/vui/platforms/p1/health/', HIGH_PRIORITY),
+    ('/vui/platforms/p1/devices', LOW_PRIORITY),
+    ('/index.html', NORMAL_PRIORITY),
+])
+def test_request_priority(path, priority):
+    assert request_priority(path) == priority
+
+
+def test_waiting_requests_admitted_by_priority():
+    controller = AdmissionController(max_concurrent=1, max_queued=10, max_wait=5)
+    release = Event()
+    order = []
+
+    def request(name, priority):
+        with controller.admit(priority):
+            order.append(name)
+            release.wait()
+
+    first = gevent.spawn(request, 'first', NORMAL_PRIORITY)
+    gevent.sleep(0)
+    waiting = [gevent.spawn(request, 'low', LOW_PRIORITY), gevent.spawn(request, 'high', HIGH_PRIORITY)]
+    gevent.sleep(0)
+    assert controller.stats()['queued'] == 2
+
+    release.set()
+    gevent.joinall([first] + waiting, raise_error=True)
+    assert order == ['first', 'high', 'low']
+    assert controller.stats()['active'] == 0
+
+
+def test_requests_shed_when_queue_is_full():
+    controller = AdmissionController(max_concurrent=1, max_queued=2, max_wait=5)
+    release = Event()
+
+    def hold(priority=NORMAL_PRIORITY):
+        with controller.admit(priority):
+            release.wait()
+
+    greenlets = [gevent.spawn(hold)]
+    gevent.sleep(0)
+    greenlets.append(gevent.spawn(hold))
+    gevent.sleep(0)
+
+    # Low priority requests are shed once the queue is half full.
+    with pytest.raises(LoadShed):
+        with controller.admit(LOW_PRIORITY):
+            pass
+    greenlets.append(gevent.spawn(hold))
+    gevent.sleep(0)
+    with pytest.raises(LoadShed):
+        with controller.admit(HIGH_PRIORITY):
+            pass
+    assert controller.stats()['shed'] == {'low': 1, 'high': 1}
+
+    release.set()
+    gevent.joinall(greenlets, raise_error=True)
+
+
+def test_request_shed_after_max_wait():
+    controller = AdmissionController(max_concurrent=1, max_queued=2, max_wait=0.01)
+    with controller.admit():
+        with pytest.raises(LoadShed) as e:
+            with controller.admit():
+                pass
+        assert e.value.retry_after == 1
+    # The abandoned queue entry does not hold a slot.
+    with controller.admit():
+        assert controller.stats()['active'] == 1
+
+
+def test_killed_waiter_does_not_hold_a_slot():
+    controller = AdmissionController(max_concurrent=2, max_queued=4, max_wait=5)
+    release = Event()
+
+    def request():
+        with controller.admit():
+            release.wait()
+
+    active = [gevent.spawn(request) for _ in range(2)]
+    gevent.sleep(0)
+    waiting = gevent.spawn(request)
+    gevent.sleep(0)
+    assert controller.stats()['queued'] == 1
+    waiting.kill()
+    release.set()
+    gevent.joinall(active)
+    assert controller.stats()['active'] == 0
+
+    # Every slot is still available.
+    release.clear()
+    active = [gevent.spawn(request) for _ in range(2)]
+    gevent.sleep(0)
+    assert controller.stats()['active'] == 2
+    assert controller.stats()['queued'] == 0
+    release.set()
+    gevent.joinall(active)
+
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import gzip
+import io
+import os
+import tarfile
+import zipfile
+
+import gevent
+import pytest
+import requests
+
+from ws4py.server.geventserver import WSGIServer
+
+from volttron.services.web.archive import ArchiveFiles, InvalidArchive
+from volttron.services.web.static import StaticFiles, StaticWSGIHandler
+
+INDEX = b'<html><body>agent ui</body></html>'
+SCRIPT = b'function render() { return 1; }\n' * 500
+BUNDLE = os.urandom(300000)
+
+
+def make_zip(path):
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('index.html', INDEX, compress_type=zipfile.ZIP_DEFLATED)
+        archive.writestr('js/app.js', SCRIPT, compress_type=zipfile.ZIP_DEFLATED)
+        archive.writestr('js/app.js.gz', gzip.compress(SCRIPT), compress_type=zipfile.ZIP_STORED)
+        archive.writestr('data/bundle.bin', BUNDLE, compress_type=zipfile.ZIP_STORED)
+        archive.writestr('../escape.txt', b'outside')
+    return path
+
+
+def make_tar(path, mode):
+    with tarfile.open(path, mode) as archive:
+        for name, content in (('index.html', INDEX), ('js/app.js', SCRIPT), ('data/bundle.bin', BUNDLE)):
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mtime = 1700000000
+            archive.addfile(info, io.BytesIO(content))
+    return path
+
+
+@pytest.fixture(params=['zip', 'tar', 'tar.gz'])
+def archive(request, tmp_path):
+    path = tmp_path / f'ui.{request.param}'
+    if request.param == 'zip':
+        make_zip(path)
+    else:
+        make_tar(path, 'w:gz' if request.param == 'tar.gz' else 'w')
+    archive = ArchiveFiles(str(path))
+    yield archive
+    archive.close()
+
+
+def serve(static_files, archive, path, **env):
+    response = {}
+
+    def start_response(status, headers):
+        response['status'] = status
+        response['headers'] = dict(headers)
+
+    env.setdefault('REQUEST_METHOD', 'GET')
+    body = static_files.serve(env, start_response, path, source=archive)
+    content = b''.join(bytes(chunk) for chunk in body)
+    getattr(body, 'close', lambda: None)()
+    return response['status'], response['headers'], content
+
+
+@pytest.mark.parametrize("max_cached_file_size", [1024 * 1024, 16])
+def test_serves_members(archive, max_cached_file_size):
+    static_files = StaticFiles(max_cached_file_size=max_cached_file_size)
+    status, headers, content = serve(static_files, archive, '/index.html')
+    assert status == '200 OK'
+    assert headers['Content-Type'] == 'text/html'
+    assert content == INDEX
+
+    assert serve(static_files, archive, '/js/app.js')[2] == SCRIPT
+    assert serve(static_files, archive, '/data/bundle.bin')[2] == BUNDLE
+    assert serve(static_files, archive, '/missing.js')[0] == '404 Not Found'
+    assert serve(static_files, archive, '/js/../index.html')[2] == INDEX
+
+
+def test_conditional_and_range_requests(archive):
+    static_files = StaticFiles()
+    etag = serve(static_files, archive, '/index.html')[1]['ETag']
+    assert serve(static_files, archive, '/index.html', HTTP_IF_NONE_MATCH=etag)[0] == '304 Not Modified'
+
+    status, headers, content = serve(static_files, archive, '/data/bundle.bin', HTTP_RANGE='bytes=1000-1999')
+    assert status == '206 Partial Content'
+    assert content == BUNDLE[1000:2000]
+
+
+def test_precompressed_member_and_traversal(tmp_path):
+    archive = ArchiveFiles(str(make_zip(tmp_path / 'ui.zip')))
+    static_files = StaticFiles()
+    status, headers, content = serve(static_files, archive, '/js/app.js', HTTP_ACCEPT_ENCODING='gzip')
+    assert headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(content) == SCRIPT
+    # Members naming paths outside of the archive are not served.
+    assert len(archive) == 4
+    assert serve(static_files, archive, '/../escape.txt')[0] == '404 Not Found'
+    archive.close()
+
+
+def test_unreadable_zip_members_skipped(tmp_path):
+    path = tmp_path / 'ui.zip'
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('index.html', INDEX, compress_type=zipfile.ZIP_DEFLATED)
+        archive.writestr('secret.txt', b'encrypted', compress_type=zipfile.ZIP_STORED)
+        archive.writestr('odd.txt', b'unknown method', compress_type=zipfile.ZIP_STORED)
+    # Mark one member encrypted and give the other an unknown compression method in the
+    # central directory.
+    data = bytearray(path.read_bytes())
+    for name, offset, value in ((b'secret.txt', 8, 0x1), (b'odd.txt', 10, 99)):
+        header = data.index(b'PK\x01\x02')
+        while data[header + 46:header + 46 + len(name)] != name:
+            header = data.index(b'PK\x01\x02', header + 4)
+        data[header + offset] |= value
+    path.write_bytes(bytes(data))
+
+    archive = ArchiveFiles(str(path))
+    static_files = StaticFiles()
+    assert len(archive) == 1
+    assert serve(static_files, archive, '/index.html')[2] == INDEX
+    assert serve(static_files, archive, '/secret.txt')[0] == '404 Not Found'
+    assert serve(static_files, archive, '/odd.txt')[0] == '404 Not Found'
+    archive.close()
+
+
+def test_stored_member_sent_with_sendfile(tmp_path):
+    archive = ArchiveFiles(str(make_zip(tmp_path / 'ui.zip')))
+    static_files = StaticFiles(max_cached_file_size=1024)
+
+    def app(env, start_response):
+        return static_files.serve(env, start_response, env['PATH_INFO'], source=archive)
+
+    server = WSGIServer(('127.0.0.1', 0), app, handler_class=StaticWSGIHandler)
+    server.start()
+    try:
+        url = f'http://127.0.0.1:{server.server_port}/data/bundle.bin'
+        whole = gevent.spawn(requests.get, url).get(timeout=10)
+        part = gevent.spawn(requests.get, url, headers={'Range': 'bytes=-100'}).get(timeout=10)
+    finally:
+        server.stop()
+        archive.close()
+    assert whole.content == BUNDLE
+    assert part.status_code == 206
+    assert part.content == BUNDLE[-100:]
+
+
+def test_invalid_archive(tmp_path):
+    path = tmp_path / 'ui.txt'
+    path.write_bytes(b'not an archive')
+    with pytest.raises(InvalidArchive):
+        ArchiveFiles(str(path))
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import pytest
+
+from web_utils import get_test_web_env
+
+from volttron.services.web.cache import ClaimsCache, LRUCache, ResponseCache, agent_response_etag, etag_matches
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_counts_hits_and_misses():
+    cache = LRUCache(maxsize=10)
+    assert cache.get('missing') is None
+    cache.put('key', 'value')
+    cache.get('key')
+    cache.get('key')
+    assert cache.stats() == dict(hits=2, misses=1, size=1, maxsize=10)
+
+
+def test_lru_cache_of_size_zero_stores_nothing():
+    cache = LRUCache(maxsize=0)
+    cache.put('key', 'value')
+    assert cache.get('key') is None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_bounded_by_weight():
+    cache = LRUCache(maxsize=10, maxweight=10, weigher=len)
+    cache.put('a', b'12345')
+    cache.put('b', b'12345')
+    cache.put('c', b'1')
+    assert 'a' not in cache
+    assert cache.weight == 6
+    # Values heavier than the cache are never stored.
+    cache.put('d', b'x' * 11)
+    assert 'd' not in cache
+
+
+@pytest.mark.parametrize("if_none_match, etag, expected", [
+    ('"abc"', '"abc"', True),
+    ('W/"abc"', '"abc"', True),
+    ('"x", "abc"', 'W/"abc"', True),
+    ('*', '"abc"', True),
+    ('"x"', '"abc"', False),
+    (None, '"abc"', False),
+])
+def test_etag_matches(if_none_match, etag, expected):
+    assert etag_matches(if_none_match, etag) == expected
+
+
+def test_response_cache_honors_max_age():
+    clock = FakeClock()
+    cache = ResponseCache(max_bytes=1024, clock=clock)
+    env = get_test_web_env('/agent/data', HTTP_CACHE_CONTROL='')
+    res = ['200 OK', 'payload', [['Cache-Control', 'max-age=10'], ['ETag', '"v1"']]]
+    assert cache.store('key', env, res)
+
+    entry = cache.lookup('key', env)
+    assert entry.response == res
+    assert entry.etag == '"v1"'
+
+    clock.now = 10
+    assert cache.lookup('key', env) is None
+
+
+@pytest.mark.parametrize("headers, env_kwargs", [
+    ([['Cache-Control', 'no-store, max-age=10']], {}),
+    ([['Cache-Control', 'private, max-age=10']], {}),
+    ([['ETag', '"v1"']], {}),
+    ([['Cache-Control', 'max-age=10'], ['Vary', '*']], {}),
+    # Authorized responses are only shared when explicitly public.
+    ([['Cache-Control', 'max-age=10']], {'HTTP_AUTHORIZATION': 'Bearer token'}),
+    ([['Cache-Control', 'max-age=10']], {'HTTP_COOKIE': 'Bearer=token'}),
+])
+def test_response_cache_does_not_store(headers, env_kwargs):
+    cache = ResponseCache(max_bytes=1024)
+    env = get_test_web_env('/agent/data', HTTP_CACHE_CONTROL='', **env_kwargs)
+    assert not cache.store('key', env, ['200 OK', 'payload', headers])
+    assert not cache.store('key', env, ['500 Error', 'payload', [['Cache-Control', 'max-age=10']]])
+
+
+def test_response_cache_stores_public_responses_to_credentialed_requests():
+    cache = ResponseCache(max_bytes=1024)
+    env = get_test_web_env('/agent/data', HTTP_CACHE_CONTROL='', HTTP_COOKIE='Bearer=token')
+    assert cache.store('key', env, ['200 OK', 'payload', [['Cache-Control', 'public, max-age=10']]])
+    assert cache.store('other', env, ['200 OK', 'payload', [['Cache-Control', 's-maxage=10']]])
+
+
+def test_response_cache_respects_vary_and_request_no_cache():
+    cache = ResponseCache(max_bytes=1024)
+    env = get_test_web_env('/agent/data', HTTP_CACHE_CONTROL='', HTTP_ACCEPT_LANGUAGE='en')
+    headers = [['Cache-Control', 'public, max-age=10'], ['Vary', 'Accept-Language']]
+    assert cache.store('key', env, ['200 OK', 'payload', headers])
+    assert cache.lookup('key', env) is not None
+    assert cache.lookup('key', dict(env, HTTP_ACCEPT_LANGUAGE='fr')) is None
+    assert cache.lookup('key', dict(env, HTTP_CACHE_CONTROL='no-cache')) is None
+
+
+def test_agent_response_etag():
+    assert agent_response_etag(['200 OK', 'body', [['etag', '"v1"']]]) == '"v1"'
+    assert agent_response_etag(('body', [('ETag', '"v1"')])) == '"v1"'
+    assert agent_response_etag(['404 Not Found', 'body', [['ETag', '"v1"']]]) is None
+    assert agent_response_etag(['200 OK', 'YWJj'], raw=True) is None
+    assert agent_response_etag({'result': 1}) is None
+
+
+def test_claims_cache_expires_with_token():
+    clock = FakeClock()
+    cache = ClaimsCache(maxsize=2, max_age=300, clock=clock)
+    cache.put('token-a', {'sub': 'admin', 'exp': 60})
+    cache.put('token-b', {'sub': 'vui'})
+    assert cache.get('token-a') == {'sub': 'admin', 'exp': 60}
+    assert cache.get('token-c') is None
+
+    clock.now = 60
+    assert cache.get('token-a') is None
+    assert cache.get('token-b') == {'sub': 'vui'}
+
+    # Tokens without an expiry are verified again after max_age.
+    clock.now = 300
+    assert cache.get('token-b') is None
+
+
+def test_claims_cache_is_bounded():
+    cache = ClaimsCache(maxsize=2, clock=FakeClock())
+    for token in ('a', 'b', 'c'):
+        cache.put(token, {'sub': token})
+    assert cache.get('a') is None
+    assert cache.get('c') == {'sub': 'c'}
+    cache.pop('c')
+    assert cache.get('c') is None
+    # Expired and missing tokens are never stored.
+    cache.put('d', {'exp': -1})
+    cache.put(None, {})
+    assert cache.stats()['size'] == 1
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import gzip
+import zlib
+
+import pytest
+
+from volttron.services.web.compression import (CompressionMiddleware, compress, is_compressible, negotiate_encoding,
+                                               parse_accept_encoding)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding('gzip, deflate;q=0.5, BR;q=bad') == {'gzip': 1.0, 'deflate': 0.5, 'br': 0.0}
+    assert parse_accept_encoding(None) == {}
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ('', None),
+    ('gzip', 'gzip'),
+    ('gzip, br', 'br'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('br;q=0, gzip;q=0', None),
+    ('*', 'br'),
+    ('*;q=0.5, br;q=0', 'gzip'),
+    ('identity', None),
+    ('gzip;q=0.5, identity', None),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_negotiate_encoding_from_available():
+    assert negotiate_encoding('gzip, br', available=('gzip',)) == 'gzip'
+    assert negotiate_encoding('br', available=('gzip',)) is None
+    assert negotiate_encoding('gzip', available=()) is None
+
+
+@pytest.mark.parametrize("content_type, expected", [
+    ('text/html', True),
+    ('application/javascript', True),
+    ('application/json; charset=utf-8', True),
+    ('application/vnd.api+json', True),
+    ('image/png', False),
+    ('application/gzip', False),
+    (None, False),
+])
+def test_is_compressible(content_type, expected):
+    assert is_compressible(content_type) == expected
+
+
+def test_compress_gzip():
+    data = b'{"points": [1, 2, 3]}' * 100
+    assert gzip.decompress(compress(data, 'gzip')) == data
+    with pytest.raises(ValueError):
+        compress(data, 'deflate')
+
+
+def run(app, accept_encoding='gzip', method='GET', **kwargs):
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = status
+        response['headers'] = dict(headers)
+        return response.setdefault('written', []).append
+
+    middleware = CompressionMiddleware(app, **kwargs)
+    body = middleware({'HTTP_ACCEPT_ENCODING': accept_encoding, 'REQUEST_METHOD': method}, start_response)
+    content = b''.join(body)
+    # Data given to the write callable precedes the returned body.
+    content = b''.join(response.get('written', [])) + content
+    return response['status'], response['headers'], content
+
+
+def json_app(content, headers=(('Content-Type', 'application/json'),), status='200 OK'):
+    def app(environ, start_response):
+        start_response(status, list(headers))
+        return [content]
+    return app
+
+
+PAYLOAD = b'{"point": "devices/campus/building/rtu/temperature", "value": 72.5}' * 50
+
+
+def test_compresses_large_responses():
+    status, headers, content = run(json_app(PAYLOAD, headers=[('Content-Type', 'application/json'),
+                                                             ('Content-Length', str(len(PAYLOAD))),
+                                                             ('ETag', '"abc"')]))
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert headers['ETag'] == 'W/"abc"'
+    assert 'Content-Length' not in headers
+    assert gzip.decompress(content) == PAYLOAD
+
+
+@pytest.mark.parametrize("app, accept_encoding, method", [
+    (json_app(b'{"a": 1}'), 'gzip', 'GET'),
+    (json_app(PAYLOAD), None, 'GET'),
+    (json_app(PAYLOAD), 'gzip', 'HEAD'),
+    (json_app(PAYLOAD, headers=[('Content-Type', 'image/png')]), 'gzip', 'GET'),
+    (json_app(PAYLOAD, headers=[('Content-Type', 'application/json'), ('Content-Encoding', 'gzip')]), 'gzip', 'GET'),
+    (json_app(PAYLOAD, headers=[('Content-Type', 'text/plain'), ('Cache-Control', 'no-transform')]), 'gzip', 'GET'),
+    (json_app(PAYLOAD, status='206 Partial Content'), 'gzip', 'GET'),
+])
+def test_leaves_responses_alone(app, accept_encoding, method):
+    status, headers, content = run(app, accept_encoding=accept_encoding, method=method)
+    # The body is passed through as the application produced it.
+    assert content in (b'{"a": 1}', PAYLOAD)
+    assert 'Vary' not in headers
+
+
+def test_small_list_gets_content_length():
+    status, headers, content = run(json_app(b'{"a": 1}'))
+    assert headers['Content-Length'] == '8'
+    assert content == b'{"a": 1}'
+
+
+def test_streams_iterables_chunk_by_chunk():
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/event-stream')])
+        for i in range(3):
+            yield f'data: {i}\n\n'.encode()
+
+    middleware = CompressionMiddleware(app, min_size=1024)
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    body = middleware({'HTTP_ACCEPT_ENCODING': 'gzip', 'REQUEST_METHOD': 'GET'}, lambda status, headers: None)
+    # Each chunk can be decompressed as soon as it is received.
+    assert decompressor.decompress(next(body)) == b'data: 0\n\n'
+    assert decompressor.decompress(next(body)) == b'data: 1\n\n'
+    assert decompressor.decompress(b''.join(body)) == b'data: 2\n\n'
+
+
+def test_passthrough_types():
+    class FileBody(list):
+        pass
+
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return FileBody([PAYLOAD])
+
+    status, headers, content = run(app, passthrough_types=(FileBody,))
+    assert 'Content-Encoding' not in headers
+    assert content == PAYLOAD
+
+
+def test_write_callable_is_compressed():
+    def app(environ, start_response):
+        write = start_response('200 OK', [('Content-Type', 'text/html')])
+        write(PAYLOAD)
+        return []
+
+    status, headers, content = run(app)
+    assert headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(content) == PAYLOAD
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import datetime
+import json
+
+import attr
+import pytest
+
+from volttron.services.web import json_encoder
+from volttron.services.web.json_encoder import JSONEncoder
+
+
+@attr.s
+class Point(object):
+    name = attr.ib()
+    value = attr.ib()
+
+
+DOCUMENT = {'devices/campus/rtu': {'temperature': 72.5, 'occupied': True, 'setpoint': None},
+            'points': [Point('temperature', 72.5)], 'name': 'café', 1: 'one', 'big': 2 ** 70}
+
+
+@pytest.mark.parametrize("name", ['stdlib', 'orjson', 'ujson', 'auto'])
+def test_encoders_agree(name):
+    encoder = JSONEncoder(name)
+    data = encoder.dumpb(DOCUMENT)
+    assert isinstance(data, bytes)
+    expected = json.loads(json.dumps(DOCUMENT, default=attr.asdict))
+    assert json.loads(data) == expected
+    assert json.loads(encoder.dumps(DOCUMENT)) == expected
+
+
+def test_unknown_encoder():
+    with pytest.raises(ValueError):
+        JSONEncoder('simplejson')
+
+
+def test_missing_encoder_falls_back(monkeypatch):
+    monkeypatch.setattr(json_encoder, 'orjson', None)
+    assert JSONEncoder('orjson').name == 'stdlib'
+
+
+def test_unserializable_objects_raise():
+    for name in ('stdlib', 'auto'):
+        with pytest.raises(TypeError):
+            JSONEncoder(name).dumpb({'value': object()})
+
+
+def test_configure():
+    assert json_encoder.configure('stdlib').name == 'stdlib'
+    assert json_encoder.dumpb({'a': 1}) == b'{"a": 1}'
+    assert json_encoder.dumps({'a': 1}) == '{"a": 1}'
+
+
+@pytest.mark.parametrize("name", ['stdlib', 'orjson', 'ujson', 'auto'])
+def test_non_finite_floats_written_as_by_json_module(name):
+    document = {'value': float('nan'), 'readings': [1.5, float('inf'), -float('inf')], 'missing': None}
+    expected = json.dumps(document, separators=(',', ':'))
+    encoder = JSONEncoder(name)
+    assert encoder.dumpb(document).decode('utf-8').replace(' ', '') == expected
+    assert encoder.dumps(document).replace(' ', '') == expected
+
+
+@pytest.mark.parametrize("name", ['stdlib', 'orjson', 'auto'])
+def test_datetimes_refused_by_every_encoder(name):
+    with pytest.raises(TypeError):
+        JSONEncoder(name).dumpb({'time': datetime.datetime(2022, 1, 1)})
+
+
+def test_default_encoder_is_json_module():
+    assert JSONEncoder().name == 'stdlib'
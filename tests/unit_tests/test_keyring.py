@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import datetime
+
+import jwt
+import pytest
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from volttron.services.web.keyring import Keyring
+
+
+def write_key_pair(directory, name='web'):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, name)])
+    now = datetime.datetime.utcnow()
+    cert = x509.CertificateBuilder().subject_name(subject).issuer_name(subject).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()).not_valid_before(now) \
+        .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256())
+    cert_file, key_file = directory / f'{name}.crt', directory / f'{name}.pem'
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL,
+                                           serialization.NoEncryption()))
+    return cert_file, key_file
+
+
+@pytest.fixture
+def key_pair(tmp_path):
+    return write_key_pair(tmp_path)
+
+
+def test_keys_sign_and_verify_tokens(key_pair):
+    keyring = Keyring(*key_pair)
+    assert keyring.public_key_pem.startswith('-----BEGIN PUBLIC KEY-----')
+    token = jwt.encode({'sub': 'admin'}, keyring.private_key, algorithm='RS256')
+    assert jwt.decode(token, keyring.public_key, algorithms='RS256') == {'sub': 'admin'}
+    assert jwt.decode(token, keyring.public_key_pem, algorithms='RS256') == {'sub': 'admin'}
+
+
+def test_reload_replaces_keys(tmp_path, key_pair):
+    keyring = Keyring(*key_pair)
+    context = keyring.ssl_context()
+    reloads = []
+    keyring.on_reload(lambda: reloads.append(keyring.version))
+    old_pem = keyring.public_key_pem
+
+    other = tmp_path / 'other'
+    other.mkdir()
+    for new, old in zip(write_key_pair(other), key_pair):
+        old.write_bytes(new.read_bytes())
+    assert keyring.reload()
+    assert keyring.public_key_pem != old_pem
+    assert reloads == [2]
+    assert keyring.ssl_context() is context
+
+
+def test_mismatched_key_is_not_loaded(tmp_path, key_pair):
+    keyring = Keyring(*key_pair)
+    other = tmp_path / 'other'
+    other.mkdir()
+    # The certificate was replaced but not yet its key.
+    key_pair[0].write_bytes(write_key_pair(other)[0].read_bytes())
+    assert not keyring.reload()
+    assert keyring.version == 1
+    with pytest.raises(ValueError):
+        Keyring(*key_pair)
+
+
+def test_failed_reload_keeps_keys(key_pair):
+    keyring = Keyring(*key_pair)
+    public_key = keyring.public_key
+    key_pair[0].write_bytes(b'partially written')
+    assert not keyring.reload()
+    assert keyring.public_key is public_key
+    assert keyring.version == 1
+
+
+def test_certificate_without_private_key(key_pair):
+    keyring = Keyring(key_pair[0])
+    assert keyring.private_key is None
+    assert keyring.files == {str(key_pair[0])}
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import threading
+
+import gevent
+import pytest
+from passlib.hash import argon2
+
+from volttron.services.web.passwords import PasswordHasher
+
+# Cheap parameters keep the tests fast, production hashes use passlib's defaults.
+FAST_ARGON2 = argon2.using(rounds=1, memory_cost=8, parallelism=1)
+
+
+def test_hash_and_verify():
+    hasher = PasswordHasher(scheme=FAST_ARGON2)
+    hashed = hasher.hash('secret')
+    assert hashed.startswith('$argon2')
+    assert hasher.verify('secret', hashed)
+    assert not hasher.verify('wrong', hashed)
+    # Hashes made with other parameters are still verified.
+    assert hasher.verify('wowsa', argon2.using(rounds=2).hash('wowsa'))
+    stats = hasher.stats()
+    assert stats['hashed'] == 1
+    assert stats['verified'] == 3
+    assert stats['rejected'] == 1
+    assert stats['verify_latency_max'] >= stats['verify_latency_mean'] > 0
+    hasher.close()
+
+
+class BlockingScheme(object):
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def verify(self, password, hashed):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+        return password == hashed
+
+
+def test_verification_runs_off_the_hub_with_bounded_concurrency():
+    scheme = BlockingScheme()
+    hasher = PasswordHasher(max_concurrent=2, scheme=scheme)
+    logins = [gevent.spawn(hasher.verify, 'pw', 'pw') for _ in range(5)]
+    # The hub keeps running other greenlets while verifications are blocked in threads.
+    assert gevent.spawn(lambda: 'served').get(timeout=1) == 'served'
+    gevent.sleep(0.1)
+    stats = hasher.stats()
+    assert stats['active'] == 2
+    assert stats['queued'] == 3
+    scheme.release.set()
+    assert all(g.get(timeout=5) for g in logins)
+    assert scheme.max_running == 2
+    assert hasher.stats()['verified'] == 5
+    hasher.close()
+
+
+def test_missing_scheme_raises():
+    hasher = PasswordHasher()
+    hasher.scheme = None
+    with pytest.raises(ValueError):
+        hasher.hash('secret')
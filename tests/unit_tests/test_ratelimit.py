@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import pytest
+
+from volttron.services.web.ratelimit import RequestRateLimiter, TokenBucketLimiter
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_limits():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.acquire('a') for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire('a') == pytest.approx(0.5)
+    # Other keys have their own bucket.
+    assert limiter.acquire('b') == 0
+
+    clock.now += 0.5
+    assert limiter.acquire('a') == 0
+    assert limiter.acquire('a') > 0
+    assert limiter.stats() == dict(keys=2, rejected=2)
+
+
+def test_token_bucket_expires_idle_keys():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=2, clock=clock)
+    limiter.acquire('a')
+    clock.now += 1
+    limiter.acquire('b')
+    assert len(limiter) == 2
+
+    # 'a' has had time to refill completely and is forgotten.
+    clock.now += 1
+    limiter.acquire('c')
+    assert len(limiter) == 2
+    clock.now += 5
+    limiter.acquire('c')
+    assert len(limiter) == 1
+
+
+def test_token_bucket_bounds_number_of_keys():
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=10, clock=FakeClock())
+    for key in range(100):
+        limiter.acquire(key)
+    assert len(limiter) == 10
+
+
+def test_request_rate_limiter():
+    users = {'token-a': 'alice'}
+    limiter = RequestRateLimiter(per_ip=(1, 3), per_user=(1, 1),
+                                 per_route={'/vui': (1, 1), '/vui/platforms': (1, 2)},
+                                 user_key=lambda env: users.get(env.get('token')), clock=FakeClock())
+
+    # Anonymous requests are limited by address and by route, the longest prefix applies.
+    env = {'REMOTE_ADDR': '10.0.0.1', 'PATH_INFO': '/vui/platforms/p1/devices'}
+    assert limiter.check(env) == 0
+    assert limiter.check(env) == 0
+    assert limiter.check(env) == 1
+    assert limiter.check(dict(env, REMOTE_ADDR='10.0.0.2')) == 0
+
+    # Authenticated requests are also limited per user.
+    env = {'REMOTE_ADDR': '10.0.0.3', 'PATH_INFO': '/index.html', 'token': 'token-a'}
+    assert limiter.check(env) == 0
+    assert limiter.check(dict(env, REMOTE_ADDR='10.0.0.4')) == 1
+    assert limiter.stats()['user'] == dict(keys=1, rejected=1)
+
+
+def test_request_rate_limiter_disabled():
+    limiter = RequestRateLimiter()
+    assert not limiter.enabled
+    assert limiter.check({'REMOTE_ADDR': '10.0.0.1', 'PATH_INFO': '/'}) == 0
+
+
+def test_user_key_not_computed_for_requests_over_address_limit():
+    # Computing the user key verifies the token, requests over the address limit skip it.
+    calls = []
+    limiter = RequestRateLimiter(per_ip=(1, 1), per_user=(10, 10),
+                                 user_key=lambda env: calls.append(env) or 'alice', clock=FakeClock())
+    env = {'REMOTE_ADDR': '10.0.0.1', 'PATH_INFO': '/'}
+    assert limiter.check(env) == 0
+    assert limiter.check(env) == 1
+    assert len(calls) == 1
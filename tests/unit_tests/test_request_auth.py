@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import pytest
+
+from web_utils import get_test_web_env
+
+from volttron.services.web import NotAuthorized
+from volttron.services.web.request_auth import (AUTH_ERROR_KEY, CLAIMS_KEY, authenticate_request, request_bearer,
+                                                request_claims)
+
+
+class CountingVerifier(object):
+
+    def __init__(self, claims=None, error=None):
+        self.claims = claims
+        self.error = error
+        self.calls = []
+
+    def __call__(self, bearer):
+        self.calls.append(bearer)
+        if self.error is not None:
+            raise self.error
+        return self.claims
+
+
+def test_request_verified_once():
+    env = get_test_web_env('/vui/', HTTP_AUTHORIZATION='Bearer abc')
+    verify = CountingVerifier(claims={'groups': ['vui']})
+    assert authenticate_request(env, verify) == {'groups': ['vui']}
+    assert request_claims(env, verify) == {'groups': ['vui']}
+    assert request_bearer(env) == 'abc'
+    assert verify.calls == ['abc']
+
+
+def test_request_bearer_read_from_cookie():
+    env = get_test_web_env('/vui/', HTTP_COOKIE='Bearer=abc')
+    verify = CountingVerifier(claims={'groups': ['vui']})
+    assert request_claims(env, verify) == {'groups': ['vui']}
+    assert verify.calls == ['abc']
+
+
+def test_anonymous_request_is_not_authorized():
+    env = get_test_web_env('/vui/')
+    verify = CountingVerifier(claims={})
+    assert authenticate_request(env, verify) is None
+    assert isinstance(env[AUTH_ERROR_KEY], NotAuthorized)
+    with pytest.raises(NotAuthorized):
+        request_claims(env, verify)
+    with pytest.raises(NotAuthorized):
+        request_bearer(env)
+    assert verify.calls == []
+
+
+def test_verification_error_raised_to_handlers():
+    env = get_test_web_env('/admin/', HTTP_AUTHORIZATION='Bearer expired')
+    verify = CountingVerifier(error=ValueError('expired'))
+    assert authenticate_request(env, verify) is None
+    assert env[CLAIMS_KEY] is None
+    with pytest.raises(ValueError):
+        request_claims(env, verify)
+    assert request_bearer(env) == 'expired'
+    assert verify.calls == ['expired']
+
+
+def test_request_claims_authenticates_when_stage_skipped():
+    env = get_test_web_env('/admin/', HTTP_AUTHORIZATION='Bearer abc')
+    verify = CountingVerifier(claims={'groups': ['admin']})
+    assert request_claims(env, verify) == {'groups': ['admin']}
+    assert env[CLAIMS_KEY] == {'groups': ['admin']}
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import pytest
+
+from web_utils import get_test_web_env
+
+from volttron.services.web.request_body import RequestBody, RequestEntityTooLarge
+
+
+def test_body_is_not_read_until_requested():
+    env = get_test_web_env('/upload', input_data=b'abc', method='POST')
+    body = RequestBody(env)
+    assert env['wsgi.input'].tell() == 0
+    assert body.read() == b'abc'
+    # Reading again returns the buffered content.
+    assert body.read() == b'abc'
+    assert list(body.iter_chunks(chunk_size=2)) == [b'ab', b'c']
+
+
+def test_iter_chunks_streams_input():
+    content = bytes(range(256)) * 10
+    env = get_test_web_env('/upload', input_data=content, method='POST')
+    body = RequestBody(env, chunk_size=1000)
+    chunks = list(body.iter_chunks())
+    assert [len(c) for c in chunks] == [1000, 1000, 560]
+    assert b''.join(chunks) == content
+
+
+def test_declared_length_over_limit():
+    env = get_test_web_env('/upload', input_data=b'x' * 11, method='POST')
+    body = RequestBody(env, max_size=10)
+    assert body.exceeds_limit()
+    with pytest.raises(RequestEntityTooLarge):
+        body.read()
+
+
+def test_undeclared_length_over_limit_stops_reading():
+    env = get_test_web_env('/upload', input_data=b'x' * 11, method='POST', CONTENT_LENGTH='')
+    body = RequestBody(env, max_size=10, chunk_size=4)
+    assert not body.exceeds_limit()
+    with pytest.raises(RequestEntityTooLarge):
+        body.read()
+
+
+def test_text_keeps_binary_payloads_as_bytes():
+    env = get_test_web_env('/upload', input_data=b'\xff\xfe\x00', method='POST')
+    assert RequestBody(env).text() == b'\xff\xfe\x00'
+    env = get_test_web_env('/upload', input_data='héllo'.encode('utf-8'), method='POST')
+    assert RequestBody(env).text() == 'héllo'
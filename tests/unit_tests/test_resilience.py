@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import gevent
+import pytest
+
+from gevent.event import Event
+
+from volttron.services.web.resilience import BulkheadFull, CircuitBreaker, CircuitOpen, PeerBulkhead, SingleFlight
+
+
+def test_bulkhead_rejects_beyond_queue_depth():
+    bulkhead = PeerBulkhead(max_in_flight=1, max_queued=1, queue_timeout=0.5)
+    release = Event()
+
+    def hold():
+        with bulkhead.limit('agent'):
+            release.wait()
+
+    holder = gevent.spawn(hold)
+    waiter = gevent.spawn(hold)
+    gevent.sleep(0)
+    assert bulkhead.stats()['agent'] == dict(in_flight=1, queued=1, rejected=0)
+
+    with pytest.raises(BulkheadFull) as e:
+        with bulkhead.limit('agent'):
+            pass
+    assert e.value.retry_after == 1
+    assert bulkhead.stats()['agent']['rejected'] == 1
+
+    release.set()
+    gevent.joinall([holder, waiter], raise_error=True)
+    assert bulkhead.stats()['agent'] == dict(in_flight=0, queued=0, rejected=1)
+
+
+def test_bulkhead_times_out_queued_requests():
+    bulkhead = PeerBulkhead(max_in_flight=1, max_queued=5, queue_timeout=0.01)
+    with bulkhead.limit('agent'):
+        with pytest.raises(BulkheadFull):
+            with bulkhead.limit('agent'):
+                pass
+        # Other peers have their own slots.
+        with bulkhead.limit('other'):
+            pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail(breaker, peer='agent'):
+    with pytest.raises(TimeoutError):
+        with breaker.guard(peer):
+            raise TimeoutError()
+
+
+def test_circuit_opens_after_consecutive_failures_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker((TimeoutError,), failure_threshold=2, reset_timeout=10, clock=clock)
+    fail(breaker)
+    assert breaker.state('agent') == CircuitBreaker.CLOSED
+    fail(breaker)
+    assert breaker.state('agent') == CircuitBreaker.OPEN
+
+    clock.now = 4
+    with pytest.raises(CircuitOpen) as e:
+        with breaker.guard('agent'):
+            pass
+    assert e.value.retry_after == 6
+
+    # After the reset timeout a single probe is let through.
+    clock.now = 10
+    assert breaker.state('agent') == CircuitBreaker.HALF_OPEN
+    with breaker.guard('agent'):
+        with pytest.raises(CircuitOpen):
+            with breaker.guard('agent'):
+                pass
+    assert breaker.state('agent') == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker((TimeoutError,), failure_threshold=1, reset_timeout=10, clock=clock)
+    fail(breaker)
+    clock.now = 10
+    fail(breaker)
+    assert breaker.state('agent') == CircuitBreaker.OPEN
+    assert breaker.stats()['agent'] == dict(state=CircuitBreaker.OPEN, failures=2)
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker((TimeoutError,), failure_threshold=2)
+    fail(breaker)
+    with breaker.guard('agent'):
+        pass
+    fail(breaker)
+    assert breaker.state('agent') == CircuitBreaker.CLOSED
+
+
+def test_disconnected_peer_stays_open_until_connected():
+    clock = FakeClock()
+    breaker = CircuitBreaker((TimeoutError,), reset_timeout=10, clock=clock)
+    breaker.peer_disconnected('agent')
+    clock.now = 100
+    assert breaker.state('agent') == CircuitBreaker.OPEN
+    breaker.peer_connected('agent')
+    with breaker.guard('agent'):
+        pass
+
+
+def test_single_flight_shares_concurrent_result():
+    single_flight = SingleFlight()
+    release = Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait()
+        return 'payload'
+
+    greenlets = [gevent.spawn(single_flight.call, 'agent', '/data', fetch) for _ in range(5)]
+    gevent.sleep(0)
+    release.set()
+    gevent.joinall(greenlets, raise_error=True)
+    assert [g.value for g in greenlets] == ['payload'] * 5
+    assert len(calls) == 1
+    assert single_flight.stats() == {'agent': 4}
+
+    # Once complete the next call is made again.
+    assert single_flight.call('agent', '/data', fetch) == 'payload'
+    assert len(calls) == 2
+
+
+def test_single_flight_shares_exceptions():
+    single_flight = SingleFlight()
+    release = Event()
+
+    def fetch():
+        release.wait()
+        raise ValueError("boom")
+
+    greenlets = [gevent.spawn(single_flight.call, 'agent', '/data', fetch) for _ in range(2)]
+    gevent.sleep(0)
+    release.set()
+    gevent.joinall(greenlets)
+    assert all(isinstance(g.exception, ValueError) for g in greenlets)
+
+
+def test_single_flight_does_not_share_unshareable_results():
+    single_flight = SingleFlight()
+    release = Event()
+    handles = iter(range(10))
+
+    def fetch():
+        release.wait()
+        return {'stream': next(handles)}
+
+    greenlets = [gevent.spawn(single_flight.call, 'agent', '/export', fetch, shareable=lambda res: False)
+                 for _ in range(3)]
+    gevent.sleep(0)
+    release.set()
+    gevent.joinall(greenlets, raise_error=True)
+    assert sorted(g.value['stream'] for g in greenlets) == [0, 1, 2]
+    assert single_flight.stats() == {}
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import os
+
+from volttrontesting.platformwrapper import create_volttron_home, with_os_environ
+
+from volttron.utils import jsonapi
+from volttron.services.web.revocation import BloomFilter, RevocationList, token_digest
+
+
+class FakeClock(object):
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    digests = [token_digest(f'token-{i}') for i in range(1000)]
+    for digest in digests:
+        bloom.add(digest)
+    assert all(digest in bloom for digest in digests)
+    false_positives = sum(token_digest(f'other-{i}') in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_revoked_token_refused_until_expiry():
+    volttron_home = create_volttron_home()
+    with with_os_environ({'VOLTTRON_HOME': volttron_home}):
+        clock = FakeClock()
+        revoked = []
+        revocations = RevocationList(clock=clock)
+        revocations.on_revoke(revoked.append)
+        assert not revocations.is_revoked('abc')
+        revocations.revoke('abc', exp=1100)
+        assert revocations.is_revoked('abc')
+        assert not revocations.is_revoked('def')
+        assert revoked == ['abc']
+        clock.now = 1100
+        assert not revocations.is_revoked('abc')
+
+
+def test_expired_tokens_are_not_stored():
+    volttron_home = create_volttron_home()
+    with with_os_environ({'VOLTTRON_HOME': volttron_home}):
+        revocations = RevocationList(clock=FakeClock())
+        revocations.revoke('abc', exp=900)
+        assert len(revocations) == 0
+        assert not revocations.is_revoked('abc')
+
+
+def test_revocations_persisted_and_purged_on_load():
+    volttron_home = create_volttron_home()
+    with with_os_environ({'VOLTTRON_HOME': volttron_home}):
+        clock = FakeClock()
+        revocations = RevocationList(clock=clock)
+        revocations.revoke('short', exp=1100)
+        revocations.revoke('long', exp=5000)
+        with open(os.path.join(volttron_home, 'web-revoked-tokens.json')) as fp:
+            assert len(jsonapi.load(fp)) == 2
+
+        clock.now = 2000
+        reloaded = RevocationList(clock=clock)
+        assert len(reloaded) == 1
+        assert reloaded.is_revoked('long')
+        assert not reloaded.is_revoked('short')
+
+
+def test_filter_grows_past_capacity():
+    volttron_home = create_volttron_home()
+    with with_os_environ({'VOLTTRON_HOME': volttron_home}):
+        revocations = RevocationList(capacity=2, clock=FakeClock())
+        for i in range(5):
+            revocations.revoke(f'token-{i}', exp=5000)
+        assert all(revocations.is_revoked(f'token-{i}') for i in range(5))
+        assert revocations.stats()['filter_capacity'] >= 5
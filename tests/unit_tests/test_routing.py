@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import re
+
+import pytest
+
+from volttron.services.web.routing import RouteTable, literal_prefix
+
+ROUTE_PATTERNS = [
+    r'/gs',
+    '^/admin.*',
+    '^/vui/?$',
+    '^/vui/platforms/?$',
+    '^/vui/platforms/[^/]+/?$',
+    '^/vui/platforms/[^/]+/agents/?$',
+    '^/vui/platforms/[^/]+/agents/[^/]+/configs/.*/?$',
+    '^/vui/platforms/[^/]+/devices/.*/?$',
+    '^/authenticate',
+    '(?i)^/CaseLess',
+    r'^/(foo|bar)/(\d+)/\2',
+    '^/.*$',
+]
+
+PATHS = ['/', '/gs', '/gsx', '/admin', '/admin/login.html', '/vui', '/vui/', '/vui/platforms',
+         '/vui/platforms/p1', '/vui/platforms/p1/agents/', '/vui/platforms/p1/agents/a/configs/c.csv',
+         '/vui/platforms/p1/devices/Campus/Building', '/authenticate', '/caseless', '/foo/1/1',
+         '/bar/2/3', '/index.html', 'no-leading-slash']
+
+
+def linear_match(routes, path):
+    for route in routes:
+        if route[0].match(path):
+            return route
+    return None
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    ('^/vui/?$', '/vui'),
+    ('^/vui/platforms/[^/]+/?$', '/vui/platforms/'),
+    ('/gs', '/gs'),
+    (r'^/static\.files/x+', '/static.files/x'),
+    ('^/a*', '/'),
+    ('^/(foo|bar)', ''),
+    ('^.*$', ''),
+])
+def test_literal_prefix(pattern, expected):
+    assert literal_prefix(re.compile(pattern)) == expected
+
+
+def test_literal_prefix_ignores_case_insensitive_patterns():
+    assert literal_prefix(re.compile('^/admin', re.IGNORECASE)) == ''
+
+
+def test_match_preserves_table_order():
+    routes = [(re.compile(p), 'callable', i) for i, p in enumerate(ROUTE_PATTERNS)]
+    table = RouteTable(routes)
+    for path in PATHS:
+        assert table.match(path) == linear_match(routes, path), path
+
+
+def test_insert_and_remove_keep_dispatch_consistent():
+    routes = [(re.compile(p), 'callable', i) for i, p in enumerate(ROUTE_PATTERNS)]
+    table = RouteTable(routes)
+
+    # Agent routes are inserted at the front, path routes before the catch-all.
+    peer_route = (re.compile('^/vui/platforms/p1'), 'peer_route', ('agent', 'fn'))
+    path_route = (re.compile('.*'), 'path', '/tmp')
+    table.insert(0, peer_route)
+    table.insert(len(table) - 1, path_route)
+    routes.insert(0, peer_route)
+    routes.insert(len(routes) - 1, path_route)
+    assert list(table) == routes
+    for path in PATHS:
+        assert table.match(path) == linear_match(routes, path), path
+
+    table.remove_pattern(re.compile('^/vui/platforms/p1'))
+    table.remove_pattern(re.compile('.*'))
+    routes = [r for r in routes if r not in (peer_route, path_route)]
+    assert list(table) == routes
+    for path in PATHS:
+        assert table.match(path) == linear_match(routes, path), path
+
+
+def test_empty_table_does_not_match():
+    assert RouteTable().match('/index.html') is None
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import gzip
+import mimetypes
+import os
+
+import gevent
+import pytest
+import requests
+
+from watchdog.events import (FileClosedEvent, FileClosedNoWriteEvent, FileCreatedEvent, FileDeletedEvent,
+                             FileModifiedEvent, FileOpenedEvent)
+from ws4py.server.geventserver import WSGIServer
+
+from volttron.services.web import static
+from volttron.services.web.compression import compress, supported_encodings
+from volttron.services.web.static import (IMMUTABLE_CACHE_CONTROL, FileResponse, StaticFiles, StaticWSGIHandler,
+                                          _InvalidateHandler, is_content_hashed, parse_range)
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def call(static_files, path, method='GET'):
+    response = {}
+
+    def start_response(status, headers):
+        response['status'] = status
+        response['headers'] = dict(headers)
+
+    body = static_files.serve({'REQUEST_METHOD': method}, start_response, str(path))
+    content = b''.join(bytes(chunk) for chunk in body)
+    getattr(body, 'close', lambda: None)()
+    return response['status'], response['headers'], content
+
+
+def test_serve_small_file_from_memory(tmp_path):
+    path = tmp_path / 'index.html'
+    path.write_bytes(b'<html></html>')
+    static_files = StaticFiles()
+
+    status, headers, content = call(static_files, path)
+    assert status == '200 OK'
+    assert headers['Content-Type'] == 'text/html'
+    assert headers['Content-Length'] == '13'
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert content == b'<html></html>'
+
+    call(static_files, path)
+    stats = static_files.stats()
+    assert stats['metadata']['hits'] == 1
+    assert stats['content']['hits'] == 1
+
+
+def test_serve_missing_file_and_directory(tmp_path):
+    static_files = StaticFiles()
+    assert call(static_files, tmp_path / 'missing.js')[0] == '404 Not Found'
+    assert call(static_files, tmp_path)[0] == '404 Not Found'
+
+
+def test_head_request_has_no_body(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(b'a,b\n' * 100)
+    status, headers, content = call(StaticFiles(max_cached_file_size=10), path, method='HEAD')
+    assert headers['Content-Length'] == '400'
+    assert content == b''
+
+
+def test_unwatched_metadata_revalidated_after_ttl(tmp_path):
+    path = tmp_path / 'app.js'
+    path.write_bytes(b'one')
+    clock = FakeClock()
+    static_files = StaticFiles(stat_ttl=2, clock=clock)
+    assert call(static_files, path)[2] == b'one'
+
+    path.write_bytes(b'three')
+    assert call(static_files, path)[2] == b'one'
+    clock.now += 2
+    assert call(static_files, path)[2] == b'three'
+
+
+def test_watcher_events_invalidate_metadata(tmp_path):
+    path = tmp_path / 'app.js'
+    path.write_bytes(b'one')
+    static_files = StaticFiles(stat_ttl=3600)
+    static_files.lookup(str(path))
+
+    path.write_bytes(b'three')
+    _InvalidateHandler(static_files).on_any_event(FileModifiedEvent(str(path)))
+    assert static_files.lookup(str(path)).size == 5
+
+    path.unlink()
+    _InvalidateHandler(static_files).on_any_event(FileDeletedEvent(str(path)))
+    assert static_files.lookup(str(path)) is None
+
+
+def test_reads_do_not_invalidate_metadata(tmp_path):
+    path = tmp_path / 'app.js'
+    path.write_bytes(b'one')
+    static_files = StaticFiles(stat_ttl=3600)
+    info = static_files.lookup(str(path))
+
+    handler = _InvalidateHandler(static_files)
+    for event_class in (FileOpenedEvent, FileClosedNoWriteEvent, FileClosedEvent):
+        handler.on_any_event(event_class(str(path)))
+    path.write_bytes(b'three')
+    # Still the cached entry, no stat was made.
+    assert static_files.lookup(str(path)) is info
+
+
+@pytest.mark.parametrize("offset, length", [(0, None), (70000, 1000), (65535, 2)])
+def test_file_response_iterates_memory_map(tmp_path, offset, length):
+    data = os.urandom(200000)
+    path = tmp_path / 'bundle.bin'
+    path.write_bytes(data)
+    response = FileResponse(str(path), offset=offset, length=length, block_size=4096)
+    try:
+        content = b''.join(bytes(block) for block in response)
+    finally:
+        response.close()
+    end = len(data) if length is None else offset + length
+    assert content == data[offset:end]
+
+
+def test_large_file_sent_with_sendfile(tmp_path):
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    (tmp_path / 'export.csv').write_bytes(data)
+    static_files = StaticFiles(max_cached_file_size=1024)
+
+    def app(env, start_response):
+        return static_files.serve(env, start_response, str(tmp_path / env['PATH_INFO'].lstrip('/')))
+
+    server = WSGIServer(('127.0.0.1', 0), app, handler_class=StaticWSGIHandler)
+    server.start()
+    try:
+        url = f'http://127.0.0.1:{server.server_port}/export.csv'
+        response = gevent.spawn(requests.get, url).get(timeout=10)
+    finally:
+        server.stop()
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == 'text/csv'
+    assert response.content == data
+
+
+def test_serves_newest_precompressed_sibling(tmp_path):
+    path = tmp_path / 'app.js'
+    path.write_bytes(b'var a = 1;' * 100)
+    gz = tmp_path / 'app.js.gz'
+    gz.write_bytes(gzip.compress(path.read_bytes()))
+    static_files = StaticFiles()
+
+    def serve(accept_encoding):
+        response = {}
+
+        def start_response(status, headers):
+            response.update(headers)
+
+        body = static_files.serve({'REQUEST_METHOD': 'GET', 'HTTP_ACCEPT_ENCODING': accept_encoding},
+                                  start_response, str(path))
+        return response, b''.join(body)
+
+    headers, content = serve('gzip, deflate')
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Content-Type'] == mimetypes.guess_type('app.js')[0]
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(content) == path.read_bytes()
+
+    headers, content = serve('br')
+    assert 'Content-Encoding' not in headers
+    assert content == path.read_bytes()
+
+    # A variant older than the file is ignored.
+    stat = os.stat(gz)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    static_files.invalidate()
+    assert 'Content-Encoding' not in serve('gzip')[0]
+
+
+def test_small_file_compressed_once(tmp_path, monkeypatch):
+    path = tmp_path / 'app.js'
+    path.write_bytes(b'var a = 1;' * 200)
+    calls = []
+
+    def counting_compress(data, coding, level=None):
+        calls.append(coding)
+        return compress(data, coding, level)
+
+    monkeypatch.setattr(static, 'compress', counting_compress)
+    static_files = StaticFiles(compress_min_size=1024)
+
+    def serve(**env):
+        response = {}
+
+        def start_response(status, headers):
+            response.update(headers)
+
+        body = static_files.serve(dict(REQUEST_METHOD='GET', **env), start_response, str(path))
+        return response, b''.join(body)
+
+    for _ in range(3):
+        headers, content = serve(HTTP_ACCEPT_ENCODING='gzip')
+        assert headers['Content-Encoding'] == 'gzip'
+        assert headers['Content-Length'] == str(len(content))
+        assert gzip.decompress(content) == path.read_bytes()
+    assert calls == ['gzip']
+    etag = headers['ETag']
+    assert etag != serve()[0]['ETag']
+    assert 'Content-Encoding' not in serve()[0]
+
+    # Files under the minimum size are sent as they are.
+    small = StaticFiles(compress_min_size=4096)
+    response = {}
+    small.serve({'REQUEST_METHOD': 'GET', 'HTTP_ACCEPT_ENCODING': 'gzip'},
+                lambda status, headers: response.update(headers), str(path))
+    assert 'Content-Encoding' not in response
+
+
+def test_precompress_writes_variants_to_cache_dir(tmp_path):
+    root = tmp_path / 'root'
+    (root / 'js').mkdir(parents=True)
+    (root / 'js' / 'app.js').write_bytes(b'function f() { return 1; }\n' * 200)
+    (root / 'small.css').write_bytes(b'a{}')
+    (root / 'logo.png').write_bytes(os.urandom(4096))
+    cache_dir = tmp_path / 'cache'
+    static_files = StaticFiles(precompressed_dir=str(cache_dir))
+
+    assert static_files.precompress(str(root)) == len(supported_encodings())
+    variant = cache_dir / str(root / 'js' / 'app.js.gz').lstrip(os.sep)
+    assert gzip.decompress(variant.read_bytes()) == (root / 'js' / 'app.js').read_bytes()
+
+    info = static_files.lookup(str(root / 'js' / 'app.js'))
+    assert static_files.variants(info)['gzip'].path == str(variant)
+    # Up to date variants are not written again.
+    assert static_files.precompress(str(root)) == 0
+
+
+def conditional(static_files, path, cache_control=None, **env):
+    response = {}
+
+    def start_response(status, headers):
+        response['status'] = status
+        response['headers'] = dict(headers)
+
+    env.setdefault('REQUEST_METHOD', 'GET')
+    body = static_files.serve(env, start_response, str(path), cache_control=cache_control)
+    content = b''.join(bytes(chunk) for chunk in body)
+    getattr(body, 'close', lambda: None)()
+    return response['status'], response['headers'], content
+
+
+def test_conditional_get(tmp_path):
+    path = tmp_path / 'index.html'
+    path.write_bytes(b'<html></html>')
+    static_files = StaticFiles()
+
+    status, headers, _ = conditional(static_files, path)
+    assert status == '200 OK'
+    assert headers['Cache-Control'] == 'no-cache'
+    etag, last_modified = headers['ETag'], headers['Last-Modified']
+
+    status, headers, content = conditional(static_files, path, HTTP_IF_NONE_MATCH=etag)
+    assert status == '304 Not Modified'
+    assert content == b''
+    assert headers['ETag'] == etag
+    assert 'Content-Length' not in headers
+
+    assert conditional(static_files, path, HTTP_IF_NONE_MATCH='"other"')[0] == '200 OK'
+    assert conditional(static_files, path, HTTP_IF_MODIFIED_SINCE=last_modified)[0] == '304 Not Modified'
+    assert conditional(static_files, path, HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 1970 00:00:00 GMT')[0] == '200 OK'
+    # If-None-Match takes precedence over If-Modified-Since.
+    assert conditional(static_files, path, HTTP_IF_NONE_MATCH='"other"',
+                       HTTP_IF_MODIFIED_SINCE=last_modified)[0] == '200 OK'
+
+    path.write_bytes(b'<html>changed</html>')
+    static_files.invalidate()
+    status, headers, _ = conditional(static_files, path, HTTP_IF_NONE_MATCH=etag)
+    assert status == '200 OK'
+    assert headers['ETag'] != etag
+
+
+def test_etag_differs_between_encodings(tmp_path):
+    path = tmp_path / 'app.css'
+    path.write_bytes(b'body { margin: 0; }' * 100)
+    (tmp_path / 'app.css.gz').write_bytes(gzip.compress(path.read_bytes()))
+    static_files = StaticFiles()
+    identity = conditional(static_files, path)[1]['ETag']
+    encoded = conditional(static_files, path, HTTP_ACCEPT_ENCODING='gzip')[1]['ETag']
+    assert identity != encoded
+    assert conditional(static_files, path, HTTP_ACCEPT_ENCODING='gzip',
+                       HTTP_IF_NONE_MATCH=encoded)[0] == '304 Not Modified'
+
+
+@pytest.mark.parametrize("name, hashed", [
+    ('main.3f9a2b1c.js', True),
+    ('chunk-0a1b2c3d4e5f.css', True),
+    ('jquery-3.5.0.min.js', False),
+    ('index.html', False),
+])
+def test_cache_control_policies(tmp_path, name, hashed):
+    path = tmp_path / name
+    path.write_bytes(b'x')
+    static_files = StaticFiles()
+    assert is_content_hashed(name) == hashed
+    headers = conditional(static_files, path, cache_control='max-age=60')[1]
+    assert headers['Cache-Control'] == (IMMUTABLE_CACHE_CONTROL if hashed else 'max-age=60')
+
+
+@pytest.mark.parametrize("value, expected", [
+    ('bytes=0-99', [(0, 100)]),
+    ('bytes=900-', [(900, 1000)]),
+    ('bytes=-100', [(900, 1000)]),
+    ('bytes=-2000', [(0, 1000)]),
+    ('bytes=990-2000', [(990, 1000)]),
+    ('bytes=0-9, 5-19, 50-59', [(0, 20), (50, 60)]),
+    ('bytes=50-59,0-9', [(0, 10), (50, 60)]),
+    ('bytes=1000-', []),
+    ('bytes=-0', []),
+    ('bytes=10-5', None),
+    ('bytes=a-b', None),
+    ('items=0-9', None),
+    ('bytes=' + ','.join(f'{i}-{i}' for i in range(0, 100, 2)), None),
+])
+def test_parse_range(value, expected):
+    assert parse_range(value, 1000) == expected
+
+
+@pytest.mark.parametrize("max_cached_file_size", [1024 * 1024, 16])
+def test_single_range(tmp_path, max_cached_file_size):
+    data = os.urandom(10000)
+    path = tmp_path / 'export.csv'
+    path.write_bytes(data)
+    static_files = StaticFiles(max_cached_file_size=max_cached_file_size)
+
+    status, headers, content = conditional(static_files, path, HTTP_RANGE='bytes=100-199')
+    assert status == '206 Partial Content'
+    assert headers['Content-Range'] == 'bytes 100-199/10000'
+    assert headers['Content-Length'] == '100'
+    assert content == data[100:200]
+
+    status, headers, _ = conditional(static_files, path, HTTP_RANGE='bytes=20000-')
+    assert status == '416 Range Not Satisfiable'
+    assert headers['Content-Range'] == 'bytes */10000'
+
+    # A stale If-Range validator gets the whole file.
+    status, headers, content = conditional(static_files, path, HTTP_RANGE='bytes=100-199', HTTP_IF_RANGE='"stale"')
+    assert status == '200 OK'
+    assert content == data
+    etag = headers['ETag']
+    assert conditional(static_files, path, HTTP_RANGE='bytes=100-199', HTTP_IF_RANGE=etag)[0] == '206 Partial Content'
+
+
+def test_range_ignores_precompressed_variant(tmp_path):
+    path = tmp_path / 'log.txt'
+    path.write_bytes(b'line\n' * 1000)
+    (tmp_path / 'log.txt.gz').write_bytes(gzip.compress(path.read_bytes()))
+    status, headers, content = conditional(StaticFiles(), path, HTTP_RANGE='bytes=0-9', HTTP_ACCEPT_ENCODING='gzip')
+    assert status == '206 Partial Content'
+    assert 'Content-Encoding' not in headers
+    assert content == b'line\n' * 2
+
+
+def test_multiple_ranges_sent_with_sendfile(tmp_path):
+    data = os.urandom(2 * 1024 * 1024)
+    (tmp_path / 'bundle.bin').write_bytes(data)
+    static_files = StaticFiles(max_cached_file_size=1024)
+
+    def app(env, start_response):
+        return static_files.serve(env, start_response, str(tmp_path / env['PATH_INFO'].lstrip('/')))
+
+    server = WSGIServer(('127.0.0.1', 0), app, handler_class=StaticWSGIHandler)
+    server.start()
+    try:
+        url = f'http://127.0.0.1:{server.server_port}/bundle.bin'
+        response = gevent.spawn(requests.get, url, headers={'Range': 'bytes=0-99,1500000-1500099,-10'}).get(timeout=10)
+    finally:
+        server.stop()
+
+    assert response.status_code == 206
+    content_type, _, boundary = response.headers['Content-Type'].partition('; boundary=')
+    assert content_type == 'multipart/byteranges'
+    parts = response.content.split(b'--' + boundary.encode())
+    assert parts[0] == b'' and parts[-1] == b'--\r\n'
+    bodies = [part.split(b'\r\n\r\n', 1) for part in parts[1:-1]]
+    assert [body[:-2] for _, body in bodies] == [data[:100], data[1500000:1500100], data[-10:]]
+    assert b'Content-Range: bytes 1500000-1500099/2097152' in bodies[1][0]
+    assert int(response.headers['Content-Length']) == len(response.content)
+
+
+def test_resolve_rejects_traversal(tmp_path):
+    root = tmp_path / 'root'
+    (root / 'js').mkdir(parents=True)
+    (tmp_path / 'secret.txt').write_bytes(b'secret')
+    (root / 'escape').symlink_to(tmp_path / 'secret.txt')
+    static_files = StaticFiles()
+    root = str(root)
+
+    assert static_files.resolve(root, '/js/app.js') == os.path.join(root, 'js', 'app.js')
+    assert static_files.resolve(root, '/js/../index.html') == os.path.join(root, 'index.html')
+    assert static_files.resolve(root, '/../secret.txt') is None
+    assert static_files.resolve(root, '/js/../../secret.txt') is None
+    assert static_files.resolve(root, '/escape') is None
+    # Cached answers are as strict as fresh ones.
+    assert static_files.resolve(root, '/escape') is None
+    assert static_files.stats()['resolved']['hits'] == 1
+
+
+def test_resolution_cache_follows_structure_changes(tmp_path):
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'inside.txt').write_bytes(b'ok')
+    (tmp_path / 'secret.txt').write_bytes(b'secret')
+    link = root / 'link'
+    link.symlink_to(root / 'inside.txt')
+    clock = FakeClock()
+    static_files = StaticFiles(stat_ttl=2, clock=clock)
+    root = str(root)
+    assert static_files.resolve(root, '/link') == os.path.join(root, 'inside.txt')
+
+    link.unlink()
+    link.symlink_to(tmp_path / 'secret.txt')
+    # Unwatched roots are resolved again once the entry is stale.
+    clock.now += 2
+    assert static_files.resolve(root, '/link') is None
+
+    link.unlink()
+    link.symlink_to(os.path.join(root, 'inside.txt'))
+    _InvalidateHandler(static_files).on_any_event(FileModifiedEvent(str(link)))
+    assert static_files.resolve(root, '/link') is None
+    _InvalidateHandler(static_files).on_any_event(FileCreatedEvent(str(link)))
+    assert static_files.resolve(root, '/link') == os.path.join(root, 'inside.txt')
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import base64
+import zlib
+
+import pytest
+
+from volttron.services.web.compression import CompressionMiddleware
+from volttron.services.web.streaming import StreamedResponse, stream_response
+
+
+class FakeStream(object):
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.fetched = 0
+        self.cancelled = False
+
+    def fetch_page(self):
+        self.fetched += 1
+        return self.pages.pop(0) if self.pages else []
+
+    def cancel(self):
+        self.cancelled = True
+
+
+@pytest.mark.parametrize("res, expected", [
+    (['200 OK', {'stream': 'h1', 'method': 'export_page'}, []], True),
+    (('200 OK', {'stream': 'h1', 'method': 'export_page'}, [('Content-Type', 'text/csv')]), True),
+    (['200 OK', {'stream': 'h1'}, []], False),
+    ({'stream': 'h1', 'method': 'export_page'}, False),
+    (['200 OK', 'body', []], False),
+    (None, False),
+])
+def test_stream_response(res, expected):
+    assert (stream_response(res) is not None) == expected
+
+
+def test_pages_are_fetched_as_they_are_consumed():
+    stream = FakeStream([['a,b\n', '1,2\n'], ['3,4\n']])
+    body = iter(StreamedResponse(stream.fetch_page, stream.cancel))
+    assert next(body) == b'a,b\n'
+    assert stream.fetched == 1
+    assert next(body) == b'1,2\n'
+    assert next(body) == b'3,4\n'
+    assert stream.fetched == 2
+    assert list(body) == []
+    assert stream.fetched == 3
+
+
+def test_base64_chunks():
+    stream = FakeStream([[base64.b64encode(b'\x00\x01').decode(), b'\x02']])
+    assert list(StreamedResponse(stream.fetch_page, stream.cancel, base64_chunks=True)) == [b'\x00\x01', b'\x02']
+
+
+def test_close_cancels_unfinished_stream():
+    stream = FakeStream([['a'], ['b']])
+    response = StreamedResponse(stream.fetch_page, stream.cancel)
+    body = iter(response)
+    next(body)
+    response.close()
+    assert stream.cancelled
+    assert list(body) == []
+
+    stream = FakeStream([['a']])
+    response = StreamedResponse(stream.fetch_page, stream.cancel)
+    assert list(response) == [b'a']
+    response.close()
+    assert not stream.cancelled
+
+
+def test_compressed_streams_are_flushed_per_page():
+    stream = FakeStream([['x' * 10], ['y' * 10]])
+
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/csv')])
+        return StreamedResponse(stream.fetch_page, stream.cancel)
+
+    body = CompressionMiddleware(app)({'HTTP_ACCEPT_ENCODING': 'gzip'}, lambda status, headers: None)
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    assert decompressor.decompress(next(body)) == b'x' * 10
+    assert stream.fetched == 1
+    body.close()
+    assert stream.cancelled
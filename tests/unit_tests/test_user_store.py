@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Installable Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2022 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+import os
+
+import pytest
+
+from volttrontesting.platformwrapper import create_volttron_home, with_os_environ
+
+from volttron.utils import jsonapi
+from volttron.services.web.user_store import UserStore
+
+
+def test_users_indexed_by_name():
+    volttron_home = create_volttron_home()
+    with with_os_environ({'VOLTTRON_HOME': volttron_home}):
+        with open(os.path.join(volttron_home, 'web-users.json'), 'w') as fp:
+            jsonapi.dump({'bart': {'hashed_password': 'hash', 'groups': ['admin', 'vui'], 'name': 'Bart'},
+                          'broken': 'not a user'}, fp)
+        store = UserStore()
+        assert len(store) == 1
+        assert 'broken' not in store
+        user = store.get('bart')
+        assert user.hashed_password == 'hash'
+        assert user.claims() == {'groups': ['admin', 'vui'], 'name': 'Bart'}
+        assert store.get('lisa') is None
+
+
+def test_add_user_writes_file_and_swaps_snapshot():
+    volttron_home = create_volttron_home()
+    with with_os_environ({'VOLTTRON_HOME': volttron_home}):
+        store = UserStore()
+        assert len(store) == 0
+        store.add_user('bart', 'hash', ['admin'])
+        store.add_user('lisa', 'other', ['vui'])
+        assert sorted(store) == ['bart', 'lisa']
+        with pytest.raises(ValueError):
+            store.add_user('bart', 'new')
+        store.add_user('bart', 'new', overwrite=True)
+        assert store.get('bart').hashed_password == 'new'
+        assert store.get('bart').claims() == {'groups': []}
+
+        with open(os.path.join(volttron_home, 'web-users.json')) as fp:
+            users = jsonapi.load(fp)
+        assert users == {'bart': {'hashed_password': 'new', 'groups': []},
+                         'lisa': {'hashed_password': 'other', 'groups': ['vui']}}
+
+        another = UserStore()
+        assert sorted(another) == ['bart', 'lisa']
+
+
+def test_reload_picks_up_file_changes():
+    volttron_home = create_volttron_home()
+    with with_os_environ({'VOLTTRON_HOME': volttron_home}):
+        store = UserStore()
+        UserStore().add_user('bart', 'hash', ['admin'])
+        assert 'bart' not in store
+        store.reload()
+        assert 'bart' in store
@@ -78,3 +78,40 @@ def test_register_routes(mock_platform_web_service):
 
     finally:
         shutil.rmtree(str(Path(html_root).parent), ignore_errors=True)
+
+
+def test_route_resolution_cache_invalidated_on_registration(mock_platform_web_service):
+    pws = mock_platform_web_service
+    pws.register_path_route("/.*", "/tmp")
+
+    first = pws._resolve_route("/index.html", "GET")
+    assert first == pws._resolve_route("/index.html", "GET")
+    assert first[2][1] == 'path'
+    assert pws.get_route_cache_stats()['hits'] == 1
+
+    # Agent routes are inserted ahead of the path routes and must be seen immediately.
+    pws.register_agent_route("^/index.html$", "handle_index")
+    peer, res_type, route = pws._resolve_route("/index.html", "GET")
+    assert route[1] == 'peer_route'
+
+
+def test_raw_and_bytes_responses(mock_platform_web_service):
+    pws = mock_platform_web_service
+    png = b'\x89PNG\r\n\x1a\n\x00\x00'
+
+    start_response = MagicMock()
+    data = pws.create_raw_response(['200 OK', 'iVBORw0KGgoAAA==', [['Content-Type', 'image/png']]],
+                                   start_response)
+    assert data == [png]
+    assert start_response.call_args[0] == ('200 OK', [('Content-Type', 'image/png'), ('Content-Length', '10')])
+
+    start_response.reset_mock()
+    data = pws.create_raw_response(('200 OK', png, [('Content-Type', 'image/png')]), start_response,
+                                   base64_body=False)
+    assert data == [png]
+    assert start_response.call_args[0][1][-1] == ('Content-Length', '10')
+
+    start_response.reset_mock()
+    data = pws.create_raw_response(('200 OK', 'a,b\n1,2\n', [('Content-Type', 'text/csv')]), start_response,
+                                   base64_body=False)
+    assert data == [b'a,b\n1,2\n']
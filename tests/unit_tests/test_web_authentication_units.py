@@ -178,11 +178,28 @@ def test_authenticate_delete_request():
         env = get_test_web_env('/authenticate', method='POST')
         response = authorize_ep.handle_authenticate(env, test_user)
 
-        # Touch Delete endpoint
+        response_token = json.loads(response.response[0].decode('utf-8'))
+        refresh_token = response_token['refresh_token']
+        access_token = response_token["access_token"]
+
+        # Delete without a token is refused
         env = get_test_web_env('/authenticate', method='DELETE')
         response = authorize_ep.handle_authenticate(env, test_user)
         assert ('Content-Type', 'application/json') in response.headers.items()
-        assert '501 NOT IMPLEMENTED' in response.status
+        assert '401 UNAUTHORIZED' in response.status
+
+        # Revoke the refresh and access tokens
+        env = get_test_web_env('/authenticate', method='DELETE')
+        env["HTTP_AUTHORIZATION"] = "BEARER " + refresh_token
+        response = authorize_ep.handle_authenticate(env, data={'current_access_token': access_token})
+        assert '204 NO CONTENT' in response.status
+        assert authorize_ep._revocations.is_revoked(access_token)
+
+        # The revoked refresh token can no longer be renewed
+        env = get_test_web_env('/authenticate', method='PUT')
+        env["HTTP_AUTHORIZATION"] = "BEARER " + refresh_token
+        response = authorize_ep.handle_authenticate(env, data={})
+        assert "401 UNAUTHORIZED" in response.status
 
 
 def test_no_private_key_or_passphrase():